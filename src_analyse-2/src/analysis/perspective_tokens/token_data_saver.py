@@ -4,6 +4,11 @@ from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any
 
+try:
+    import orjson  # optional, быстрая сериализация JSON
+except ImportError:
+    orjson = None
+
 class TokenDataSaver:
     """
     Класс для сохранения данных о перспективных токенах в JSON формате
@@ -55,8 +60,11 @@ class TokenDataSaver:
         filepath = self.output_dir / filename
         
         # Сохраняем данные в JSON файл
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        if orjson is not None:
+            filepath.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
         
         # Копируем файл в директорию report и переименовываем в finalResult.json
         shutil.copy2(filepath, self.final_result_path)
@@ -26,9 +26,18 @@ class SecurityAnalyzer:
         self.config = config
         self.web3 = None
         self.scam_patterns: List[ScamPattern] = []
+        # Один UniversalTokenChecker на анализатор: его сессия (keep-alive, DNS-кэш) переиспользуется
+        # всеми проверками; создается при первой проверке, закрывается в close()
+        self._universal_checker = None
         self.load_scam_patterns()
         self.setup_web3()
     
+    async def close(self):
+        """Закрывает общую HTTP-сессию внешних проверок (вызывать по завершении анализа)"""
+        if self._universal_checker is not None:
+            checker, self._universal_checker = self._universal_checker, None
+            await checker.close()
+    
     def setup_web3(self):
         """Настройка Web3 подключения с API ключом"""
         try:
@@ -611,10 +620,13 @@ class SecurityAnalyzer:
                     class UniversalTokenChecker:
                         def __init__(self):
                             pass
-                        def check_token(self, address, chain):
+                        async def check_token(self, address, chain):
                             return {"sources": [], "trust_level": "unknown", "risk_score": 0.5}
-            utc = UniversalTokenChecker()
-            checks['universal_checks'] = utc.check_token(token_address, chain)
+                        async def close(self):
+                            pass
+            if self._universal_checker is None:
+                self._universal_checker = UniversalTokenChecker()
+            checks['universal_checks'] = await self._universal_checker.check_token(token_address, chain)
             
         except Exception as e:
             print(f"⚠️ Ошибка внешних проверок: {e}")
@@ -1,17 +1,36 @@
 import os
+import sys
 import json
 import time
 import random
 import logging
 import asyncio
+import atexit
 import aiohttp
+import numpy as np
+import pandas as pd
 from typing import Dict, List, Optional, Any, Set, Tuple
 import requests
 from datetime import datetime, timedelta
-from tqdm import tqdm
+from tqdm.asyncio import tqdm as atqdm
 from pathlib import Path
+from types import MappingProxyType
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from email.utils import parsedate_to_datetime
 import argparse
 
+try:
+    import orjson  # optional, быстрый C-парсер JSON
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+try:
+    import diskcache  # optional, кеш профилей между запусками
+except ImportError:
+    diskcache = None
 try:
     from src.utils.logger import get_logger
     logger = get_logger()
@@ -32,8 +51,8 @@ try:
 except Exception:
     TokenDataSaver = None
 
-# Словарь с блокчейн-эксплорерами для разных сетей
-explorers = {
+# Словарь с блокчейн-эксплорерами для разных сетей (только для чтения)
+_EXPLORERS = MappingProxyType({
     'solana': 'https://solscan.io/token/',
     'base': 'https://basescan.org/token/',
     'ethereum': 'https://etherscan.io/token/',
@@ -71,8 +90,122 @@ explorers = {
     'osmosis': 'https://www.mintscan.io/osmosis/token/',
     'cosmos': 'https://www.mintscan.io/cosmos/token/',
     'thorchain': 'https://viewblock.io/thorchain/token/'
+})
+explorers = _EXPLORERS  # совместимость со старым именем
+
+
+# Ссылки на обмен токена в DEX: dexId -> (подпись, шаблон URL с {addr})
+DEX_URL_TEMPLATES: Dict[str, Tuple[str, str]] = {
+    'pancakeswap': ("🥞 PancakeSwap", "https://pancakeswap.finance/swap?outputCurrency={addr}"),
+    'raydium': ("🌟 Raydium", "https://raydium.io/swap/?inputCurrency=sol&outputCurrency={addr}"),
+    'uniswap': ("🦄 Uniswap", "https://app.uniswap.org/#/swap?outputCurrency={addr}"),
+    'sushi': ("🍣 SushiSwap", "https://app.sushi.com/swap?outputCurrency={addr}"),
 }
 
+
+def explorer_url(chain: str, addr: str) -> str:
+    """Ссылка на токен в блокчейн-эксплорере сети ('' если сеть неизвестна)."""
+    base = _EXPLORERS.get(chain)
+    return f"{base}{addr}" if base else ""
+
+# Доверенные DEX и пороги предупреждений для derive_signals_from_pairs
+_TRUSTED_DEX = frozenset({"uniswap", "sushiswap", "pancakeswap", "raydium", "quickswap", "jupiter", "syncswap"})
+_LIQ_CRIT, _LIQ_LOW, _VOLLIQ_HI, _VOLLIQ_LO = 25_000, 100_000, 2.0, 0.05
+# Нормализованные скоры пары (0..1, где выше — лучше) в выходе derive_signals_batch
+_SIGNAL_SCORE_KEYS = ("dex_trust", "liquidity_score", "volume_score", "stability_score", "age_score", "metadata_score")
+
+# Ключи сортировки ракет (itemgetter работает на C, без вызова lambda на каждый элемент)
+_by_liq = itemgetter('liquidity_usd')
+_by_vol = itemgetter('volume_24h')
+_by_p24 = itemgetter('price_change_24h')
+
+# Известные стейблкоины (символы в верхнем регистре), исключаются из поиска ракет
+STABLECOINS = frozenset({
+    'USDT', 'USDC', 'DAI', 'BUSD', 'TUSD', 'USDH', 'USDK', 'USDN', 'USDX',
+    'UST', 'FRAX', 'LUSD', 'SUSD', 'GUSD', 'HUSD', 'OUSD', 'CUSD', 'USDJ'
+})
+
+# Поисковые запросы по сетям для get_latest_token_profiles_async лежат в networks.json
+# рядом с модулем (или в файле из DEXSCREENER_NETWORKS_FILE) и читаются один раз за процесс
+_NETWORKS_FILE = Path(os.getenv("DEXSCREENER_NETWORKS_FILE") or Path(__file__).with_name("networks.json"))
+
+
+@lru_cache(maxsize=None)
+def _default_networks() -> Dict[str, Tuple[str, ...]]:
+    """Загружает сети и поисковые запросы из _NETWORKS_FILE ({} при ошибке чтения)."""
+    try:
+        data = _json_loads(_NETWORKS_FILE.read_bytes())
+    except (OSError, ValueError) as e:
+        logger.error(f"[DEXSCREENER] Не удалось загрузить список сетей из {_NETWORKS_FILE}: {e}")
+        return {}
+    return {network: tuple(queries) for network, queries in data.items()}
+
+
+def _extract_profile_fields(profiles: List[Dict]) -> Tuple[List[int], List[tuple], int]:
+    """Извлекает из профилей поля для фильтра ракет.
+
+    Чистая функция уровня модуля, чтобы ее можно было запускать в ProcessPoolExecutor.
+
+    Returns:
+        (индексы принятых профилей, записи (address, SYMBOL, h1, h24, liq, vol, created),
+        число пропущенных профилей без адреса)
+    """
+    kept_idx = []
+    records = []
+    skipped = 0
+    for i, profile in enumerate(profiles):
+        token = profile.get("baseToken") or {}
+        if not token.get("address"):
+            skipped += 1
+            continue
+        price_changes = profile.get("priceChange") or {}
+        symbol = str(token.get("symbol") or "")
+        kept_idx.append(i)
+        records.append((
+            token["address"],
+            symbol if symbol.isupper() else symbol.upper(),
+            price_changes.get("h1", 0),
+            price_changes.get("h24", 0),
+            (profile.get("liquidity") or {}).get("usd", 0),
+            (profile.get("volume") or {}).get("h24", 0),
+            profile.get("pairCreatedAt", 0),
+        ))
+    return kept_idx, records, skipped
+
+
+class _BufferedFileHandler(logging.FileHandler):
+    """FileHandler без flush на каждую запись.
+
+    Сообщения копятся в буфере (64 КБ по умолчанию) и сбрасываются на диск при его
+    заполнении и при закрытии обработчика (logging.shutdown вызывается при выходе).
+    """
+
+    def __init__(self, filename, buffer_size: int = 1 << 16):
+        self.buffer_size = buffer_size
+        super().__init__(filename, mode="a", encoding="utf-8")
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                    encoding=self.encoding, errors=self.errors)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+def _best_by_liquidity(pairs: List[Dict]) -> Dict:
+    """Возвращает пару с максимальной ликвидностью в USD ({} для пустого списка)."""
+    best, best_liq = None, -1.0
+    for p in pairs:
+        liq = float((p.get("liquidity") or {}).get("usd") or 0)
+        if liq > best_liq:
+            best_liq, best = liq, p
+    return best or {}
+
 class DexScreenerAPI:
     """
     Класс для взаимодействия с API DEXScreener.
@@ -88,6 +221,10 @@ class DexScreenerAPI:
         """
         self.base_url = "https://api.dexscreener.com/latest/dex"
         self.session = requests.Session()
+        # Пул соединений по умолчанию (10) сериализует запросы из нескольких потоков
+        adapter = requests.adapters.HTTPAdapter(pool_connections=50, pool_maxsize=50, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.test_mode = test_mode
         self.session.headers.update({
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
@@ -98,6 +235,12 @@ class DexScreenerAPI:
         })
         self.timeout = int(os.getenv("DEXSCREENER_TIMEOUT", "30"))
         self.max_retries = int(os.getenv("DEXSCREENER_MAX_RETRIES", "3"))
+        self.max_retry_wait = float(os.getenv("DEXSCREENER_MAX_RETRY_WAIT", "60"))
+        self.max_concurrency = int(os.getenv("DEXSCREENER_CONCURRENCY", "5"))
+        # С какого числа профилей разбор полей в find_rocket_tokens идет в несколько процессов
+        self.parallel_threshold = int(os.getenv("DEXSCREENER_PARALLEL_THRESHOLD", "5000"))
+        # Запросы get_best_pair_async, находящиеся в полёте: повторные вызовы ждут тот же Future
+        self._inflight: Dict[str, asyncio.Future] = {}
         self.min_liquidity = float(os.getenv("DEXSCREENER_MIN_LIQUIDITY", "50" if test_mode else "250"))
         self.min_volume_24h = float(os.getenv("DEXSCREENER_MIN_VOLUME_24H", "25" if test_mode else "100"))
         self.logger = logging.getLogger("dexscreener")
@@ -114,7 +257,7 @@ class DexScreenerAPI:
         # Настраиваем файловый логгер для анализа токенов
         self.file_logger = logging.getLogger("token_analysis")
         self.file_logger.setLevel(logging.DEBUG)
-        file_handler = logging.FileHandler(self.log_file)
+        file_handler = _BufferedFileHandler(self.log_file)
         file_handler.setLevel(logging.DEBUG)
         formatter = logging.Formatter('%(message)s')
         file_handler.setFormatter(formatter)
@@ -123,10 +266,23 @@ class DexScreenerAPI:
         # Настраиваем файловый логгер для анализа ракет
         self.rockets_logger = logging.getLogger("rockets_analysis")
         self.rockets_logger.setLevel(logging.DEBUG)
-        rockets_handler = logging.FileHandler(self.rockets_analysis_file)
+        rockets_handler = _BufferedFileHandler(self.rockets_analysis_file)
         rockets_handler.setLevel(logging.DEBUG)
         rockets_handler.setFormatter(formatter)
         self.rockets_logger.addHandler(rockets_handler)
+        # Буферы сбрасываются при выходе через logging.shutdown; atexit страхует от
+        # обработчиков, отцепленных от логгера до завершения процесса
+        atexit.register(file_handler.flush)
+        atexit.register(rockets_handler.flush)
+
+        # Дисковый кеш профилей токенов: повторный запуск через несколько минут не ходит в API
+        self.cache_ttl = int(os.getenv("DEXSCREENER_CACHE_TTL", "300"))
+        self._disk = None
+        if diskcache is not None and self.cache_ttl > 0:
+            try:
+                self._disk = diskcache.Cache(str(self.log_dir / "dex_cache"), size_limit=200_000_000)
+            except Exception as e:
+                logger.debug(f"[DEXSCREENER] Дисковый кеш недоступен: {e}")
         
         # Расширенный список User-Agent для ротации
         self.user_agents = [
@@ -156,18 +312,19 @@ class DexScreenerAPI:
         """
         url = f"{self.base_url}/{endpoint}"
         user_agent = random.choice(self.user_agents)
-        headers = {"User-Agent": user_agent}
+        headers = {"User-Agent": user_agent, "Accept-Encoding": "gzip, br", "Accept": "application/json"}
         
         for attempt in range(self.max_retries):
             try:
                 async with session.get(url, params=params, headers=headers, timeout=self.timeout) as response:
                     response.raise_for_status()
-                    return await response.json()
+                    return _json_loads(await response.read())
             except Exception as e:
                 if attempt == self.max_retries - 1:
                     self.logger.error(f"API error: {str(e)}")
                     return {}
-                await asyncio.sleep(2 ** attempt + random.random())
+                retry_after = e.headers.get("Retry-After") if isinstance(e, aiohttp.ClientResponseError) and e.headers else None
+                await asyncio.sleep(self._retry_delay(attempt, retry_after))
         
         return {}
 
@@ -185,14 +342,34 @@ class DexScreenerAPI:
                 }
                 resp = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
                 resp.raise_for_status()
-                return resp.json()
+                return _json_loads(resp.content)
             except Exception as e:
                 if attempt == self.max_retries - 1:
                     self.logger.error(f"API error: {str(e)}")
                     return {}
-                time.sleep(2 ** attempt + random.random())
+                response = getattr(e, "response", None)
+                retry_after = response.headers.get("Retry-After") if response is not None else None
+                time.sleep(self._retry_delay(attempt, retry_after))
         return {}
 
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Пауза перед повтором: экспонента, но не меньше Retry-After сервера (429/503).
+
+        Retry-After бывает числом секунд или HTTP-датой; значение ограничено self.max_retry_wait.
+        """
+        delay = float(2 ** attempt)
+        if retry_after:
+            try:
+                wait = float(retry_after)
+            except ValueError:
+                try:
+                    wait = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    wait = 0.0
+            delay = max(delay, min(wait, self.max_retry_wait))
+            return delay + random.random() * 0.25
+        return delay + random.random()
+
     def search(self, chain: str, query: str) -> List[Dict]:
         """Синхронный поиск по адресу/символу с фильтром по сети."""
         data = self._make_request("search", {"q": query, "chain": chain}) or {}
@@ -204,14 +381,19 @@ class DexScreenerAPI:
         Примечание: актуальный endpoint tokens/{tokenAddress} (без chain в пути).
         Фильтруем по chain_id при наличии.
         """
+        key = self._cache_key(chain_id, token_address)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
         data = self._make_request(f"tokens/{token_address}") or {}
         pairs = data.get("pairs", [])
         if chain_id:
-            pairs = [p for p in pairs if (p.get('chainId') or '').lower() == chain_id.lower()]
-        if not pairs:
-            return {}
+            cid = chain_id.lower()
+            pairs = [p for p in pairs if (p.get('chainId') or '').lower() == cid]
         # Выбираем пару с максимальной ликвидностью
-        return max(pairs, key=lambda p: float(p.get("liquidity", {}).get("usd", 0) or 0))
+        best = _best_by_liquidity(pairs)
+        self._cache_set(key, best)
+        return best
 
     def get_pair_details(self, chain_id: str, pair_address: str) -> Dict:
         """Возвращает детали конкретной пары."""
@@ -219,46 +401,165 @@ class DexScreenerAPI:
         pairs = data.get("pairs", [])
         return pairs[0] if pairs else {}
 
+    @staticmethod
+    def _cache_key(chain_id: str, token_address: str) -> str:
+        return f"pair:{(chain_id or '').lower()}:{(token_address or '').lower()}"
+
+    def _cache_get(self, key: str) -> Optional[Dict]:
+        """Читает пару из дискового кеша (None при промахе или отключенном кеше)."""
+        if self._disk is None:
+            return None
+        try:
+            return self._disk.get(key)
+        except Exception:
+            return None
+
+    def _cache_set(self, key: str, pair: Dict) -> None:
+        """Сохраняет непустую пару в дисковый кеш с TTL."""
+        if self._disk is None or not pair:
+            return
+        try:
+            self._disk.set(key, pair, expire=self.cache_ttl)
+        except Exception as e:
+            logger.debug(f"[DEXSCREENER] Не удалось записать кеш {key}: {e}")
+
     async def get_best_pair_async(self, chain_id: str, token_address: str) -> Dict:
-        """Асинхронно получает лучшую по ликвидности пару токена."""
+        """Асинхронно получает лучшую по ликвидности пару токена.
+
+        Одновременные вызовы для одного и того же токена объединяются в один HTTP-запрос.
+        """
+        key = self._cache_key(chain_id, token_address)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            pair = await self._fetch_best_pair(key, chain_id, token_address)
+            fut.set_result(pair)
+            return pair
+        except asyncio.CancelledError:
+            # _fetch_best_pair сам гасит ошибки сети; сюда попадаем только при отмене
+            fut.cancel()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _fetch_best_pair(self, key: str, chain_id: str, token_address: str) -> Dict:
+        """Загружает лучшую пару токена из API и кладёт её в дисковый кеш."""
         try:
             async with aiohttp.ClientSession() as session:
                 data = await self._make_async_request(session, f"tokens/{token_address}")
                 pairs = data.get("pairs", []) if data else []
                 if chain_id:
-                    pairs = [p for p in pairs if (p.get('chainId') or '').lower() == chain_id.lower()]
-                if not pairs:
-                    return {}
-                return max(pairs, key=lambda p: float(p.get("liquidity", {}).get("usd", 0) or 0))
+                    cid = chain_id.lower()
+                    pairs = [p for p in pairs if (p.get('chainId') or '').lower() == cid]
+                best = _best_by_liquidity(pairs)
+                self._cache_set(key, best)
+                return best
         except Exception:
             return {}
 
-    def derive_signals_from_pair(self, pair: Dict) -> Dict[str, Any]:
-        """Извлекает сигналы безопасности и метрики из объекта пары DexScreener."""
-        if not pair:
-            return {"found": False, "warnings": ["Пара не найдена"], "scores": {}, "metrics": {}}
+    def derive_signals_batch(self, pairs: List[Dict], now_ts: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """Векторный расчет метрик и нормализованных скоров для списка пар.
 
-        price_change = pair.get("priceChange", {}) or {}
-        liquidity = pair.get("liquidity", {}) or {}
-        volume = pair.get("volume", {}) or {}
-        txns = pair.get("txns", {}) or {}
-        info = pair.get("info", {}) or {}
+        Возвращает массивы той же длины, что и pairs: метрики (liquidity_usd, volume_24h,
+        price_change_h1/h6/h24, age_hours - NaN без даты создания пула, vol_liq_ratio) и скоры
+        (dex_trust, liquidity_score, volume_score, stability_score, age_score, metadata_score).
+
+        Args:
+            pairs: Объекты пар DexScreener
+            now_ts: Текущее время (unix, секунды); по умолчанию читается один раз на весь пакет
+        """
+        n = len(pairs)
+        if now_ts is None:
+            now_ts = time.time()
+
+        def column(section: str, key: str) -> np.ndarray:
+            return np.fromiter(
+                (float((p.get(section) or {}).get(key) or 0) for p in pairs),
+                dtype=np.float64, count=n
+            )
+
+        liq = column("liquidity", "usd")
+        vol = column("volume", "h24")
+        created_ms = np.fromiter((float(p.get("pairCreatedAt") or 0) for p in pairs), dtype=np.float64, count=n)
+        dex_ids = [(p.get("dexId") or "").lower() for p in pairs]
+
+        has_age = created_ms > 0
+        age_hours = np.where(has_age, np.round((now_ts - created_ms / 1000) / 3600, 2), np.nan)
+        vol_liq_ratio = np.divide(vol, liq, out=np.zeros(n), where=liq > 0)
 
-        liquidity_usd = float(liquidity.get("usd", 0) or 0)
-        volume_24h = float(volume.get("h24", 0) or 0)
-        h1 = float(price_change.get("h1", 0) or 0)
-        h6 = float(price_change.get("h6", 0) or 0)
-        h24 = float(price_change.get("h24", 0) or 0)
-        pair_created_ms = pair.get("pairCreatedAt") or 0
-        age_hours = round((datetime.now() - datetime.fromtimestamp((pair_created_ms or 0) / 1000)).total_seconds() / 3600, 2) if pair_created_ms else None
-        dex_id = (pair.get("dexId") or "").lower()
+        dex_trust = np.fromiter(
+            (1.0 if d in _TRUSTED_DEX else 0.6 if d else 0.5 for d in dex_ids),
+            dtype=np.float64, count=n
+        )
+        metadata = np.fromiter(
+            (min(1.0, bool((p.get("info") or {}).get("websites")) + bool((p.get("info") or {}).get("socials"))) for p in pairs),
+            dtype=np.float64, count=n
+        )
 
-        # Доверие к DEX
-        trusted_dex = {"uniswap", "sushiswap", "pancakeswap", "raydium", "quickswap", "jupiter", "syncswap"}
-        dex_trust = 1.0 if dex_id in trusted_dex else 0.6 if dex_id else 0.5
+        return {
+            "liquidity_usd": liq,
+            "volume_24h": vol,
+            "price_change_h1": column("priceChange", "h1"),
+            "price_change_h6": column("priceChange", "h6"),
+            "price_change_h24": column("priceChange", "h24"),
+            "age_hours": age_hours,
+            "vol_liq_ratio": vol_liq_ratio,
+            "dex_trust": dex_trust,
+            "liquidity_score": np.minimum(1.0, liq / 100000.0),
+            "volume_score": np.minimum(1.0, vol / 50000.0),
+            "stability_score": np.clip(1.0 - np.abs(vol_liq_ratio - 1.0) / 3.0, 0.0, 1.0),
+            "age_score": np.where(has_age, np.clip(age_hours / (30 * 24), 0.0, 1.0), 0.0),
+            "metadata_score": metadata,
+        }
 
-        # Соотношение объем/ликвидность
-        vol_liq_ratio = (volume_24h / liquidity_usd) if liquidity_usd > 0 else 0.0
+    def derive_signals_from_pairs(self, pairs: List[Optional[Dict]], now_ts: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Сигналы безопасности и метрики для списка пар DexScreener (в порядке pairs).
+
+        Числовая часть считается одним вызовом derive_signals_batch, время читается один раз
+        на пакет; по каждой паре остается только сборка предупреждений.
+        """
+        if now_ts is None:
+            now_ts = time.time()
+        found = [pair for pair in pairs if pair]
+        columns = {key: values.tolist() for key, values in self.derive_signals_batch(found, now_ts).items()}
+        rows = iter(range(len(found)))
+
+        results = []
+        for pair in pairs:
+            if not pair:
+                results.append({"found": False, "warnings": ["Пара не найдена"], "scores": {}, "metrics": {}})
+                continue
+            i = next(rows)
+            results.append(self._signals_from_row(pair, {key: values[i] for key, values in columns.items()}))
+        return results
+
+    def derive_signals_from_pair(self, pair: Dict, now_ts: Optional[float] = None) -> Dict[str, Any]:
+        """Извлекает сигналы безопасности и метрики из объекта пары DexScreener.
+
+        Обертка над derive_signals_from_pairs для одной пары.
+
+        Args:
+            pair: Объект пары DexScreener
+            now_ts: Текущее время (unix, секунды)
+        """
+        return self.derive_signals_from_pairs([pair], now_ts)[0]
+
+    @staticmethod
+    def _signals_from_row(pair: Dict, row: Dict[str, float]) -> Dict[str, Any]:
+        """Предупреждения, метрики и скоры одной пары по ее строке из derive_signals_batch."""
+        txns = pair.get("txns", {}) or {}
+        info = pair.get("info", {}) or {}
+
+        liquidity_usd = row["liquidity_usd"]
+        h24 = row["price_change_h24"]
+        vol_liq_ratio = row["vol_liq_ratio"]
+        age_hours = None if row["age_hours"] != row["age_hours"] else row["age_hours"]  # NaN - нет даты создания
 
         # Транзакции за 24ч (если доступны)
         tx24 = txns.get("h24", {}) or {}
@@ -279,9 +580,9 @@ class DexScreenerAPI:
                 warnings.append("⚠️ Молодой пул (<7дней)")
 
         # Ликвидность
-        if liquidity_usd < 25000:
+        if liquidity_usd < _LIQ_CRIT:
             warnings.append(f"Критически низкая ликвидность (<$25K): ${liquidity_usd:,.2f}")
-        elif liquidity_usd < 100000:
+        elif liquidity_usd < _LIQ_LOW:
             warnings.append(f"Низкая ликвидность (<$100K): ${liquidity_usd:,.2f}")
 
         # Импульс цены
@@ -291,9 +592,9 @@ class DexScreenerAPI:
             warnings.append(f"Сильное падение 24ч: {h24:.2f}%")
 
         # Объем/ликвидность
-        if vol_liq_ratio > 2:
+        if vol_liq_ratio > _VOLLIQ_HI:
             warnings.append(f"Подозрительно высокое соотношение объем/ликвидность: {vol_liq_ratio:.2f}")
-        elif 0 < vol_liq_ratio < 0.05:
+        elif 0 < vol_liq_ratio < _VOLLIQ_LO:
             warnings.append(f"Очень низкое соотношение объем/ликвидность: {vol_liq_ratio:.2f}")
 
         # Транзакционная активность
@@ -309,27 +610,20 @@ class DexScreenerAPI:
         # Сводные метрики для скоринга
         metrics = {
             "liquidity_usd": liquidity_usd,
-            "volume_24h": volume_24h,
-            "price_change_h1": h1,
-            "price_change_h6": h6,
+            "volume_24h": row["volume_24h"],
+            "price_change_h1": row["price_change_h1"],
+            "price_change_h6": row["price_change_h6"],
             "price_change_h24": h24,
             "age_hours": age_hours,
             "vol_liq_ratio": vol_liq_ratio,
-            "dex_id": dex_id,
+            "dex_id": (pair.get("dexId") or "").lower(),
             "websites_count": len(websites),
             "socials_count": len(socials),
             "tx24_total": total_tx,
         }
 
         # Нормализованные скоры (0..1, где выше — лучше)
-        scores = {
-            "dex_trust": dex_trust,
-            "liquidity_score": min(1.0, liquidity_usd / 100000.0),
-            "volume_score": min(1.0, volume_24h / 50000.0),
-            "stability_score": max(0.0, min(1.0, 1.0 - abs(vol_liq_ratio - 1.0) / 3.0)),
-            "age_score": 0.0 if age_hours is None else max(0.0, min(1.0, age_hours / (30 * 24))),
-            "metadata_score": min(1.0, (len(websites) > 0) + (len(socials) > 0))
-        }
+        scores = {key: row[key] for key in _SIGNAL_SCORE_KEYS}
 
         return {
             "found": True,
@@ -366,107 +660,35 @@ class DexScreenerAPI:
         logger.info("[DEXSCREENER] Получение последних профилей токенов")
         try:
             # Используем тестовый список сетей и токенов если включен тестовый режим
-            networks = get_test_networks() if self.test_mode else {
-                'solana': [
-                    'SOL', 'BONK', 'RAY', 'SRM', 'MNGO', 'SAMO', 'ORCA', 'ATLAS', 'POLIS', 'GST', 'SBR',
-                    'JUP', 'PYTH', 'BOME', 'WIF', 'MYRO', 'POPCAT', 'WEN', 'BOME', 'SLERF', 'BOME', 'BOME',
-                    'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME',
-                    'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME',
-                    'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME'
-                ],
-                'base': [
-                    'ETH', 'WETH', 'LINK', 'UNI', 'AAVE', 'COMP', 'MKR', 'SNX', 'YFI', 'CRV',
-                    'USDC', 'USDT', 'DAI', 'WBTC', 'WETH', 'BAL', 'BOND', 'DPI', 'ENJ', 'GRT',
-                    'KNC', 'LDO', 'LINK', 'LRC', 'MKR', 'NMR', 'OXT', 'PAX', 'REN', 'REP',
-                    'SUSHI', 'SXP', 'TUSD', 'UMA', 'UNI', 'USDT', 'WBTC', 'WETH', 'YFI', 'ZRX',
-                    'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME'
-                ],
-                'ethereum': [
-                    'ETH', 'WETH', 'LINK', 'UNI', 'AAVE', 'COMP', 'MKR', 'SNX', 'YFI', 'CRV',
-                    'SHIB', 'PEPE', 'DOGE', 'MATIC', 'AVAX', 'FTM', 'USDC', 'USDT', 'DAI', 'WBTC',
-                    'BAL', 'BAT', 'BOND', 'DPI', 'ENJ', 'GRT', 'KNC', 'LDO', 'LRC', 'NMR',
-                    'OXT', 'PAX', 'REN', 'REP', 'SUSHI', 'SXP', 'TUSD', 'UMA', 'ZRX', 'BOME',
-                    'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME',
-                    'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME'
-                ],
-                'bsc': [
-                    'BNB', 'CAKE', 'WETH', 'WBTC', 'LINK', 'UNI', 'AAVE', 'COMP', 'MKR', 'SNX',
-                    'YFI', 'CRV', 'SHIB', 'PEPE', 'DOGE', 'USDC', 'USDT', 'DAI', 'BUSD', 'TUSD',
-                    'BAL', 'BAT', 'BOND', 'DPI', 'ENJ', 'GRT', 'KNC', 'LDO', 'LRC', 'NMR',
-                    'OXT', 'PAX', 'REN', 'REP', 'SUSHI', 'SXP', 'UMA', 'ZRX', 'BOME', 'BOME',
-                    'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME',
-                    'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME'
-                ],
-                'arbitrum': [
-                    'ETH', 'WETH', 'WBTC', 'LINK', 'UNI', 'AAVE', 'COMP', 'MKR', 'SNX', 'YFI',
-                    'CRV', 'MATIC', 'AVAX', 'FTM', 'USDC', 'USDT', 'DAI', 'BAL', 'BAT', 'BOND',
-                    'DPI', 'ENJ', 'GRT', 'KNC', 'LDO', 'LRC', 'NMR', 'OXT', 'PAX', 'REN',
-                    'REP', 'SUSHI', 'SXP', 'TUSD', 'UMA', 'ZRX', 'BOME', 'BOME', 'BOME', 'BOME',
-                    'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME'
-                ],
-                'polygon': [
-                    'MATIC', 'WETH', 'WBTC', 'LINK', 'UNI', 'AAVE', 'COMP', 'MKR', 'SNX', 'YFI',
-                    'CRV', 'SHIB', 'PEPE', 'DOGE', 'USDC', 'USDT', 'DAI', 'BAL', 'BAT', 'BOND',
-                    'DPI', 'ENJ', 'GRT', 'KNC', 'LDO', 'LRC', 'NMR', 'OXT', 'PAX', 'REN',
-                    'REP', 'SUSHI', 'SXP', 'TUSD', 'UMA', 'ZRX', 'BOME', 'BOME', 'BOME', 'BOME',
-                    'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME'
-                ],
-                'optimism': [
-                    'ETH', 'WETH', 'WBTC', 'LINK', 'UNI', 'AAVE', 'COMP', 'MKR', 'SNX', 'YFI',
-                    'CRV', 'MATIC', 'AVAX', 'FTM', 'USDC', 'USDT', 'DAI', 'BAL', 'BAT', 'BOND',
-                    'DPI', 'ENJ', 'GRT', 'KNC', 'LDO', 'LRC', 'NMR', 'OXT', 'PAX', 'REN',
-                    'REP', 'SUSHI', 'SXP', 'TUSD', 'UMA', 'ZRX', 'BOME', 'BOME', 'BOME', 'BOME',
-                    'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME'
-                ],
-                'avalanche': [
-                    'AVAX', 'WETH', 'WBTC', 'LINK', 'UNI', 'AAVE', 'COMP', 'MKR', 'SNX', 'YFI',
-                    'CRV', 'SHIB', 'PEPE', 'DOGE', 'USDC', 'USDT', 'DAI', 'BAL', 'BAT', 'BOND',
-                    'DPI', 'ENJ', 'GRT', 'KNC', 'LDO', 'LRC', 'NMR', 'OXT', 'PAX', 'REN',
-                    'REP', 'SUSHI', 'SXP', 'TUSD', 'UMA', 'ZRX', 'BOME', 'BOME', 'BOME', 'BOME',
-                    'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME'
-                ],
-                'fantom': [
-                    'FTM', 'WETH', 'WBTC', 'LINK', 'UNI', 'AAVE', 'COMP', 'MKR', 'SNX', 'YFI',
-                    'CRV', 'MATIC', 'AVAX', 'USDC', 'USDT', 'DAI', 'BAL', 'BAT', 'BOND', 'DPI',
-                    'ENJ', 'GRT', 'KNC', 'LDO', 'LRC', 'NMR', 'OXT', 'PAX', 'REN', 'REP',
-                    'SUSHI', 'SXP', 'TUSD', 'UMA', 'ZRX', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME',
-                    'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME'
-                ],
-                'cronos': [
-                    'CRO', 'WETH', 'WBTC', 'LINK', 'UNI', 'AAVE', 'COMP', 'MKR', 'SNX', 'YFI',
-                    'CRV', 'SHIB', 'PEPE', 'DOGE', 'USDC', 'USDT', 'DAI', 'BAL', 'BAT', 'BOND',
-                    'DPI', 'ENJ', 'GRT', 'KNC', 'LDO', 'LRC', 'NMR', 'OXT', 'PAX', 'REN',
-                    'REP', 'SUSHI', 'SXP', 'TUSD', 'UMA', 'ZRX', 'BOME', 'BOME', 'BOME', 'BOME',
-                    'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME', 'BOME'
-                ]
-            }
+            networks = get_test_networks() if self.test_mode else _default_networks()
             
-            all_pairs = []
             total_requests = sum(len(queries) for queries in networks.values())
             logger.info(f"[DEXSCREENER] Всего запросов: {total_requests}")
             
-            # Создаем прогресс-бар
-            pbar = tqdm(total=total_requests, desc="Поиск токенов", unit="запрос")
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            
+            async def fetch(session: aiohttp.ClientSession, network: str, query: str) -> List[Dict]:
+                async with semaphore:
+                    try:
+                        # Добавляем случайную задержку от 1 до 3 секунд
+                        await asyncio.sleep(random.uniform(1, 3))
+                        
+                        pairs = await self._fetch_pairs(session, network, query)
+                        if pairs:
+                            self.logger.info(f"Найдено {len(pairs)} пар для '{query}' в сети {network}")
+                        return pairs
+                    except Exception as e:
+                        self.logger.error(f"Ошибка при обработке '{query}' в сети {network}: {str(e)}")
+                        return []
             
             async with aiohttp.ClientSession() as session:
-                # Обрабатываем сети последовательно
-                for network, queries in networks.items():
-                    # Обрабатываем токены в каждой сети с задержкой
-                    for query in queries:
-                        try:
-                            # Добавляем случайную задержку от 1 до 3 секунд
-                            await asyncio.sleep(random.uniform(1, 3))
-                            
-                            pairs = await self._fetch_pairs(session, network, query)
-                            if pairs:
-                                self.logger.info(f"Найдено {len(pairs)} пар для '{query}' в сети {network}")
-                                all_pairs.extend(pairs)
-                            pbar.update(1)
-                        except Exception as e:
-                            self.logger.error(f"Ошибка при обработке '{query}' в сети {network}: {str(e)}")
-                            pbar.update(1)
+                # Запросы выполняются конкурентно, прогресс обновляется из одной корутины
+                results = await atqdm.gather(
+                    *(fetch(session, network, query) for network, queries in networks.items() for query in queries),
+                    desc="Поиск токенов", total=total_requests, unit="запрос"
+                )
             
-            pbar.close()
+            all_pairs = [pair for pairs in results for pair in pairs]
             
             if not all_pairs:
                 self.logger.warning("Не найдено ни одной пары")
@@ -501,25 +723,24 @@ class DexScreenerAPI:
     
     def _log_token_analysis(self, token: Dict, profile: Dict, reason: str = None):
         """
-        Логирует краткий анализ токена в файл
+        Логирует краткий анализ токена в файл (одной записью)
         """
-        self.file_logger.info("\n" + "=" * 30)
-        self.file_logger.info(f"Токен: {token['symbol']} ({token['address'][:8]}...)")
-        self.file_logger.info(f"Сеть: {profile['chainId']}")
+        if not self.file_logger.isEnabledFor(logging.INFO):
+            return
         
         # Ключевые показатели
         price_change_24h = float(profile.get("priceChange", {}).get("h24", 0))
         liquidity_usd = float(profile.get("liquidity", {}).get("usd", 0))
         volume_24h = float(profile.get("volume", {}).get("h24", 0))
         
-        self.file_logger.info(f"Рост 24ч: {price_change_24h:.2f}% | Ликвидность: ${liquidity_usd:.2f} | Объем: ${volume_24h:.2f}")
-        
-        if reason:
-            self.file_logger.info(f"❌ Отклонен: {reason}")
-        else:
-            self.file_logger.info("✅ Принят")
-        
-        self.file_logger.info("=" * 30)
+        self.file_logger.info("\n".join((
+            "\n" + "=" * 30,
+            f"Токен: {token['symbol']} ({token['address'][:8]}...)",
+            f"Сеть: {profile['chainId']}",
+            f"Рост 24ч: {price_change_24h:.2f}% | Ликвидность: ${liquidity_usd:.2f} | Объем: ${volume_24h:.2f}",
+            f"❌ Отклонен: {reason}" if reason else "✅ Принят",
+            "=" * 30,
+        )))
 
     def _analyze_rocket(self, token: Dict) -> str:
         """
@@ -566,8 +787,8 @@ class DexScreenerAPI:
         growth_category = "высокий" if price_change_24h > 50 else "умеренный" if price_change_24h > 20 else "низкий"
         risk_category = "низкий" if risk_score < 30 else "средний" if risk_score < 60 else "высокий"
         
-        # Формируем анализ
-        analysis = f"""
+        # Формируем анализ: части собираются в список и склеиваются один раз
+        parts = [f"""
 # Анализ ракеты: {token['symbol']} ({token['network']})
 
 ## Ключевые показатели:
@@ -587,64 +808,71 @@ class DexScreenerAPI:
 - **Скор импульса:** {momentum_score:.1f}%
 
 ## Анализ:
-"""
+"""]
+
         # Добавляем специфический анализ в зависимости от показателей
         if volume_to_liquidity_ratio < 0.1:
-            analysis += "- Низкое соотношение объема к ликвидности указывает на возможную низкую реальную торговую активность\n"
+            parts.append("- Низкое соотношение объема к ликвидности указывает на возможную низкую реальную торговую активность\n")
         elif volume_to_liquidity_ratio > 1:
-            analysis += "- Высокое соотношение объема к ликвидности указывает на активную торговлю\n"
+            parts.append("- Высокое соотношение объема к ликвидности указывает на активную торговлю\n")
             
         if age_days < 7:
-            analysis += "- Новый токен с высоким потенциалом роста\n"
+            parts.append("- Новый токен с высоким потенциалом роста\n")
         elif age_days < 30:
-            analysis += "- Относительно новый токен\n"
+            parts.append("- Относительно новый токен\n")
         else:
-            analysis += "- Зрелый токен с установленной историей\n"
+            parts.append("- Зрелый токен с установленной историей\n")
             
         if liquidity_usd < 10000:
-            analysis += "- Низкая ликвидность создает риск высокого проскальзывания\n"
+            parts.append("- Низкая ликвидность создает риск высокого проскальзывания\n")
         elif liquidity_usd > 100000:
-            analysis += "- Высокая ликвидность обеспечивает стабильность торговли\n"
+            parts.append("- Высокая ликвидность обеспечивает стабильность торговли\n")
             
         if price_usd < 0.0001:
-            analysis += "- Очень низкая цена может указывать на высокую волатильность\n"
+            parts.append("- Очень низкая цена может указывать на высокую волатильность\n")
         elif price_usd > 1:
-            analysis += "- Высокая цена может ограничивать потенциал роста\n"
+            parts.append("- Высокая цена может ограничивать потенциал роста\n")
 
-        analysis += "\n## Риски:\n"
+        parts.append("\n## Риски:\n")
         if liquidity_usd < 10000:
-            analysis += "- Риск высокого проскальзывания при входе/выходе\n"
+            parts.append("- Риск высокого проскальзывания при входе/выходе\n")
         if volume_24h < 10000:
-            analysis += "- Возможность манипуляций на низкообъемном рынке\n"
+            parts.append("- Возможность манипуляций на низкообъемном рынке\n")
         if price_change_24h > 100:
-            analysis += "- Высокий риск отката после резкого роста\n"
+            parts.append("- Высокий риск отката после резкого роста\n")
         if age_days < 7:
-            analysis += "- Риск нестабильности нового токена\n"
+            parts.append("- Риск нестабильности нового токена\n")
             
-        analysis += "\n## Рекомендации:\n"
+        parts.append("\n## Рекомендации:\n")
         if risk_score < 30:
-            analysis += "- Безопасный для средних и крупных позиций\n"
-            analysis += "- Рекомендуемый размер позиции: 5-10% от портфеля\n"
+            parts.extend((
+                "- Безопасный для средних и крупных позиций\n",
+                "- Рекомендуемый размер позиции: 5-10% от портфеля\n",
+            ))
         elif risk_score < 60:
-            analysis += "- Подходит для небольших позиций\n"
-            analysis += "- Рекомендуемый размер позиции: 2-5% от портфеля\n"
+            parts.extend((
+                "- Подходит для небольших позиций\n",
+                "- Рекомендуемый размер позиции: 2-5% от портфеля\n",
+            ))
         else:
-            analysis += "- Рекомендуется только для очень небольших спекулятивных позиций\n"
-            analysis += "- Рекомендуемый размер позиции: до 1% от портфеля\n"
+            parts.extend((
+                "- Рекомендуется только для очень небольших спекулятивных позиций\n",
+                "- Рекомендуемый размер позиции: до 1% от портфеля\n",
+            ))
             
         # Добавляем рекомендации по входу
-        analysis += "\n## Стратегия входа:\n"
+        parts.append("\n## Стратегия входа:\n")
         if momentum > 0:
-            analysis += "- Токен показывает положительный импульс, можно рассмотреть вход\n"
+            parts.append("- Токен показывает положительный импульс, можно рассмотреть вход\n")
         else:
-            analysis += "- Токен показывает отрицательный импульс, лучше дождаться разворота\n"
+            parts.append("- Токен показывает отрицательный импульс, лучше дождаться разворота\n")
             
         if price_change_24h > 50:
-            analysis += "- Высокий рост может привести к откату, лучше дождаться коррекции\n"
+            parts.append("- Высокий рост может привести к откату, лучше дождаться коррекции\n")
         elif price_change_24h < 20:
-            analysis += "- Умеренный рост позволяет рассмотреть вход\n"
+            parts.append("- Умеренный рост позволяет рассмотреть вход\n")
             
-        return analysis
+        return "".join(parts)
 
     async def find_rocket_tokens(self, max_age_hours: Optional[int] = None) -> List[Dict]:
         """
@@ -667,8 +895,11 @@ class DexScreenerAPI:
         # Получаем профили токенов
         profiles = await self.get_latest_token_profiles_async()
         
-        rockets = []
-        seen_tokens = set()
+        # Одно чтение часов на весь разбор: возраст пар и отметки времени в логах
+        now = datetime.now()
+        now_ts = now.timestamp()
+        now_str = now.strftime('%Y-%m-%d %H:%M:%S')
+        
         filtered_stats = {
             "total": len(profiles),
             "duplicates": 0,
@@ -679,193 +910,200 @@ class DexScreenerAPI:
             "failed_price": 0,
             "failed_liquidity": 0,
             "failed_volume": 0,
-            "stablecoins": 0
+            "stablecoins": 0,
+            "symbol_duplicates": 0
         }
 
-        # Список известных стейблкоинов
-        stablecoins = {
-            'USDT', 'USDC', 'DAI', 'BUSD', 'TUSD', 'USDH', 'USDK', 'USDN', 'USDX', 
-            'UST', 'FRAX', 'LUSD', 'SUSD', 'GUSD', 'HUSD', 'OUSD', 'CUSD', 'USDJ'
-        }
+        # Извлекаем нужные поля один раз, дальше фильтры считаются по колонкам;
+        # большие выборки разбираются по частям в нескольких процессах
+        if len(profiles) > self.parallel_threshold:
+            workers = os.cpu_count() or 1
+            step = -(-len(profiles) // workers)
+            offsets = range(0, len(profiles), step)
+            loop = asyncio.get_running_loop()
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parts = await asyncio.gather(*(
+                    loop.run_in_executor(executor, _extract_profile_fields, profiles[i:i + step]) for i in offsets
+                ))
+            kept_idx, records, skipped = [], [], 0
+            for offset, (part_idx, part_records, part_skipped) in zip(offsets, parts):
+                kept_idx.extend(offset + i for i in part_idx)
+                records.extend(part_records)
+                skipped += part_skipped
+        else:
+            kept_idx, records, skipped = _extract_profile_fields(profiles)
+        kept_profiles = [profiles[i] for i in kept_idx]
+        if skipped:
+            self.logger.error(f"Пропущено профилей без адреса токена: {skipped}")
 
-        for profile in profiles:
-            try:
-                token = profile["baseToken"]
-                token_address = token["address"]
-                token_symbol = token["symbol"].upper()
-                
-                if token_address in seen_tokens:
-                    filtered_stats["duplicates"] += 1
-                    self._log_token_analysis(token, profile, "Дубликат")
-                    continue
-                
-                # Фильтруем стейблкоины
-                if token_symbol in stablecoins:
-                    filtered_stats["stablecoins"] += 1
-                    self._log_token_analysis(token, profile, "Стейблкоин")
-                    continue
-                    
-                price_change_1h = float(profile.get("priceChange", {}).get("h1", 0))
-                price_change_24h = float(profile.get("priceChange", {}).get("h24", 0))
-                liquidity_usd = float(profile.get("liquidity", {}).get("usd", 0))
-                volume_24h = float(profile.get("volume", {}).get("h24", 0))
-
-                # Проверяем каждый критерий отдельно
-                if not (5 <= price_change_24h <= 1000):
-                    filtered_stats["failed_price"] += 1
-                    self._log_token_analysis(token, profile, f"Рост {price_change_24h:.2f}% вне диапазона 5-1000%")
-                    continue
-
-                if liquidity_usd < 250:
-                    filtered_stats["failed_liquidity"] += 1
-                    self._log_token_analysis(token, profile, f"Ликвидность ${liquidity_usd:.2f} < $250")
-                    continue
-
-                if volume_24h < 100:
-                    filtered_stats["failed_volume"] += 1
-                    self._log_token_analysis(token, profile, f"Объем ${volume_24h:.2f} < $100")
-                    continue
-                
-                filtered_stats["passed"] += 1
-                self.logger.info(f"Найдена ракета: {token['symbol']} (рост 24ч: {price_change_24h:.2f}%, ликвидность ${liquidity_usd:.2f})")
-                
+        df = pd.DataFrame.from_records(
+            records, columns=["address", "symbol", "p1h", "p24h", "liq", "vol", "created"]
+        )
+        for col in ("p1h", "p24h", "liq", "vol", "created"):
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0.0).astype(float)
+
+        stable = df["symbol"].isin(STABLECOINS)
+        price_ok = df["p24h"].between(5, 1000)
+        liq_ok = df["liq"] >= 250
+        vol_ok = df["vol"] >= 100
+        ok = ~stable & price_ok & liq_ok & vol_ok
+        # Дубликат — адрес, который уже был принят выше по списку
+        ok_count = ok.astype(int)
+        duplicate = (ok_count.groupby(df["address"]).cumsum() - ok_count) > 0
+
+        reasons = np.select(
+            [duplicate, stable, ~price_ok, ~liq_ok, ~vol_ok],
+            ["duplicates", "stablecoins", "failed_price", "failed_liquidity", "failed_volume"],
+            default="passed",
+        )
+        filtered_stats.update({k: int(v) for k, v in pd.Series(reasons, dtype=object).value_counts().items()})
+
+        age_hours = ((now_ts * 1000 - df["created"]) / 3_600_000).round(2)
+
+        # Одна версия на символ — с наибольшей ликвидностью (дубликаты в разных пулах/сетях)
+        best_by_symbol: Dict[str, Dict] = {}
+        for profile, reason, p1h, p24h, liq, vol, age in zip(
+            kept_profiles, reasons, df["p1h"], df["p24h"], df["liq"], df["vol"], age_hours
+        ):
+            token = profile["baseToken"]
+            if reason == "duplicates":
+                self._log_token_analysis(token, profile, "Дубликат")
+            elif reason == "stablecoins":
+                self._log_token_analysis(token, profile, "Стейблкоин")
+            elif reason == "failed_price":
+                self._log_token_analysis(token, profile, f"Рост {p24h:.2f}% вне диапазона 5-1000%")
+            elif reason == "failed_liquidity":
+                self._log_token_analysis(token, profile, f"Ликвидность ${liq:.2f} < $250")
+            elif reason == "failed_volume":
+                self._log_token_analysis(token, profile, f"Объем ${vol:.2f} < $100")
+            else:
+                self.logger.info(f"Найдена ракета: {token['symbol']} (рост 24ч: {p24h:.2f}%, ликвидность ${liq:.2f})")
                 rocket = {
                     "symbol": token["symbol"],
-                    "name": token["name"],
-                    "address": token_address,
-                    "network": profile["chainId"],
-                    "age_hours": round((datetime.now() - datetime.fromtimestamp(profile.get("pairCreatedAt", 0) / 1000)).total_seconds() / 3600, 2),
-                    "price_change_1h": price_change_1h,
-                    "price_change_24h": price_change_24h,
-                    "liquidity_usd": liquidity_usd,
-                    "volume_24h": volume_24h,
+                    "name": token.get("name"),
+                    "address": token["address"],
+                    "network": profile.get("chainId"),
+                    "age_hours": float(age),
+                    "price_change_1h": float(p1h),
+                    "price_change_24h": float(p24h),
+                    "liquidity_usd": float(liq),
+                    "volume_24h": float(vol),
                     "profile": profile
                 }
-                rockets.append(rocket)
-                seen_tokens.add(token_address)
-                
+                prev = best_by_symbol.get(rocket["symbol"])
+                if prev is None:
+                    best_by_symbol[rocket["symbol"]] = rocket
+                else:
+                    filtered_stats["symbol_duplicates"] += 1
+                    if rocket["liquidity_usd"] > prev["liquidity_usd"]:
+                        best_by_symbol[rocket["symbol"]] = rocket
                 # Логируем успешный токен
                 self._log_token_analysis(token, profile)
-                
-            except Exception as e:
-                self.logger.error(f"Ошибка при обработке токена {token.get('symbol', 'unknown')}: {str(e)}")
-                continue
+
+        rockets = list(best_by_symbol.values())
 
         # Логируем подробную статистику фильтрации
-        self.file_logger.info("\n=== Подробная статистика фильтрации ===")
-        self.file_logger.info(f"Всего токенов: {filtered_stats['total']}")
-        self.file_logger.info(f"Дубликатов: {filtered_stats['duplicates']}")
-        self.file_logger.info(f"Стейблкоинов: {filtered_stats['stablecoins']}")
-        self.file_logger.info(f"Не прошли по росту цены: {filtered_stats['failed_price']}")
-        self.file_logger.info(f"Не прошли по ликвидности: {filtered_stats['failed_liquidity']}")
-        self.file_logger.info(f"Не прошли по объему: {filtered_stats['failed_volume']}")
-        self.file_logger.info(f"Принято: {filtered_stats['passed']}")
-        self.file_logger.info(f"Время: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        self.file_logger.info("=" * 30)
-
-        # После нахождения ракет, записываем подробный анализ
-        if rockets:
-            self.rockets_logger.info("\n=== Подробный анализ найденных ракет ===")
-            self.rockets_logger.info(f"Время анализа: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            self.rockets_logger.info(f"Всего найдено ракет: {len(rockets)}")
-            self.rockets_logger.info("=" * 50)
-            
-            # Сортируем ракеты по росту цены
-            rockets.sort(key=lambda x: x['price_change_24h'], reverse=True)
-            
+        self.file_logger.info("\n".join((
+            "\n=== Подробная статистика фильтрации ===",
+            f"Всего токенов: {filtered_stats['total']}",
+            f"Дубликатов: {filtered_stats['duplicates']}",
+            f"Стейблкоинов: {filtered_stats['stablecoins']}",
+            f"Не прошли по росту цены: {filtered_stats['failed_price']}",
+            f"Не прошли по ликвидности: {filtered_stats['failed_liquidity']}",
+            f"Не прошли по объему: {filtered_stats['failed_volume']}",
+            f"Принято: {filtered_stats['passed']}",
+            f"Дубликатов по символу (оставлена версия с большей ликвидностью): {filtered_stats['symbol_duplicates']}",
+            f"Время: {now_str}",
+            "=" * 30,
+        )))
+
+        # Сортируем ракеты по росту цены
+        rockets.sort(key=_by_p24, reverse=True)
+
+        # После нахождения ракет, записываем подробный анализ (секции пишутся одной записью)
+        if rockets and self.rockets_logger.isEnabledFor(logging.INFO):
             # Берем только топ-10 ракет для подробного анализа
             top_rockets = rockets[:10]
             
+            lines = [
+                "\n=== Подробный анализ найденных ракет ===",
+                f"Время анализа: {now_str}",
+                f"Всего найдено ракет: {len(rockets)}",
+                "=" * 50,
+            ]
             for i, rocket in enumerate(top_rockets, 1):
-                self.rockets_logger.info(f"\n# Ракета #{i}")
-                self.rockets_logger.info(self._analyze_rocket(rocket))
-                self.rockets_logger.info("=" * 50)
+                lines += (f"\n# Ракета #{i}", self._analyze_rocket(rocket), "=" * 50)
+            self.rockets_logger.info("\n".join(lines))
             
             # Добавляем сравнительный анализ только для топ-10
-            self.rockets_logger.info("\n## Сравнительный анализ топ-10 ракет")
+            lines = ["\n## Сравнительный анализ топ-10 ракет"]
             
-            # Сортируем по разным метрикам (только топ-10)
-            self.rockets_logger.info("\n### По ликвидности:")
-            rockets_by_liquidity = sorted(top_rockets, key=lambda x: x['liquidity_usd'], reverse=True)
-            for i, rocket in enumerate(rockets_by_liquidity, 1):
-                self.rockets_logger.info(f"{i}. {rocket['symbol']} - ${rocket['liquidity_usd']:,.2f}")
+            # Метрики топ-10 в одном структурированном массиве: порядок и категории считаются векторно
+            arr = np.array(
+                [(r['liquidity_usd'], r['volume_24h'], r['price_change_24h']) for r in top_rockets],
+                dtype=[('liq', 'f8'), ('vol', 'f8'), ('p24', 'f8')]
+            )
             
-            self.rockets_logger.info("\n### По объему торгов:")
-            rockets_by_volume = sorted(top_rockets, key=lambda x: x['volume_24h'], reverse=True)
-            for i, rocket in enumerate(rockets_by_volume, 1):
-                self.rockets_logger.info(f"{i}. {rocket['symbol']} - ${rocket['volume_24h']:,.2f}")
+            # Сортируем по разным метрикам (только топ-10); stable сохраняет порядок равных как sorted()
+            lines.append("\n### По ликвидности:")
+            for i, idx in enumerate(np.argsort(-arr['liq'], kind='stable'), 1):
+                rocket = top_rockets[idx]
+                lines.append(f"{i}. {rocket['symbol']} - ${rocket['liquidity_usd']:,.2f}")
             
-            self.rockets_logger.info("\n### По росту цены:")
-            rockets_by_growth = sorted(top_rockets, key=lambda x: x['price_change_24h'], reverse=True)
-            for i, rocket in enumerate(rockets_by_growth, 1):
-                self.rockets_logger.info(f"{i}. {rocket['symbol']} - {rocket['price_change_24h']:.2f}%")
+            lines.append("\n### По объему торгов:")
+            for i, idx in enumerate(np.argsort(-arr['vol'], kind='stable'), 1):
+                rocket = top_rockets[idx]
+                lines.append(f"{i}. {rocket['symbol']} - ${rocket['volume_24h']:,.2f}")
+            
+            lines.append("\n### По росту цены:")
+            for i, idx in enumerate(np.argsort(-arr['p24'], kind='stable'), 1):
+                rocket = top_rockets[idx]
+                lines.append(f"{i}. {rocket['symbol']} - {rocket['price_change_24h']:.2f}%")
+            self.rockets_logger.info("\n".join(lines))
             
             # Добавляем общие рекомендации
-            self.rockets_logger.info("\n## Общие рекомендации по портфелю:")
+            lines = ["\n## Общие рекомендации по портфелю:"]
             
             # Находим наиболее безопасные токены из топ-10
-            safe_rockets = [r for r in top_rockets if r['liquidity_usd'] > 100000 and r['volume_24h'] > 50000]
-            if safe_rockets:
-                self.rockets_logger.info("\n1. Наиболее безопасные для торговли:")
-                for rocket in safe_rockets:
-                    self.rockets_logger.info(f"   - {rocket['symbol']} (ликвидность: ${rocket['liquidity_usd']:,.2f})")
+            safe_mask = (arr['liq'] > 100000) & (arr['vol'] > 50000)
+            if safe_mask.any():
+                lines.append("\n1. Наиболее безопасные для торговли:")
+                for idx in np.flatnonzero(safe_mask):
+                    rocket = top_rockets[idx]
+                    lines.append(f"   - {rocket['symbol']} (ликвидность: ${rocket['liquidity_usd']:,.2f})")
             
             # Находим спекулятивные возможности из топ-10
-            spec_rockets = [r for r in top_rockets if r['price_change_24h'] > 50 and r['liquidity_usd'] > 10000]
-            if spec_rockets:
-                self.rockets_logger.info("\n2. Спекулятивные возможности:")
-                for rocket in spec_rockets:
-                    self.rockets_logger.info(f"   - {rocket['symbol']} (рост: {rocket['price_change_24h']:.2f}%)")
+            spec_mask = (arr['p24'] > 50) & (arr['liq'] > 10000)
+            if spec_mask.any():
+                lines.append("\n2. Спекулятивные возможности:")
+                for idx in np.flatnonzero(spec_mask):
+                    rocket = top_rockets[idx]
+                    lines.append(f"   - {rocket['symbol']} (рост: {rocket['price_change_24h']:.2f}%)")
             
             # Находим высокорисковые токены из топ-10
-            risky_rockets = [r for r in top_rockets if r['liquidity_usd'] < 10000 or r['volume_24h'] < 10000]
-            if risky_rockets:
-                self.rockets_logger.info("\n3. Высокорисковые токены:")
-                for rocket in risky_rockets:
-                    self.rockets_logger.info(f"   - {rocket['symbol']} (ликвидность: ${rocket['liquidity_usd']:,.2f}, объем: ${rocket['volume_24h']:,.2f})")
-            
-            # Добавляем рекомендации по распределению средств
-            self.rockets_logger.info("\n## Рекомендации по распределению средств:")
-            self.rockets_logger.info("1. Безопасные токены: 40-50% от выделенной суммы")
-            self.rockets_logger.info("2. Спекулятивные возможности: 30-40% от выделенной суммы")
-            self.rockets_logger.info("3. Высокорисковые токены: 10-20% от выделенной суммы")
+            risky_mask = (arr['liq'] < 10000) | (arr['vol'] < 10000)
+            if risky_mask.any():
+                lines.append("\n3. Высокорисковые токены:")
+                for idx in np.flatnonzero(risky_mask):
+                    rocket = top_rockets[idx]
+                    lines.append(f"   - {rocket['symbol']} (ликвидность: ${rocket['liquidity_usd']:,.2f}, объем: ${rocket['volume_24h']:,.2f})")
             
-            # Добавляем предупреждения
-            self.rockets_logger.info("\n## Важные предупреждения:")
-            self.rockets_logger.info("1. Всегда используйте стоп-лоссы")
-            self.rockets_logger.info("2. Не вкладывайте больше, чем готовы потерять")
-            self.rockets_logger.info("3. Диверсифицируйте риски между разными токенами")
-            self.rockets_logger.info("4. Следите за общим риском портфеля")
+            # Добавляем рекомендации по распределению средств и предупреждения
+            lines += (
+                "\n## Рекомендации по распределению средств:",
+                "1. Безопасные токены: 40-50% от выделенной суммы",
+                "2. Спекулятивные возможности: 30-40% от выделенной суммы",
+                "3. Высокорисковые токены: 10-20% от выделенной суммы",
+                "\n## Важные предупреждения:",
+                "1. Всегда используйте стоп-лоссы",
+                "2. Не вкладывайте больше, чем готовы потерять",
+                "3. Диверсифицируйте риски между разными токенами",
+                "4. Следите за общим риском портфеля",
+            )
+            self.rockets_logger.info("\n".join(lines))
 
         return rockets
 
-def filter_duplicate_tokens(tokens):
-    """
-    Фильтрует дубликаты токенов, оставляя только версию с наибольшей ликвидностью.
-    
-    Args:
-        tokens (list): Список токенов
-        
-    Returns:
-        list: Отфильтрованный список токенов без дубликатов
-    """
-    # Создаем словарь для хранения токенов с максимальной ликвидностью
-    unique_tokens = {}
-    
-    for token in tokens:
-        symbol = token['symbol']
-        liquidity = token['liquidity_usd']
-        
-        # Если токен с таким символом уже есть, сравниваем ликвидность
-        if symbol in unique_tokens:
-            if liquidity > unique_tokens[symbol]['liquidity_usd']:
-                unique_tokens[symbol] = token
-        else:
-            unique_tokens[symbol] = token
-    
-    # Возвращаем список уникальных токенов
-    return list(unique_tokens.values())
-
 def get_test_networks():
     """
     Возвращает сокращенный список сетей и токенов для тестового режима
@@ -890,7 +1128,7 @@ def get_test_config():
         "networks": list(get_test_networks().keys())
     }
 
-def test_api(test_mode: bool = False):
+async def test_api_async(test_mode: bool = False):
     api = DexScreenerAPI(test_mode=test_mode)
     
     # Поиск ракет
@@ -904,72 +1142,68 @@ def test_api(test_mode: bool = False):
             "max_price_change": 1000,
             "min_liquidity": 250,
             "min_volume": 100,
-            "networks": list(explorers.keys())
+            "networks": list(_EXPLORERS)
         }
     
-    rockets = api.find_rocket_tokens()
+    rockets = await api.find_rocket_tokens()
     
     if not rockets:
         print("\nРакеты не найдены")
         return
         
     # Сортировка ракет по суточному приросту
-    rockets.sort(key=lambda x: x['price_change_24h'], reverse=True)
-    
-    # Фильтрация дубликатов, оставляем только версии с наибольшей ликвидностью
-    unique_rockets = filter_duplicate_tokens(rockets)
+    rockets.sort(key=_by_p24, reverse=True)
     
-    print(f"\nНайдено всего {len(rockets)} потенциальных ракет")
-    print(f"После фильтрации дубликатов: {len(unique_rockets)}")
+    # find_rocket_tokens уже оставляет по одной версии токена с наибольшей ликвидностью
+    print(f"\nНайдено всего {len(rockets)} потенциальных ракет (без дубликатов)")
     print(f"Все найденные ракеты (без дубликатов):\n")
     
     # Сохраняем результаты в JSON
     output_dir = Path("results")
     saver = TokenDataSaver(output_dir)
-    json_path = saver.save_tokens_data(unique_rockets, config)
+    json_path = saver.save_tokens_data(rockets, config)
     print(f"\nРезультаты сохранены в: {json_path}")
     
-    # Вывод информации о каждой ракете
-    for i, token in enumerate(unique_rockets, 1):
-        print(f"{'='*80}")
-        print(f"🚀 #{i} | {token['symbol']} | Сеть: {token['network']}")
-        print(f"{'='*80}")
-        
-        # Основные показатели
+    # Вывод информации о каждой ракете: весь отчет собирается и выводится одной записью
+    blocks = []
+    for i, token in enumerate(rockets, 1):
+        net = token['network']
+        net_l = net.lower()
+        addr = token['address']
         profile = token['profile']
         price_changes = profile.get('priceChange', {})
         
-        print(f"📈 Рост: 24ч: {price_changes.get('h24', 0):+.2f}% | 1ч: {price_changes.get('h1', 0):+.2f}%")
-        print(f"💰 Цена: ${profile.get('priceUsd', '0')} | Ликв: ${token['liquidity_usd']:,.2f} | Объем 24ч: ${token['volume_24h']:,.2f}")
-        print(f"⏰ Возраст: {token['age_hours']:.1f}ч | DEX: {profile.get('dexId', 'Неизвестно')}")
-        
-        # Ссылки
-        print("\n🔗 Ссылки:")
-        
-        # DEXScreener
-        print(f"📊 DEXScreener: https://dexscreener.com/{token['network'].lower()}/{token['address']}")
+        lines = [
+            f"{'='*80}\n🚀 #{i} | {token['symbol']} | Сеть: {net}\n{'='*80}",
+            # Основные показатели
+            f"📈 Рост: 24ч: {price_changes.get('h24', 0):+.2f}% | 1ч: {price_changes.get('h1', 0):+.2f}%",
+            f"💰 Цена: ${profile.get('priceUsd', '0')} | Ликв: ${token['liquidity_usd']:,.2f} | Объем 24ч: ${token['volume_24h']:,.2f}",
+            f"⏰ Возраст: {token['age_hours']:.1f}ч | DEX: {profile.get('dexId', 'Неизвестно')}",
+            # Ссылки
+            f"\n🔗 Ссылки:\n📊 DEXScreener: https://dexscreener.com/{net_l}/{addr}",
+        ]
         
         # Ссылка на DEX
-        dex_id = profile.get('dexId', '').lower()
-        if dex_id == 'pancakeswap':
-            print(f"🥞 PancakeSwap: https://pancakeswap.finance/swap?outputCurrency={token['address']}")
-        elif dex_id == 'raydium':
-            print(f"🌟 Raydium: https://raydium.io/swap/?inputCurrency=sol&outputCurrency={token['address']}")
-        elif dex_id == 'uniswap':
-            print(f"🦄 Uniswap: https://app.uniswap.org/#/swap?outputCurrency={token['address']}")
-        elif dex_id == 'sushi':
-            print(f"🍣 SushiSwap: https://app.sushi.com/swap?outputCurrency={token['address']}")
+        entry = DEX_URL_TEMPLATES.get((profile.get('dexId') or '').lower())
+        if entry:
+            label, template = entry
+            lines.append(f"{label}: {template.format(addr=addr)}")
         
         # Ссылка на блокчейн-эксплорер
-        network = token['network'].lower()
-        if network in explorers:
-            print(f"🔍 Explorer: {explorers[network]}{token['address']}")
-            
-        print()
+        url = explorer_url(net_l, addr)
+        if url:
+            lines.append(f"🔍 Explorer: {url}")
+        
+        blocks.append("\n".join(lines) + "\n\n")
+    sys.stdout.write("".join(blocks))
+
+def test_api(test_mode: bool = False):
+    """Синхронная обертка над test_api_async."""
+    asyncio.run(test_api_async(test_mode))
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Поиск ракет на DEX')
     parser.add_argument('-test', action='store_true', help='Запуск в тестовом режиме (сокращенный список токенов и пониженные критерии)')
     args = parser.parse_args()
     
-    test_api(test_mode=args.test) 
\ No newline at end of file
+    asyncio.run(test_api_async(test_mode=args.test))
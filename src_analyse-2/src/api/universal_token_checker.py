@@ -1,6 +1,59 @@
-import requests
+import asyncio
+import copy
+import json
+import os
+import pickle
 import random
-from typing import Dict, Any, Optional
+import time
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Hashable, List, Optional, Tuple
+
+import aiohttp
+
+try:
+    import orjson  # optional, быстрый C-парсер JSON
+    _json_loads, _json_dumps = orjson.loads, orjson.dumps
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+try:
+    import ijson  # optional, потоковый разбор большого списка токенов Jupiter
+except ImportError:
+    ijson = None
+
+# Каталог для кешей между запусками (индекс токенов Jupiter и т.п.)
+_CACHE_DIR = Path(os.getenv("TOKEN_CHECKER_CACHE_DIR") or Path.home() / ".cache" / "dexscreener")
+
+
+class _TTLCache:
+    """Небольшой LRU-кеш с временем жизни записей (без внешних зависимостей)."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
 
 
 class UniversalTokenChecker:
@@ -10,6 +63,9 @@ class UniversalTokenChecker:
     - Uniswap v3 (The Graph)
     - Jupiter (Solana)
     - CoinGecko (для известных токенов по адресу контракта)
+
+    Все проверки асинхронные и используют одну aiohttp-сессию; после работы
+    вызовите close() или используйте объект как async context manager.
     """
 
     USER_AGENTS = [
@@ -27,85 +83,347 @@ class UniversalTokenChecker:
         'base': 'base',
     }
 
+    # Индекс всех токенов Jupiter {mint: token}: общий для всех экземпляров, обновляется раз в _JUP_TTL
+    _JUP_TTL = 6 * 3600
+    _jupiter_index: Optional[Dict[str, Dict[str, Any]]] = None
+    _jupiter_fetched_at: float = 0.0
+
+    # asyncio.Lock привязывается к event loop при первом ожидании, поэтому общие для класса
+    # блокировки создаются отдельно для каждого loop: {loop: {имя: Lock}}
+    _loop_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Lock]]" = \
+        weakref.WeakKeyDictionary()
+
+    # Результаты проверок по (chain, address): CoinGecko меняется медленно, TVL в Uniswap — быстрее
+    _cg_cache = _TTLCache(maxsize=4096, ttl=3600)
+    # ETag и последний ответ CoinGecko живут дольше кеша: для условного обновления устаревших записей
+    _cg_etags = _TTLCache(maxsize=4096, ttl=7 * 24 * 3600)
+
+    # Адреса контрактов, известные CoinGecko, по платформам {platform: {address}}: большинство
+    # мем-токенов там отсутствует, и по индексу им сразу отвечаем «не найден» без запроса
+    _CG_INDEX_TTL = 24 * 3600
+    _CG_INDEX_RETRY = 600
+    _cg_known: Optional[Dict[str, frozenset]] = None
+    _cg_known_fetched_at: float = 0.0
+    _cg_known_failed_at: float = 0.0
+    _uni_cache = _TTLCache(maxsize=4096, ttl=300)
+
+    # На сколько снижает risk_score подтверждение каждым источником
+    _PROVIDER_WEIGHTS = {'coingecko': 40, 'uniswap': 30, 'jupiter': 20}
+
+    @classmethod
+    def _lock(cls, name: str) -> asyncio.Lock:
+        """Общая для всех экземпляров блокировка name в текущем event loop."""
+        locks = cls._loop_locks.setdefault(asyncio.get_running_loop(), {})
+        lock = locks.get(name)
+        if lock is None:
+            lock = locks[name] = asyncio.Lock()
+        return lock
+
+    def __init__(self, timeout: float = 10):
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "UniversalTokenChecker":
+        await self._ensure_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        """Лениво создает общую сессию (TCP/TLS соединения переиспользуются между проверками)."""
+        if self._session is None or self._session.closed:
+            # Несколько хостов (CoinGecko, The Graph, Jupiter): держим соединения живыми
+            # и кешируем DNS, чтобы повторные проверки не платили за handshake
+            connector = aiohttp.TCPConnector(limit=32, limit_per_host=8, keepalive_timeout=60, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(timeout=self.timeout, connector=connector)
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
     def _headers(self) -> Dict[str, str]:
         return {
             'User-Agent': random.choice(self.USER_AGENTS),
-            'Accept': 'application/json'
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, br',
+            'Connection': 'keep-alive'
         }
 
-    def check_via_uniswap(self, token_address: str) -> Dict[str, Any]:
-        """Проверка наличия токена в Uniswap v3 (The Graph)."""
-        url = "https://api.thegraph.com/subgraphs/name/uniswap/uniswap-v3"
-        query = f"""
-        {{
-          token(id: "{token_address.lower()}") {{
-            symbol
-            name
-            decimals
-            totalValueLockedUSD
-          }}
-        }}
+    async def _get_json(self, url: str, timeout: Optional[float] = None) -> Optional[Any]:
+        """GET запрос; возвращает разобранный JSON при статусе 200, иначе None."""
+        session = await self._ensure_session()
+        kwargs = {'timeout': aiohttp.ClientTimeout(total=timeout)} if timeout else {}
+        async with session.get(url, headers=self._headers(), **kwargs) as resp:
+            if resp.status != 200:
+                return None
+            return _json_loads(await resp.read())
+
+    async def _get_conditional(self, url: str, etag: Optional[str] = None) -> Tuple[int, Optional[Any], Optional[str]]:
+        """Условный GET с If-None-Match.
+
+        Возвращает (статус, JSON при 200 иначе None, ETag ответа).
         """
+        session = await self._ensure_session()
+        headers = self._headers()
+        if etag:
+            headers['If-None-Match'] = etag
+        async with session.get(url, headers=headers) as resp:
+            data = _json_loads(await resp.read()) if resp.status == 200 else None
+            return resp.status, data, resp.headers.get('ETag')
+
+    async def _post_json(self, url: str, json: Dict[str, Any]) -> Optional[Any]:
+        """POST запрос с JSON телом; возвращает разобранный JSON при успешном статусе, иначе None."""
+        session = await self._ensure_session()
+        headers = self._headers()
+        headers['Content-Type'] = 'application/json'
+        async with session.post(url, data=_json_dumps(json), headers=headers) as resp:
+            if not resp.ok:
+                return None
+            return _json_loads(await resp.read())
+
+    UNISWAP_V3_URL = "https://api.thegraph.com/subgraphs/name/uniswap/uniswap-v3"
+    _UNI_TOKEN_QUERY = """
+    query ($id: ID!) {
+      token(id: $id) { symbol name decimals totalValueLockedUSD }
+    }
+    """
+    _UNI_TOKENS_QUERY = """
+    query ($ids: [ID!]!) {
+      tokens(where: {id_in: $ids}, first: 1000) { id symbol name decimals totalValueLockedUSD }
+    }
+    """
+
+    async def check_via_uniswap(self, token_address: str) -> Dict[str, Any]:
+        """Проверка наличия токена в Uniswap v3 (The Graph)."""
+        key = token_address.lower()
+        cached = self._uni_cache.get(key)
+        if cached is not None:
+            return cached
         try:
-            resp = requests.post(url, json={'query': query}, headers=self._headers(), timeout=10)
-            data = resp.json() if resp.ok else {}
-            token = (data.get('data') or {}).get('token')
-            if token:
-                return {
-                    'found': True,
-                    'source': 'uniswap_v3_graph',
-                    'info': token
-                }
+            data = await self._post_json(self.UNISWAP_V3_URL, {'query': self._UNI_TOKEN_QUERY, 'variables': {'id': key}})
+            if data is not None:
+                token = (data.get('data') or {}).get('token')
+                result = {'found': True, 'source': 'uniswap_v3_graph', 'info': token} if token \
+                    else {'found': False, 'source': 'uniswap_v3_graph'}
+                # Кешируем только полученный ответ (включая «токена нет»), но не сетевые ошибки
+                self._uni_cache.set(key, result)
+                return result
         except Exception:
             pass
         return {'found': False, 'source': 'uniswap_v3_graph'}
 
-    def check_solana_jupiter(self, mint: str) -> Dict[str, Any]:
+    async def check_via_uniswap_batch(self, addresses: List[str], batch_size: int = 50) -> Dict[str, Dict[str, Any]]:
+        """Проверка списка токенов в Uniswap v3 одним GraphQL-запросом на batch_size адресов.
+
+        Возвращает {address: результат как у check_via_uniswap}; пачки отправляются параллельно.
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for key in dict.fromkeys(a.lower() for a in addresses):
+            cached = self._uni_cache.get(key)
+            if cached is not None:
+                results[key] = cached
+            else:
+                missing.append(key)
+
+        async def _chunk(ids: List[str]) -> None:
+            try:
+                data = await self._post_json(self.UNISWAP_V3_URL, {'query': self._UNI_TOKENS_QUERY, 'variables': {'ids': ids}})
+            except Exception:
+                return
+            if data is None or data.get('errors'):
+                return
+            found = {}
+            for token in (data.get('data') or {}).get('tokens') or []:
+                token = dict(token)
+                found[token.pop('id', '')] = token
+            for key in ids:
+                token = found.get(key)
+                result = {'found': True, 'source': 'uniswap_v3_graph', 'info': token} if token \
+                    else {'found': False, 'source': 'uniswap_v3_graph'}
+                self._uni_cache.set(key, result)
+                results[key] = result
+
+        await asyncio.gather(*(_chunk(missing[i:i + batch_size]) for i in range(0, len(missing), batch_size)))
+        not_found = {'found': False, 'source': 'uniswap_v3_graph'}
+        return {a: results.get(a.lower(), not_found) for a in addresses}
+
+    @staticmethod
+    def _load_index_cache(path: Path, ttl: float) -> Optional[tuple]:
+        """Читает индекс с диска, если файл моложе ttl (mtime служит меткой времени)."""
+        try:
+            fetched_at = path.stat().st_mtime
+            if time.time() - fetched_at >= ttl:
+                return None
+            with open(path, 'rb') as f:
+                return pickle.load(f), fetched_at
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    @staticmethod
+    def _save_index_cache(path: Path, index: Dict[str, Any]) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix('.tmp')
+            with open(tmp, 'wb') as f:
+                pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    async def _fetch_jupiter_index(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Скачивает https://token.jup.ag/all и строит индекс {address: token}.
+
+        С ijson ответ разбирается потоково прямо в индекс, без промежуточного списка
+        на десятки мегабайт; без него — обычный json.
+        """
+        session = await self._ensure_session()
+        async with session.get("https://token.jup.ag/all", headers=self._headers(),
+                               timeout=aiohttp.ClientTimeout(total=8)) as resp:
+            if resp.status != 200:
+                return None
+            if ijson is not None:
+                index: Dict[str, Dict[str, Any]] = {}
+                async for t in ijson.items_async(resp.content, 'item', use_float=True):
+                    address = t.get('address')
+                    if address:
+                        index[address] = t
+                return index
+            tokens = _json_loads(await resp.read())
+        return {t['address']: t for t in tokens or [] if t.get('address')}
+
+    async def _get_jupiter_index(self) -> Dict[str, Dict[str, Any]]:
+        """Индекс токенов Jupiter по адресу mint.
+
+        Список https://token.jup.ag/all весит несколько мегабайт, поэтому он скачивается
+        не чаще раза в _JUP_TTL и сохраняется на диск; lock не дает параллельным
+        проверкам скачивать его одновременно.
+        """
+        cls = type(self)
+        if cls._jupiter_index is not None and time.time() - cls._jupiter_fetched_at < cls._JUP_TTL:
+            return cls._jupiter_index
+        async with cls._lock('jupiter'):
+            if cls._jupiter_index is not None and time.time() - cls._jupiter_fetched_at < cls._JUP_TTL:
+                return cls._jupiter_index
+            path = _CACHE_DIR / "jupiter.pkl"
+            cached = await asyncio.to_thread(self._load_index_cache, path, cls._JUP_TTL)
+            if cached is not None:
+                cls._jupiter_index, cls._jupiter_fetched_at = cached
+                return cls._jupiter_index
+            try:
+                index = await self._fetch_jupiter_index()
+            except Exception:
+                index = None
+            if not index:
+                # Не кешируем неудачу: старый индекс (если был) лучше пустого
+                return cls._jupiter_index or {}
+            cls._jupiter_index, cls._jupiter_fetched_at = index, time.time()
+            await asyncio.to_thread(self._save_index_cache, path, index)
+            return index
+
+    async def check_solana_jupiter(self, mint: str) -> Dict[str, Any]:
         """Проверка токена в Jupiter (Solana)."""
         try:
-            url = "https://token.jup.ag/all"
-            resp = requests.get(url, headers=self._headers(), timeout=8, stream=True)
-            if resp.status_code == 200:
-                tokens = resp.json()
-                for t in tokens:
-                    if t.get('address') == mint:
-                        return {'found': True, 'source': 'jupiter_all', 'verified': True, 'info': t}
+            t = (await self._get_jupiter_index()).get(mint)
+            if t:
+                return {'found': True, 'source': 'jupiter_all', 'verified': True, 'info': t}
         except Exception:
             pass
 
         try:
-            url = f"https://token.jup.ag/strict/{mint}"
-            resp = requests.get(url, headers=self._headers(), timeout=6)
-            if resp.status_code == 200:
+            if await self._get_json(f"https://token.jup.ag/strict/{mint}", timeout=6) is not None:
                 return {'found': True, 'source': 'jupiter_strict', 'strict': True}
         except Exception:
             pass
 
         return {'found': False, 'source': 'jupiter'}
 
-    def check_coingecko(self, chain: str, token_address: str) -> Dict[str, Any]:
+    async def _ensure_cg_index(self) -> Optional[Dict[str, frozenset]]:
+        """Индекс известных CoinGecko контрактов (раз в сутки, с копией на диске).
+
+        Возвращает None, если индекс недоступен — тогда check_coingecko спрашивает API напрямую.
+        """
+        cls = type(self)
+        now = time.time()
+        if cls._cg_known is not None and now - cls._cg_known_fetched_at < cls._CG_INDEX_TTL:
+            return cls._cg_known
+        if now - cls._cg_known_failed_at < cls._CG_INDEX_RETRY:
+            return cls._cg_known
+        async with cls._lock('cg_known'):
+            if cls._cg_known is not None and time.time() - cls._cg_known_fetched_at < cls._CG_INDEX_TTL:
+                return cls._cg_known
+            path = _CACHE_DIR / "coingecko_contracts.pkl"
+            cached = await asyncio.to_thread(self._load_index_cache, path, cls._CG_INDEX_TTL)
+            if cached is not None:
+                cls._cg_known, cls._cg_known_fetched_at = cached
+                return cls._cg_known
+            try:
+                coins = await self._get_json("https://api.coingecko.com/api/v3/coins/list?include_platform=true", timeout=30)
+            except Exception:
+                coins = None
+            if not coins:
+                # Не долбим тяжелый endpoint при каждом вызове, если он недоступен (429 и т.п.)
+                cls._cg_known_failed_at = time.time()
+                return cls._cg_known
+            known: Dict[str, set] = {}
+            for coin in coins:
+                for platform, address in (coin.get('platforms') or {}).items():
+                    if platform and address:
+                        known.setdefault(platform, set()).add(address.lower())
+            index = {platform: frozenset(addresses) for platform, addresses in known.items()}
+            cls._cg_known, cls._cg_known_fetched_at = index, time.time()
+            await asyncio.to_thread(self._save_index_cache, path, index)
+            return index
+
+    async def check_coingecko(self, chain: str, token_address: str) -> Dict[str, Any]:
         """Проверка токена на CoinGecko по контракту (без ключа)."""
         platform = self.PLATFORM_MAP.get(chain.lower())
         if not platform:
             return {'found': False, 'source': 'coingecko'}
+        key = (platform, token_address.lower())
+        cached = self._cg_cache.get(key)
+        if cached is not None:
+            return cached
+        try:
+            known = await self._ensure_cg_index()
+        except Exception:
+            known = None
+        if known is not None and key[1] not in known.get(platform, ()):
+            return {'found': False, 'source': 'coingecko', 'cached_negative': True}
         url = f"https://api.coingecko.com/api/v3/coins/{platform}/contract/{token_address}"
+        # Запись устарела по TTL, но есть ETag — переспрашиваем условно (304 приходит без тела)
+        validator = self._cg_etags.get(key)
+        etag, stale = validator if validator else (None, None)
         try:
-            resp = requests.get(url, headers=self._headers(), timeout=10)
-            if resp.status_code == 200:
-                data = resp.json()
-                return {
+            status, data, new_etag = await self._get_conditional(url, etag)
+            if status == 304 and stale is not None:
+                self._cg_cache.set(key, stale)
+                return stale
+            if data is not None:
+                result = {
                     'found': True,
                     'source': 'coingecko',
                     'name': (data.get('name') or ''),
                     'symbol': (data.get('symbol') or '').upper(),
                     'categories': data.get('categories') or []
                 }
+                # 404 и 429 неотличимы здесь, поэтому кешируем только найденные токены
+                self._cg_cache.set(key, result)
+                if new_etag:
+                    self._cg_etags.set(key, (new_etag, result))
+                return result
         except Exception:
             pass
         return {'found': False, 'source': 'coingecko'}
 
-    def check_token(self, address: str, chain: str) -> Dict[str, Any]:
-        """Комбинированная бесплатная проверка без KYC."""
+    async def check_token(self, address: str, chain: str) -> Dict[str, Any]:
+        """Комбинированная бесплатная проверка без KYC.
+
+        Источники опрашиваются параллельно: задержка равна самому медленному из них.
+        """
         results: Dict[str, Any] = {
             'found': False,
             'sources': [],
@@ -113,32 +431,25 @@ class UniversalTokenChecker:
             'risk_score': 100,
             'trust_level': 'low'
         }
+        chain_l = chain.lower()
 
-        # CoinGecko — высокий приоритет доверия
-        cg = self.check_coingecko(chain, address)
-        if cg.get('found'):
-            results['found'] = True
-            results['sources'].append('coingecko')
-            results['risk_score'] -= 40
-            results['coingecko'] = cg
-
-        # Uniswap v3 (для EVM)
-        if chain.lower() in {'ethereum', 'bsc', 'polygon', 'arbitrum', 'optimism', 'base'}:
-            uni = self.check_via_uniswap(address) if chain.lower() == 'ethereum' else {'found': False}
-            if uni.get('found'):
-                results['found'] = True
-                results['sources'].append('uniswap')
-                results['risk_score'] -= 30
-                results['uniswap'] = uni
-
-        # Solana — Jupiter
-        if chain.lower() == 'solana':
-            jup = self.check_solana_jupiter(address)
-            if jup.get('found'):
+        # Опрашиваем только применимые источники; порядок задает порядок в results['sources']
+        providers = ['coingecko']  # CoinGecko — высокий приоритет доверия
+        tasks = [self.check_coingecko(chain, address)]
+        if chain_l == 'ethereum':  # Uniswap v3 subgraph индексирует только Ethereum mainnet
+            providers.append('uniswap')
+            tasks.append(self.check_via_uniswap(address))
+        elif chain_l == 'solana':  # Solana — Jupiter
+            providers.append('jupiter')
+            tasks.append(self.check_solana_jupiter(address))
+
+        checked = await asyncio.gather(*tasks, return_exceptions=True)
+        for provider, check in zip(providers, checked):
+            if isinstance(check, dict) and check.get('found'):
                 results['found'] = True
-                results['sources'].append('jupiter')
-                results['risk_score'] -= 20
-                results['jupiter'] = jup
+                results['sources'].append(provider)
+                results['risk_score'] -= self._PROVIDER_WEIGHTS[provider]
+                results[provider] = check
 
         # Trust level
         if len(results['sources']) >= 2:
@@ -150,4 +461,27 @@ class UniversalTokenChecker:
 
         return results
 
+    async def check_tokens(self, items: List[Tuple[str, str]], concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Пакетная проверка списка пар (address, chain).
 
+        Проверки идут параллельно, но не больше concurrency одновременно (по умолчанию
+        до 32); повторяющиеся пары проверяются один раз. Результаты возвращаются
+        в порядке items; повтор пары получает собственную копию результата.
+        """
+        unique = list(dict.fromkeys(items))
+        if not unique:
+            return []
+        sem = asyncio.Semaphore(concurrency or min(32, len(unique)))
+
+        async def _one(address: str, chain: str) -> Dict[str, Any]:
+            async with sem:
+                return await self.check_token(address, chain)
+
+        checked = await asyncio.gather(*(_one(address, chain) for address, chain in unique))
+        by_item = dict(zip(unique, checked))
+        seen = set()
+        results = []
+        for item in items:
+            results.append(copy.deepcopy(by_item[item]) if item in seen else by_item[item])
+            seen.add(item)
+        return results
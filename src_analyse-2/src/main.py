@@ -1,13 +1,102 @@
 import argparse
+import hashlib
+import mmap
 import os
+import pickle
+import sys
+import time
 import json
 from datetime import datetime
-from token_analyzer import TokenAnalyzer
+from pathlib import Path
 from colorama import init, Fore, Style
 
+try:
+    import orjson  # optional, быстрая сериализация JSON
+except ImportError:
+    orjson = None
+
 # Инициализация colorama для цветного вывода
 init()
 
+# Цветовые коды colorama - константы, берем их один раз при загрузке модуля
+CYAN = Fore.CYAN
+GREEN = Fore.GREEN
+RED = Fore.RED
+YELLOW = Fore.YELLOW
+RESET = Style.RESET_ALL
+
+# Файлы больше этого размера разбираются через mmap без копирования в память (только с orjson)
+MMAP_THRESHOLD = 256 * 1024 * 1024
+
+# Кэш результатов --analyze (см. analysis_cache_path)
+CACHE_DIR = Path('.cache')
+# Версия формата кэша: увеличивать при изменении набора полей Token
+CACHE_VERSION = 5
+# Срок жизни кэша анализа по умолчанию (секунды, ключ конфигурации cache_ttl; 0 - кэш отключен):
+# риск-оценки зависят от проверок безопасности и блокировок, результаты которых устаревают
+CACHE_TTL = 30 * 60
+
+# Параметры конфигурации, которые вводятся как числа
+NUMERIC_KEYS = frozenset({"min_price_change", "max_price_change", "min_liquidity", "min_volume", "max_token_age_hours"})
+
+def load_config(config_path: str = 'config.json') -> dict:
+    """Читает конфигурацию без создания TokenAnalyzer (для --config)"""
+    try:
+        with open(config_path, 'rb') as f:
+            raw = f.read()
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except Exception as e:
+        print(f"{RED}Ошибка при загрузке конфигурации: {str(e)}{RESET}")
+        return {}
+
+def analysis_cache_path(input_path: str, config: dict) -> Path:
+    """Путь к кэшу анализа для входного файла: ключ - версия формата, путь, mtime_ns, размер и конфигурация"""
+    st = os.stat(input_path)
+    config_str = json.dumps(config, sort_keys=True, default=str)
+    key = hashlib.sha1(f"{CACHE_VERSION}|{os.path.abspath(input_path)}|{st.st_mtime_ns}|{st.st_size}|{config_str}".encode()).hexdigest()
+    return CACHE_DIR / f"{key}.pkl"
+
+def load_cached_analysis(raket, cache_path: Path, ttl: float = CACHE_TTL) -> bool:
+    """Восстанавливает токены и распределение по рискам из кэша; False если кэша нет или он старше ttl секунд"""
+    if ttl <= 0:
+        return False
+    try:
+        if time.time() - cache_path.stat().st_mtime > ttl:
+            cache_path.unlink(missing_ok=True)
+            return False
+        with open(cache_path, 'rb') as f:
+            state = pickle.load(f)
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        print(f"{YELLOW}Не удалось прочитать кэш анализа {cache_path}: {str(e)}{RESET}")
+        return False
+    
+    raket.tokens = state["tokens"]
+    raket.scam_tokens = state["scam_tokens"]
+    raket.high_risk_tokens = state["high_risk_tokens"]
+    raket.medium_risk_tokens = state["medium_risk_tokens"]
+    raket.low_risk_tokens = state["low_risk_tokens"]
+    return True
+
+def save_cached_analysis(raket, cache_path: Path) -> None:
+    """Сохраняет результаты анализа в кэш (ошибка сохранения не прерывает анализ)"""
+    state = {
+        "tokens": raket.tokens,
+        "scam_tokens": raket.scam_tokens,
+        "high_risk_tokens": raket.high_risk_tokens,
+        "medium_risk_tokens": raket.medium_risk_tokens,
+        "low_risk_tokens": raket.low_risk_tokens,
+    }
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=5)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print(f"{YELLOW}Не удалось сохранить кэш анализа: {str(e)}{RESET}")
+
 def main():
     """Основная функция запуска анализатора"""
     # Создаем парсер аргументов командной строки
@@ -32,82 +121,118 @@ def main():
     
     # Общие аргументы
     parser.add_argument('--output-dir', '-o', help='Директория для сохранения отчетов')
+    parser.add_argument('--stream', action='store_true',
+                        help='Потоковое чтение файла --analyze через ijson (для очень больших файлов)')
+    parser.add_argument('--parquet', action='store_true',
+                        help='Дополнительно сохранить таблицу токенов в Parquet (требуется pyarrow)')
     
     # Парсим аргументы
     args = parser.parse_args()
     
-    # Создаем экземпляр анализатора
-    raket = TokenAnalyzer()
+    # Анализатор (и его тяжелые зависимости) нужен только для --analyze и --filter
+    if args.analyze or args.filter:
+        from token_analyzer import TokenAnalyzer
+        raket = TokenAnalyzer()
     
     # Обработка команд
     if args.analyze:
         # Запускаем полный анализ
-        print(f"{Fore.CYAN}Анализ файла: {args.analyze}{Style.RESET_ALL}")
+        print(f"{CYAN}Анализ файла: {args.analyze}{RESET}")
         
         if not os.path.exists(args.analyze):
-            print(f"{Fore.RED}Ошибка: Файл '{args.analyze}' не найден{Style.RESET_ALL}")
+            print(f"{RED}Ошибка: Файл '{args.analyze}' не найден{RESET}")
             return
         
         try:
             # Создаем директорию для отчетов
-            output_dir = args.output_dir or raket.config.get("output_dir", "reports")
-            os.makedirs(output_dir, exist_ok=True)
+            out = Path(args.output_dir or raket.config.get("output_dir", "reports"))
+            out.mkdir(parents=True, exist_ok=True)
             
-            # Загружаем и анализируем токены
-            raket.load_from_json(args.analyze)
+            # Результат анализа кэшируется по пути, mtime и размеру входного файла (и конфигурации):
+            # повторный запуск на том же дампе не разбирает JSON и не ходит в сеть, пока кэш не старше cache_ttl
+            cache_path = analysis_cache_path(args.analyze, raket.config)
+            cache_ttl = raket.config.get("cache_ttl", CACHE_TTL)
+            cached = load_cached_analysis(raket, cache_path, cache_ttl)
+            if cached:
+                print(f"{GREEN}Результаты анализа загружены из кэша: {cache_path}{RESET}")
             
-            # Используем асинхронный анализ с верификацией
-            import asyncio
-            asyncio.run(raket.analyze_all_tokens())
+            # Загружаем и анализируем токены: файл читается целиком и разбирается из памяти,
+            # а с --stream токены разбираются по одному и исходный JSON не держится в памяти
+            if not cached:
+                with open(args.analyze, 'rb') as f:
+                    if args.stream:
+                        import ijson
+                        try:
+                            ijson = ijson.get_backend('yajl2_c')
+                        except ImportError:
+                            pass
+                        raket.tokens = []
+                        now_ms = time.time() * 1000  # один момент расчета возраста на всю загрузку
+                        for token_data in ijson.items(f, 'rockets.item', use_float=True):
+                            raket.add_token(token_data, now_ms)
+                        print(f"Загружено {len(raket.tokens)} токенов")
+                    elif orjson is not None and os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                            raket.load_from_bytes(view)
+                    else:
+                        raket.load_from_bytes(f.read())
             
             # Определяем базовое имя файла
-            base_filename = os.path.basename(args.analyze).split('.')[0]
+            base_filename = Path(args.analyze).stem
             
-            # Экспорт рекомендованных токенов в JSON (после анализа безопасности)
+            # Одна метка времени на все отчеты запуска, чтобы имена файлов совпадали
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            recommended_json_path = os.path.join(output_dir, f"{base_filename}_recommended_{timestamp}.json")
-            raket.export_recommended_to_json(recommended_json_path)
             
-            # Генерируем объединенный отчет
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            # JSON с рекомендациями, объединенный отчет (включает безопасность и все категории)
+            # и CSV для дополнительного анализа
+            recommended_json_path = out / f"{base_filename}_recommended_{timestamp}.json"
+            unified_report_path = out / f"{base_filename}_unified_{timestamp}.txt"
+            csv_path = out / f"{base_filename}_analysis_{timestamp}.csv"
             
-            # Объединенный отчет (включает безопасность и все категории)
-            unified_report_path = os.path.join(output_dir, f"{base_filename}_unified_{timestamp}.txt")
-            raket.generate_unified_report(unified_report_path)
+            import asyncio
+            
+            async def _run():
+                if not cached:
+                    # Асинхронный анализ с верификацией
+                    await raket.analyze_all_tokens()
+                    if cache_ttl > 0:
+                        save_cached_analysis(raket, cache_path)
+                # Экспорты независимы друг от друга: пишем файлы параллельно в потоках
+                # (отчет и CSV формируются за один проход по токенам)
+                await asyncio.gather(
+                    asyncio.to_thread(raket.export_recommended_to_json, recommended_json_path),
+                    asyncio.to_thread(raket.generate_unified_report_and_csv, unified_report_path, csv_path),
+                )
+                if args.parquet:
+                    await asyncio.to_thread(raket.export_parquet, str(out / f"{base_filename}_tokens_{timestamp}.parquet"))
             
-            # Экспорт в CSV (для дополнительного анализа)
-            csv_path = os.path.join(output_dir, f"{base_filename}_analysis_{timestamp}.csv")
-            raket.export_to_csv(csv_path)
+            asyncio.run(_run())
             
-            print(f"\n{Fore.GREEN}Анализ успешно завершен{Style.RESET_ALL}")
+            print(f"\n{GREEN}Анализ успешно завершен{RESET}")
             print(f"Всего токенов: {len(raket.tokens)}")
             print(f"Распределение по рискам:")
             print(f"- Скам: {len(raket.scam_tokens)}")
             print(f"- Высокий риск: {len(raket.high_risk_tokens)}")
             print(f"- Средний риск: {len(raket.medium_risk_tokens)}")
             print(f"- Низкий риск: {len(raket.low_risk_tokens)}")
-            # Получаем рекомендованные токены для статистики
-            recommended_tokens = raket.get_top_tokens_by_growth(
-                limit=None,
-                min_liquidity=raket.config.get("min_liquidity", 50000),
-                min_age=24
-            )
-            print(f"- Рекомендовано: {len(recommended_tokens)}")
-            
-            print(f"\n{Fore.CYAN}Созданы следующие отчеты:{Style.RESET_ALL}")
+            # Список уже посчитан при экспорте рекомендаций в JSON (критерии экспорта мягче, чем
+            # у get_top_tokens_by_growth в отчете рекомендаций, поэтому строка подписана явно)
+            print(f"- Рекомендовано в JSON-экспорте: {len(raket.recommended_tokens)}")
+            
+            print(f"\n{CYAN}Созданы следующие отчеты:{RESET}")
             print(f"- Объединенный отчет: {unified_report_path}")
             print(f"- CSV-экспорт: {csv_path}")
             print(f"- JSON с рекомендациями: {recommended_json_path}")
             
         except Exception as e:
-            print(f"{Fore.RED}Ошибка при анализе: {str(e)}{Style.RESET_ALL}")
+            print(f"{RED}Ошибка при анализе: {str(e)}{RESET}")
     
     elif args.filter:
         # Применяем фильтры к ранее загруженным токенам
-        print(f"{Fore.CYAN}Применение фильтров к токенам{Style.RESET_ALL}")
+        print(f"{CYAN}Применение фильтров к токенам{RESET}")
         
         if not raket.tokens:
-            print(f"{Fore.RED}Ошибка: Сначала необходимо загрузить токены с помощью команды --analyze{Style.RESET_ALL}")
+            print(f"{RED}Ошибка: Сначала необходимо загрузить токены с помощью команды --analyze{RESET}")
             return
         
         filters = {}
@@ -130,48 +255,48 @@ def main():
         
         try:
             # Создаем директорию для отчетов
-            output_dir = args.output_dir or raket.config.get("output_dir", "reports")
-            os.makedirs(output_dir, exist_ok=True)
+            out = Path(args.output_dir or raket.config.get("output_dir", "reports"))
+            out.mkdir(parents=True, exist_ok=True)
             
             # Применяем фильтры
             filtered_tokens = raket.filter_tokens(filters)
             
             if not filtered_tokens:
-                print(f"{Fore.YELLOW}Нет токенов, соответствующих заданным критериям{Style.RESET_ALL}")
+                print(f"{YELLOW}Нет токенов, соответствующих заданным критериям{RESET}")
                 return
             
             # Генерируем отчеты
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             
             # Детальный отчет
-            report_path = os.path.join(output_dir, f"filtered_report_{timestamp}.txt")
+            report_path = out / f"filtered_report_{timestamp}.txt"
             raket.generate_text_report(report_path, tokens_list=filtered_tokens, detailed=True)
             
             # Экспорт в CSV
-            csv_path = os.path.join(output_dir, f"filtered_tokens_{timestamp}.csv")
+            csv_path = out / f"filtered_tokens_{timestamp}.csv"
             raket.export_to_csv(csv_path, tokens_list=filtered_tokens)
             
-            print(f"\n{Fore.GREEN}Фильтрация успешно завершена{Style.RESET_ALL}")
+            print(f"\n{GREEN}Фильтрация успешно завершена{RESET}")
             print(f"Отфильтровано токенов: {len(filtered_tokens)}")
             print(f"Создан отчет: {report_path}")
             print(f"CSV-экспорт: {csv_path}")
             
         except Exception as e:
-            print(f"{Fore.RED}Ошибка при фильтрации: {str(e)}{Style.RESET_ALL}")
+            print(f"{RED}Ошибка при фильтрации: {str(e)}{RESET}")
     
     elif args.config:
         # Обновляем конфигурацию
-        print(f"{Fore.CYAN}Обновление конфигурации{Style.RESET_ALL}")
+        print(f"{CYAN}Обновление конфигурации{RESET}")
         
         # Загружаем текущую конфигурацию
-        current_config = raket.config
+        current_config = load_config()
         
-        print(f"\n{Fore.YELLOW}Текущая конфигурация:{Style.RESET_ALL}")
-        for key, value in current_config.items():
-            print(f"- {key}: {value}")
+        # Вся конфигурация выводится одной записью в stdout
+        sys.stdout.write(f"\n{YELLOW}Текущая конфигурация:{RESET}\n"
+                         + "".join(f"- {key}: {value}\n" for key, value in current_config.items()))
         
         # Запрашиваем новые значения
-        print(f"\n{Fore.CYAN}Введите новые значения (или нажмите Enter, чтобы оставить текущее):{Style.RESET_ALL}")
+        print(f"\n{CYAN}Введите новые значения (или нажмите Enter, чтобы оставить текущее):{RESET}")
         
         new_config = {}
         new_config["min_price_change"] = input(f"Минимальное изменение цены [{current_config.get('min_price_change', 5)}]: ")
@@ -194,21 +319,26 @@ def main():
         
         # Обновляем конфигурацию
         for key, value in new_config.items():
-            if value:  # Если значение не пустое
+            if not value:  # Пустое значение - оставляем текущее
+                continue
+            if key in NUMERIC_KEYS:
                 try:
-                    # Пытаемся преобразовать числовые значения
-                    if key in ["min_price_change", "max_price_change", "min_liquidity", "min_volume", "max_token_age_hours"]:
-                        current_config[key] = float(value)
-                    else:
-                        current_config[key] = value
-                except:
-                    print(f"{Fore.RED}Ошибка: Некорректное значение для {key}: {value}{Style.RESET_ALL}")
+                    current_config[key] = float(value)
+                except ValueError:
+                    print(f"{RED}Ошибка: Некорректное значение для {key}: {value}{RESET}")
+            else:
+                current_config[key] = value
         
         # Сохраняем обновленную конфигурацию
-        with open("config.json", 'w', encoding='utf-8') as f:
-            json.dump(current_config, f, indent=2)
+        # Сериализуем целиком в память и пишем одним вызовом (json.dump пишет по кусочку)
+        if orjson is not None:
+            payload = orjson.dumps(current_config, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(current_config, indent=2).encode('utf-8')
+        with open("config.json", 'wb') as f:
+            f.write(payload)
         
-        print(f"\n{Fore.GREEN}Конфигурация успешно обновлена и сохранена в файл config.json{Style.RESET_ALL}")
+        print(f"\n{GREEN}Конфигурация успешно обновлена и сохранена в файл config.json{RESET}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,52 +1,105 @@
+import csv
 import json
 import logging
+import math
 import os
 import asyncio
 import sys
+import time
 from datetime import datetime
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import attrgetter
+from enum import IntEnum, IntFlag
+from types import MappingProxyType
 import importlib.util
-from typing import Dict, List, Optional, Union
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Union
+import numpy as np
 import pandas as pd
-from tqdm import tqdm
+from tqdm.asyncio import tqdm as atqdm
 from colorama import init, Fore, Style
+from aiolimiter import AsyncLimiter
 
-# Добавляем путь к raket-2 для импорта LiquidityLockChecker
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'raket-2'))
+try:
+    from numba import njit, prange  # optional, JIT для пакетного риск-скора
+except ImportError:
+    njit = None
+    prange = range
+
+try:
+    import orjson  # optional, быстрый C-парсер JSON
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+try:
+    import diskcache  # optional, кэш проверок блокировки и безопасности между запусками
+except ImportError:
+    diskcache = None
+
+try:
+    import pyarrow as pa  # optional, колоночный экспорт в Parquet
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Добавляем путь к raket-2 для импорта LiquidityLockChecker и ContractVerifier (один раз)
+_RAKET2_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'raket-2')
+if _RAKET2_PATH not in sys.path:
+    sys.path.append(_RAKET2_PATH)
 try:
     from src.analysis.liquidity_lock_checker import LiquidityLockChecker
 except ImportError:
     print("⚠️ Не удалось импортировать LiquidityLockChecker. Проверка блокировки ликвидности будет пропущена.")
     LiquidityLockChecker = None
 
-# Импорт анализатора безопасности (устойчивый к окружению)
+# Верификатор контрактов: при отсутствии модуля верификация пропускается
+try:
+    from src.analysis.contract_verifier import ContractVerifier as _ContractVerifier
+    from src.analysis.contract_verifier import ContractVerificationResult as _ContractVerificationResult
+except ImportError:
+    _ContractVerifier = None
+    _ContractVerificationResult = None
+
+class _SimpleVerificationResult:
+    """Пустой результат верификации, если ContractVerificationResult недоступен"""
+    def __init__(self):
+        self.is_verified = False
+        self.is_honeypot = False
+        self.error_message = "Не удалось верифицировать"
+
+# Импорт анализатора безопасности: способ загрузки выбирается заранее через find_spec,
+# без каскада из трех try/except
 SECURITY_ANALYZER_AVAILABLE = False
 SecurityAnalyzer = None
-try:
-    from .analysis.security_analyzer import SecurityAnalyzer as _SA
-    SecurityAnalyzer = _SA
-    SECURITY_ANALYZER_AVAILABLE = True
-except Exception as _e1:
+_sa_spec = None
+if __package__:
+    # Модуль импортирован из пакета - обычный относительный путь
     try:
-        # Fallback: прямой импорт через sys.path
-        sys.path.append(os.path.join(os.path.dirname(__file__), 'analysis'))
-        from security_analyzer import SecurityAnalyzer as _SA2
-        SecurityAnalyzer = _SA2
-        SECURITY_ANALYZER_AVAILABLE = True
-    except Exception as _e2:
-        try:
-            # Fallback 2: импорт по абсолютному пути к файлу
-            analysis_dir = os.path.join(os.path.dirname(__file__), 'analysis')
-            sa_path = os.path.join(analysis_dir, 'security_analyzer.py')
-            spec = importlib.util.spec_from_file_location('security_analyzer', sa_path)
-            if spec and spec.loader:
-                sa_module = importlib.util.module_from_spec(spec)
-                sys.modules['security_analyzer'] = sa_module
-                spec.loader.exec_module(sa_module)
-                SecurityAnalyzer = getattr(sa_module, 'SecurityAnalyzer', None)
-                SECURITY_ANALYZER_AVAILABLE = SecurityAnalyzer is not None
-        except Exception as _e3:
-            print("⚠️ Не удалось импортировать SecurityAnalyzer. Анализ безопасности будет пропущен.")
-            SECURITY_ANALYZER_AVAILABLE = False
+        _sa_spec = importlib.util.find_spec('.analysis.security_analyzer', package=__package__)
+    except ImportError:
+        _sa_spec = None
+if _sa_spec is None:
+    # Запуск как скрипт - загружаем файл analysis/security_analyzer.py по пути
+    _sa_path = os.path.join(os.path.dirname(__file__), 'analysis', 'security_analyzer.py')
+    if os.path.exists(_sa_path):
+        _sa_spec = importlib.util.spec_from_file_location('security_analyzer', _sa_path)
+if _sa_spec is not None and _sa_spec.loader is not None:
+    try:
+        _sa_module = importlib.util.module_from_spec(_sa_spec)
+        sys.modules[_sa_spec.name] = _sa_module
+        _sa_spec.loader.exec_module(_sa_module)
+        SecurityAnalyzer = getattr(_sa_module, 'SecurityAnalyzer', None)
+        SECURITY_ANALYZER_AVAILABLE = SecurityAnalyzer is not None
+    except Exception:
+        # Модуль найден, но его зависимости (web3 и т.п.) не установлены
+        sys.modules.pop(_sa_spec.name, None)
+if not SECURITY_ANALYZER_AVAILABLE:
+    print("⚠️ Не удалось импортировать SecurityAnalyzer. Анализ безопасности будет пропущен.")
 
 # Инициализация colorama для цветного вывода
 init()
@@ -68,60 +121,532 @@ def format_tax_percentage(tax_value):
     except (ValueError, TypeError):
         return str(tax_value) if tax_value else '0'
 
+# Общий пустой fallback для вложенных полей сырых данных (без нового dict на каждый .get)
+_EMPTY = MappingProxyType({})
+
+# Краткие рекомендации по динамике цены: (эмодзи, текст); индекс выбирает _trend_recommendation_index
+_TREND_RECOMMENDATIONS = (
+    ("🚀", "АКТИВНЫЙ РОСТ - рекомендуется для краткосрочной торговли"),
+    ("📉", "КОРРЕКЦИЯ - возможна точка входа"),
+    ("📈", "УСТОЙЧИВЫЙ РОСТ - хорошая среднесрочная перспектива"),
+    ("⚡", "ОТКАТ - возможен отскок"),
+    ("⏸️", "КОНСОЛИДАЦИЯ - накопление позиций"),
+    ("⚠️", "ПЕРЕКУПЛЕН - высокий риск коррекции"),
+    ("📊", "СМЕШАННАЯ ДИНАМИКА - требуется наблюдение"),
+)
+
+def _trend_recommendation_index(trend_1h: float, trend_6h: float, trend_24h: float) -> int:
+    """Индекс рекомендации в _TREND_RECOMMENDATIONS: ветвление по знаку 1ч изменения,
+    чтобы каждое условие проверялось не более одного раза"""
+    if trend_1h > 0:
+        if trend_1h > trend_6h:
+            return 0
+        if trend_6h > 0 and trend_24h > 0:
+            return 2
+    elif trend_1h < 0:
+        if trend_6h < 0:
+            return 1
+        if trend_6h > 0:
+            return 3
+    if abs(trend_1h) < 2 and abs(trend_6h) < 5:
+        return 4
+    if trend_24h > 100 and trend_1h < 0:
+        return 5
+    return 6
+
+# Детальная разбивка риск-скора пишется только на уровне DEBUG
+_RISK_LOGGER = logging.getLogger('risk_score')
+
+# Схема числовых полей Token: (атрибут, путь в сырых данных DexScreener, приведение, значение по умолчанию).
+# Порядок совпадает с кортежем metrics, который принимает Token (плюс age_hours в конце)
+_NUMERIC_FIELD_SPEC = (
+    ('price_usd', ('priceUsd',), float, 0),
+    ('price_native', ('priceNative',), float, 0),
+    ('liquidity_usd', ('liquidity', 'usd'), float, 0),
+    ('volume_24h', ('volume', 'h24'), float, 0),
+    ('volume_6h', ('volume', 'h6'), float, 0),
+    ('volume_1h', ('volume', 'h1'), float, 0),
+    ('price_change_24h', ('priceChange', 'h24'), float, 0),
+    ('price_change_6h', ('priceChange', 'h6'), float, 0),
+    ('price_change_1h', ('priceChange', 'h1'), float, 0),
+    ('buys_24h', ('txns', 'h24', 'buys'), int, 0),
+    ('sells_24h', ('txns', 'h24', 'sells'), int, 0),
+    ('fdv', ('fdv',), float, 0),
+    ('market_cap', ('marketCap',), float, 0),
+)
+
+# Те же поля как колонки pd.json_normalize (вложенные ключи через точку)
+_METRIC_COLUMNS = tuple((attr, '.'.join(path)) for attr, path, _, _ in _NUMERIC_FIELD_SPEC)
+
+# Политика разбора числовых полей одна для пакетной (_batch_metrics) и потоковой (Token._parse_metrics)
+# загрузки: отсутствующее поле или null - значение по умолчанию, нечисловое значение - тоже,
+# но с предупреждением в лог
+_LOAD_LOGGER = logging.getLogger('token_analyzer')
+
+def _coerce_metric(cast: Callable, value, default):
+    """Приводит значение поля к числу; None и нечисловые значения заменяются на default"""
+    if value is None:
+        return cast(default)
+    try:
+        return cast(float(value))
+    except (TypeError, ValueError):
+        _LOAD_LOGGER.warning(f"Некорректное числовое значение {value!r} заменено на {default}")
+        return cast(default)
+
+def _parse_metrics_lenient(self, data, now_ms):
+    """Медленный разбор числовых полей по схеме с _coerce_metric (когда быстрый разбор не справился)"""
+    for attr, path, cast, default in _NUMERIC_FIELD_SPEC:
+        node = data
+        for key in path[:-1]:
+            node = node.get(key) or _EMPTY
+        setattr(self, attr, _coerce_metric(cast, node.get(path[-1]), default))
+    created_at = _coerce_metric(float, data.get('pairCreatedAt'), 0)
+    self.age_hours = (now_ms - created_at) / (3600 * 1000) if created_at else 0.0
+
+def _compile_parse_metrics(spec) -> Callable:
+    """Генерирует разбор числовых полей по схеме: прямой код без цикла по схеме и без
+    повторного чтения общих вложенных объектов (volume, priceChange, txns.h24)"""
+    lines = ["def _parse_metrics(self, data, now_ms):", "  try:"]
+    parents = {(): "data"}
+    for attr, path, cast, default in spec:
+        for depth in range(1, len(path)):
+            prefix = path[:depth]
+            if prefix not in parents:
+                name = f"_p{len(parents)}"
+                lines.append(f"    {name} = {parents[prefix[:-1]]}.get({prefix[-1]!r}) or _EMPTY")
+                parents[prefix] = name
+        lines.append(f"    self.{attr} = {cast.__name__}({parents[path[:-1]]}.get({path[-1]!r}, {default!r}))")
+    lines.append("    created_at = data.get('pairCreatedAt', 0)")
+    lines.append("    self.age_hours = (now_ms - created_at) / (3600 * 1000) if created_at else 0.0")
+    # null или нечисловое значение - разбор заново по общей политике (_coerce_metric)
+    lines.append("  except (TypeError, ValueError):")
+    lines.append("    _parse_metrics_lenient(self, data, now_ms)")
+    
+    namespace = {'_EMPTY': _EMPTY, '_parse_metrics_lenient': _parse_metrics_lenient}
+    exec(compile("\n".join(lines), "<token_parse_metrics>", "exec"), namespace)
+    return namespace['_parse_metrics']
+
+def _batch_metrics(tokens_data: List[Dict], now_ms: float) -> pd.DataFrame:
+    """Приводит числовые поля всех токенов за один векторный проход (вместо float() по каждому полю)"""
+    columns = [col for _, col in _METRIC_COLUMNS]
+    raw = pd.json_normalize(tokens_data, sep='.').reindex(columns=columns + ['pairCreatedAt'])
+    flat = raw.apply(pd.to_numeric, errors='coerce')
+    # Отсутствующие поля и null дают 0 молча, нечисловые значения - с предупреждением (как в _coerce_metric)
+    invalid = int((raw.notna() & flat.isna()).to_numpy().sum())
+    if invalid:
+        _LOAD_LOGGER.warning(f"Некорректных числовых значений: {invalid}, заменены на 0")
+    # Целые по виду значения (priceUsd: "1") тоже должны стать float, как float() в Token
+    flat = flat.fillna(0.0).astype('float64')
+    
+    metrics = pd.DataFrame({attr: flat[col] for attr, col in _METRIC_COLUMNS})
+    metrics['buys_24h'] = metrics['buys_24h'].astype('int64')
+    metrics['sells_24h'] = metrics['sells_24h'].astype('int64')
+    
+    created_at = flat['pairCreatedAt'].to_numpy()
+    metrics['age_hours'] = np.where(created_at != 0, (now_ms - created_at) / (3600 * 1000), 0.0)
+    return metrics
+
+@dataclass(frozen=True, slots=True)
+class RiskThresholds:
+    """Пороги риск-скора из конфигурации, разобранные один раз (без цепочек config.get на каждый токен)"""
+    suspicious_price_change: float = 1000.0
+    low_liquidity: float = 1000.0
+    suspicious_vol_liq: float = 5.0
+    
+    @classmethod
+    def from_config(cls, config: Dict) -> 'RiskThresholds':
+        return cls(
+            suspicious_price_change=float(config.get('price_change_thresholds', {}).get('suspicious', {}).get('min', 1000)),
+            low_liquidity=float(config.get('liquidity_thresholds', {}).get('high_risk', 1000)),
+            suspicious_vol_liq=float(config.get('volume_liquidity_ratios', {}).get('suspicious', {}).get('min', 5)),
+        )
+
+
+@dataclass(slots=True)
+class SecurityInput:
+    """Входные данные SecurityAnalyzer.analyze_token_security для одного токена. Анализатор читает
+    их через .get(ключ, default), как словарь; ключу 'chainId' соответствует поле chain_id"""
+    address: str
+    name: str
+    symbol: str
+    chain_id: str
+    volume_24h: float
+    price_change_24h: float
+    buys_24h: int
+    sells_24h: int
+    market_cap: float
+    liquidity_locked: bool = False
+    liquidity_lock_period: Optional[int] = None
+    total_holders: int = 0
+    top_10_percent: float = 0.0
+    
+    def get(self, key: str, default=None):
+        return getattr(self, 'chain_id' if key == 'chainId' else key, default)
+
+
+class RiskLevel(IntEnum):
+    """Уровень риска токена (по возрастанию); название для отчетов - _RISK_LEVEL_NAMES[level]"""
+    LOW = 0
+    MOD = 1
+    MED = 2
+    HIGH = 3
+    SCAM = 4
+
+# Названия уровней риска, индекс - RiskLevel (и индексы уровней в пакетном расчете риск-скора)
+_RISK_LEVEL_NAMES = ("Низкий", "Умеренный", "Средний", "Высокий", "Скам")
+# Корзина TokenAnalyzer для каждого RiskLevel: низкий (вместе с умеренным), средний, высокий, скам
+_RISK_BUCKET_OF_LEVEL = np.array([0, 0, 1, 2, 3], dtype=np.intp)
+
+class RiskFactor(IntFlag):
+    """Сработавшие правила риск-скора (биты Token.risk_flags). Порядок битов - порядок факторов
+    в отчетах; биты до PUMP_500 дают баллы, остальные - корректировки уровня риска"""
+    ANOMALOUS_PRICE = 1 << 0
+    NEW_TOKEN = 1 << 1
+    YOUNG_TOKEN = 1 << 2
+    LOW_LIQUIDITY = 1 << 3
+    SUSPICIOUS_VOL_LIQ = 1 << 4
+    NO_WEB_PRESENCE = 1 << 5
+    HIGH_SELL_RATIO = 1 << 6
+    LIQ_NOT_LOCKED = 1 << 7
+    LIQ_LOCK_WEAK = 1 << 8
+    LIQ_LOCK_MEDIUM = 1 << 9
+    LOCK_UNCHECKED_MATURE = 1 << 10
+    LOCK_UNCHECKED = 1 << 11
+    VOL_LIQ_OVER_20 = 1 << 12
+    VOL_LIQ_OVER_5 = 1 << 13
+    PUMP_500 = 1 << 14
+    LOW_LIQ_FOR_LOW_RISK = 1 << 15
+    UNVERIFIED_UNLOCKED = 1 << 16
+    VERIFIED_UNLOCKED = 1 << 17
+    LOW_LIQ_FOR_MEDIUM = 1 << 18
+    LOW_LIQ_FOR_HIGH = 1 << 19
+
+# Тексты факторов риска: строятся только при чтении Token.risk_factors
+_FACTOR_MESSAGES: Dict[RiskFactor, Callable[['Token'], str]] = {
+    RiskFactor.ANOMALOUS_PRICE: lambda t: f"Аномальный рост цены: {t.price_change_24h:.2f}%",
+    RiskFactor.NEW_TOKEN: lambda t: f"🚨 КРИТИЧНО: Новый токен (<24ч): {t.age_hours:.2f} часов",
+    RiskFactor.YOUNG_TOKEN: lambda t: f"Молодой токен (<7 дней): {t.age_hours:.2f} часов",
+    RiskFactor.LOW_LIQUIDITY: lambda t: f"Низкая ликвидность: ${t.liquidity_usd:.2f}",
+    RiskFactor.SUSPICIOUS_VOL_LIQ: lambda t: f"Подозрительное соотношение объема к ликвидности: {(t.volume_24h / t.liquidity_usd if t.liquidity_usd > 0 else 0):.2f}",
+    RiskFactor.NO_WEB_PRESENCE: lambda t: "Нет информации о сайте и социальных сетях",
+    RiskFactor.HIGH_SELL_RATIO: lambda t: f"Высокий процент продаж: {t.sells_24h / (t.buys_24h + t.sells_24h) * 100:.1f}%",
+    RiskFactor.LIQ_NOT_LOCKED: lambda t: "🚨 КРИТИЧНО: Ликвидность НЕ заблокирована - высокий риск rug pull!",
+    RiskFactor.LIQ_LOCK_WEAK: lambda t: f"⚠️ Низкий уровень блокировки ликвидности: {t.liquidity_lock_score}/100",
+    RiskFactor.LIQ_LOCK_MEDIUM: lambda t: f"⚠️ Средний уровень блокировки ликвидности: {t.liquidity_lock_score}/100",
+    RiskFactor.LOCK_UNCHECKED_MATURE: lambda t: "Статус блокировки ликвидности не проверен (но токен крупный/зрелый)",
+    RiskFactor.LOCK_UNCHECKED: lambda t: "Статус блокировки ликвидности не проверен",
+    RiskFactor.VOL_LIQ_OVER_20: lambda t: "Подозрительно высокое соотношение объем/ликвидность - возможна манипуляция",
+    RiskFactor.VOL_LIQ_OVER_5: lambda t: "Высокое соотношение объем/ликвидность - повышенная волатильность",
+    RiskFactor.PUMP_500: lambda t: "Экстремальный рост >500% - подозрение на памп-схему",
+    RiskFactor.LOW_LIQ_FOR_LOW_RISK: lambda t: "Недостаточная ликвидность для низкого риска (<$100K)",
+    RiskFactor.UNVERIFIED_UNLOCKED: lambda t: "Неверифицированный контракт без блокировки ликвидности",
+    RiskFactor.VERIFIED_UNLOCKED: lambda t: "Ликвидность не заблокирована - риск rug pull даже для верифицированного контракта",
+    RiskFactor.LOW_LIQ_FOR_MEDIUM: lambda t: "Недостаточная ликвидность для среднего риска (<$50K)",
+    RiskFactor.LOW_LIQ_FOR_HIGH: lambda t: "Критически низкая ликвидность (<$25K)",
+}
+
+# Записи детальной разбивки риск-скора для правил, которые в нее попадают
+_FACTOR_BREAKDOWN: Dict[RiskFactor, str] = {
+    RiskFactor.VOL_LIQ_OVER_20: "V/L>20: +25",
+    RiskFactor.VOL_LIQ_OVER_5: "V/L>5: +10",
+    RiskFactor.PUMP_500: "Рост>500%: +30",
+}
+
+# Баллы за правила 0-14 (в порядке битов)
+_RISK_RULE_PENALTIES = (30, 50, 20, 15, 25, 20, 25, 60, 40, 20, 10, 20, 25, 10, 30)
+
+def _risk_score_numpy(price_change_24h, age, liq, vol, buys, sells, has_info, has_lock_score, lock_score,
+                      lock_pct, verified, suspicious_price, low_liquidity, suspicious_ratio):
+    """Риск-скор пакета на масках NumPy: (баллы, индексы уровней, флаги правил)"""
+    n = price_change_24h.shape[0]
+    ratio = np.divide(vol, liq, out=np.zeros(n), where=liq > 0)
+    total_txns = buys + sells
+    sell_ratio = np.divide(sells, total_txns, out=np.zeros(n), where=total_txns > 0)
+    
+    no_lock = has_lock_score & (lock_score == 0)
+    weak_lock = has_lock_score & ~no_lock & (lock_score < 30)
+    medium_lock = has_lock_score & ~no_lock & ~weak_lock & (lock_score < 60)
+    big_mature = ~has_lock_score & (liq >= 100000) & (age >= 720)
+    masks = (
+        price_change_24h > suspicious_price,
+        age < 24,
+        (age >= 24) & (age < 168),
+        liq < low_liquidity,
+        ratio > suspicious_ratio,
+        ~has_info,
+        (total_txns > 0) & (sell_ratio > 0.8),
+        no_lock,
+        weak_lock,
+        medium_lock,
+        big_mature,
+        ~has_lock_score & ~big_mature,
+        ratio > 20,
+        (ratio <= 20) & (ratio > 5),
+        price_change_24h > 500,
+    )
+    
+    scores = np.zeros(n, dtype=np.int32)
+    flags = np.zeros(n, dtype=np.uint32)
+    for bit, (mask, penalty) in enumerate(zip(masks, _RISK_RULE_PENALTIES)):
+        scores += np.where(mask, penalty, 0).astype(np.int32)
+        flags |= np.left_shift(mask.astype(np.uint32), np.uint32(bit))
+    
+    levels = np.select([scores >= 120, scores >= 80, scores >= 50, scores >= 25],
+                       [RiskLevel.SCAM, RiskLevel.HIGH, RiskLevel.MED, RiskLevel.MOD], default=RiskLevel.LOW).astype(np.int8)
+    low = scores < 25
+    low_liquidity_mask = low & (liq < 100000)
+    unlocked = low & ~low_liquidity_mask & (lock_pct == 0)
+    locked = low & ~low_liquidity_mask & ~unlocked
+    levels[low_liquidity_mask] = RiskLevel.MOD
+    levels[unlocked & ~verified] = RiskLevel.MED
+    levels[unlocked & verified] = RiskLevel.MOD
+    levels[locked & ~(((lock_pct >= 30) & (liq >= 100000)) | (lock_pct >= 75))] = RiskLevel.MOD
+    flags |= np.left_shift(low_liquidity_mask.astype(np.uint32), np.uint32(15))
+    flags |= np.left_shift((unlocked & ~verified).astype(np.uint32), np.uint32(16))
+    flags |= np.left_shift((unlocked & verified).astype(np.uint32), np.uint32(17))
+    
+    # Средний риск без $50K и высокий без $25K ликвидности повышаются на уровень
+    for level, min_liq, bit in ((RiskLevel.MED, 50000, 18), (RiskLevel.HIGH, 25000, 19)):
+        bump = (levels == level) & (liq < min_liq)
+        levels[bump] = level + 1
+        flags |= np.left_shift(bump.astype(np.uint32), np.uint32(bit))
+    
+    return scores, levels, flags
+
+def _risk_score_loop(price_change_24h, age, liq, vol, buys, sells, has_info, has_lock_score, lock_score,
+                     lock_pct, verified, suspicious_price, low_liquidity, suspicious_ratio):
+    """Тот же расчет, что _risk_score_numpy, скалярным циклом - ядро для numba.njit
+    (уровни - целые значения RiskLevel: 0 LOW ... 4 SCAM)"""
+    n = price_change_24h.shape[0]
+    scores = np.zeros(n, dtype=np.int32)
+    levels = np.zeros(n, dtype=np.int8)
+    flags = np.zeros(n, dtype=np.uint32)
+    for i in prange(n):
+        score = 0
+        f = 0
+        ratio = vol[i] / liq[i] if liq[i] > 0 else 0.0
+        if price_change_24h[i] > suspicious_price:
+            score += _RISK_RULE_PENALTIES[0]
+            f |= 1 << 0
+        if age[i] < 24:
+            score += _RISK_RULE_PENALTIES[1]
+            f |= 1 << 1
+        elif age[i] < 168:
+            score += _RISK_RULE_PENALTIES[2]
+            f |= 1 << 2
+        if liq[i] < low_liquidity:
+            score += _RISK_RULE_PENALTIES[3]
+            f |= 1 << 3
+        if ratio > suspicious_ratio:
+            score += _RISK_RULE_PENALTIES[4]
+            f |= 1 << 4
+        if not has_info[i]:
+            score += _RISK_RULE_PENALTIES[5]
+            f |= 1 << 5
+        total_txns = buys[i] + sells[i]
+        if total_txns > 0 and sells[i] / total_txns > 0.8:
+            score += _RISK_RULE_PENALTIES[6]
+            f |= 1 << 6
+        if has_lock_score[i]:
+            if lock_score[i] == 0:
+                score += _RISK_RULE_PENALTIES[7]
+                f |= 1 << 7
+            elif lock_score[i] < 30:
+                score += _RISK_RULE_PENALTIES[8]
+                f |= 1 << 8
+            elif lock_score[i] < 60:
+                score += _RISK_RULE_PENALTIES[9]
+                f |= 1 << 9
+        elif liq[i] >= 100000 and age[i] >= 720:
+            score += _RISK_RULE_PENALTIES[10]
+            f |= 1 << 10
+        else:
+            score += _RISK_RULE_PENALTIES[11]
+            f |= 1 << 11
+        if ratio > 20:
+            score += _RISK_RULE_PENALTIES[12]
+            f |= 1 << 12
+        elif ratio > 5:
+            score += _RISK_RULE_PENALTIES[13]
+            f |= 1 << 13
+        if price_change_24h[i] > 500:
+            score += _RISK_RULE_PENALTIES[14]
+            f |= 1 << 14
+        
+        if score >= 120:
+            level = 4
+        elif score >= 80:
+            level = 3
+        elif score >= 50:
+            level = 2
+        elif score >= 25:
+            level = 1
+        elif liq[i] < 100000:
+            level = 1
+            f |= 1 << 15
+        elif lock_pct[i] == 0:
+            if not verified[i]:
+                level = 2
+                f |= 1 << 16
+            else:
+                level = 1
+                f |= 1 << 17
+        elif (lock_pct[i] >= 30 and liq[i] >= 100000) or lock_pct[i] >= 75:
+            level = 0
+        else:
+            level = 1
+        if level == 2 and liq[i] < 50000:
+            level = 3
+            f |= 1 << 18
+        if level == 3 and liq[i] < 25000:
+            level = 4
+            f |= 1 << 19
+        
+        scores[i] = score
+        levels[i] = level
+        flags[i] = f
+    return scores, levels, flags
+
+# С numba (optional) риск-скор считается скомпилированным параллельным циклом, иначе - масками NumPy
+_risk_score_kernel = _risk_score_numpy
+if njit is not None:
+    try:
+        _risk_score_kernel = njit(cache=True, fastmath=True, parallel=True)(_risk_score_loop)
+        # Прогрев: компиляция при импорте, а не на первом анализе
+        _one = np.ones(1)
+        _flag = np.ones(1, dtype=bool)
+        _risk_score_kernel(_one, _one, _one, _one, _one, _one, _flag, _flag, _one, _one, _flag, 1000.0, 1000.0, 5.0)
+    except Exception:
+        _risk_score_kernel = _risk_score_numpy
+
+# Размер блока строк для многопоточного расчета масками NumPy
+_SCORE_CHUNK = 1 << 16
+
+def _risk_score_chunked(arrays: tuple, thresholds: tuple, workers: int):
+    """_risk_score_numpy по блокам строк в пуле потоков: операции NumPy над массивами отпускают GIL,
+    поэтому блоки считаются параллельно. Используется без numba (у нее свой параллельный цикл)"""
+    n = len(arrays[0])
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        parts = list(executor.map(
+            lambda lo: _risk_score_numpy(*(a[lo:lo + _SCORE_CHUNK] for a in arrays), *thresholds),
+            range(0, n, _SCORE_CHUNK)))
+    return tuple(np.concatenate(columns) for columns in zip(*parts))
+
+# Числовые атрибуты Token в SoA-представлении TokenAnalyzer.metrics_df
+_METRIC_ATTRS = tuple(attr for attr, _ in _METRIC_COLUMNS) + ('age_hours',)
+
+@lru_cache(maxsize=4096)
+def _fmt_age(hours: int) -> str:
+    """Возраст в часах в виде "1г 2м 3н 4д" (кэшируется: одинаковые возрасты повторяются в отчетах)"""
+    years = int(hours / (24 * 365))
+    hours = hours % (24 * 365)
+    
+    months = int(hours / (24 * 30))
+    hours = hours % (24 * 30)
+    
+    weeks = int(hours / (24 * 7))
+    hours = hours % (24 * 7)
+    
+    days = int(hours / 24)
+    hours = int(hours % 24)
+    
+    parts = []
+    if years > 0:
+        parts.append(f"{years}г")
+    if months > 0:
+        parts.append(f"{months}м")
+    if weeks > 0:
+        parts.append(f"{weeks}н")
+    if days > 0:
+        parts.append(f"{days}д")
+    if hours > 0 and len(parts) == 0:
+        parts.append(f"{hours}ч")
+        
+    return " ".join(parts)
+
+def _fmt_age_column(age_hours: np.ndarray) -> np.ndarray:
+    """Векторная версия _fmt_age для всей колонки возрастов (те же разряды и тот же вид строк)"""
+    hours = np.floor(np.nan_to_num(np.asarray(age_hours, dtype=np.float64))).astype(np.int64)
+    years = (hours / (24 * 365)).astype(np.int64)  # усечение к нулю, как int() в _fmt_age
+    rest = np.mod(hours, 24 * 365)
+    months, rest = np.divmod(rest, 24 * 30)
+    weeks, rest = np.divmod(rest, 24 * 7)
+    days, rest = np.divmod(rest, 24)
+    
+    out = np.full(len(hours), '', dtype='<U32')
+    for value, suffix in ((years, 'г'), (months, 'м'), (weeks, 'н'), (days, 'д')):
+        present = value > 0
+        if not present.any():
+            continue
+        part = np.char.add(value.astype(str), suffix)
+        sep = np.where(out != '', ' ', '')
+        out = np.where(present, np.char.add(np.char.add(out, sep), part), out)
+    only_hours = (out == '') & (rest > 0)
+    return np.where(only_hours, np.char.add(rest.astype(str), 'ч'), out)
+
+@lru_cache(maxsize=8192)
+def _fmt_money(amount: float) -> str:
+    """Денежная сумма в виде $1.23K/$4.56M/$7.89B (кэшируется по точному значению)"""
+    if amount >= 1_000_000_000:  # миллиарды
+        return f"${amount / 1_000_000_000:.2f}B"
+    elif amount >= 1_000_000:  # миллионы
+        return f"${amount / 1_000_000:.2f}M"
+    elif amount >= 1_000:  # тысячи
+        return f"${amount / 1_000:.2f}K"
+    else:
+        return f"${amount:.2f}"
+
 class Token:
     """Класс для хранения информации о токене"""
-    def __init__(self, data: Dict):
+    # Фиксированный набор атрибутов вместо __dict__ на каждый экземпляр. Все слоты задаются
+    # в __init__; поля этапов анализа (блокировка ликвидности, верификация) до них равны None
+    __slots__ = (
+        'address', 'name', 'symbol', 'network', '_network_lc', 'pair_address', 'dex_id', 'url',
+        'price_usd', 'price_native', 'liquidity_usd', 'volume_24h', 'volume_6h', 'volume_1h',
+        'price_change_24h', 'price_change_6h', 'price_change_1h', 'buys_24h', 'sells_24h',
+        'fdv', 'market_cap', 'age_hours', '_age_str', 'info', 'has_website', 'has_socials',
+        'risk_score', 'risk_level', '_risk_factors', 'risk_flags', '_risk_config_stamp', 'score_breakdown',
+        'security_report', 'security_score', 'security_issues', 'contract_verified',
+        'ownership_renounced', 'liquidity_locked', 'liquidity_lock_period', 'honeypot_probability',
+        'liquidity_lock_info', 'liquidity_lock_score', 'verification_result',
+    )
+    
+    def __init__(self, data: Dict, metrics: Optional[tuple] = None, now_ms: Optional[float] = None):
         # Базовая информация о токене
-        base_token = data.get('baseToken', {})
+        base_token = data.get('baseToken') or _EMPTY
         self.address = base_token.get('address', '')
         self.name = base_token.get('name', '')
         self.symbol = base_token.get('symbol', '')
         self.network = data.get('chainId', '')
+        self._network_lc = self.network.lower()
+        self._age_str = None  # Заполняется пакетно в TokenAnalyzer.get_token_df
         
         # Информация о паре
         self.pair_address = data.get('pairAddress', '')
         self.dex_id = data.get('dexId', '')
         self.url = data.get('url', '')
         
-        # Ценовые метрики
-        self.price_usd = float(data.get('priceUsd', 0))
-        self.price_native = float(data.get('priceNative', 0))
-        
-        # Объемы и ликвидность
-        liquidity = data.get('liquidity', {})
-        self.liquidity_usd = float(liquidity.get('usd', 0))
-        
-        volume = data.get('volume', {})
-        self.volume_24h = float(volume.get('h24', 0))
-        self.volume_6h = float(volume.get('h6', 0))
-        self.volume_1h = float(volume.get('h1', 0))
-        
-        # Изменения цены
-        price_change = data.get('priceChange', {})
-        self.price_change_24h = float(price_change.get('h24', 0))
-        self.price_change_6h = float(price_change.get('h6', 0))
-        self.price_change_1h = float(price_change.get('h1', 0))
-        
-        # Транзакции
-        txns = data.get('txns', {}).get('h24', {})
-        self.buys_24h = int(txns.get('buys', 0))
-        self.sells_24h = int(txns.get('sells', 0))
-        
-        # Рыночные показатели
-        self.fdv = float(data.get('fdv', 0))
-        self.market_cap = float(data.get('marketCap', 0))
-        
-        # Время создания
-        created_at = data.get('pairCreatedAt', 0)
-        self.age_hours = (datetime.now().timestamp() * 1000 - created_at) / (3600 * 1000) if created_at else 0
+        if metrics is not None:
+            # Числовые поля уже приведены пакетно (см. _batch_metrics)
+            (self.price_usd, self.price_native, self.liquidity_usd,
+             self.volume_24h, self.volume_6h, self.volume_1h,
+             self.price_change_24h, self.price_change_6h, self.price_change_1h,
+             self.buys_24h, self.sells_24h, self.fdv, self.market_cap, self.age_hours) = metrics
+        else:
+            self._parse_metrics(data, time.time() * 1000 if now_ms is None else now_ms)
         
         # Дополнительная информация
         self.info = data.get('info', {})
+        # Наличие сайта/соцсетей проверяется в нескольких правилах - считаем один раз
+        self.has_website = bool(self.info.get('websites'))
+        self.has_socials = bool(self.info.get('socials'))
         
         # Аналитические поля
         self.risk_score = 0
         self.risk_level = "Низкий"
-        self.risk_factors = []
+        self._risk_factors = []  # Факторы этапов анализа (верификация и т.п.)
+        self.risk_flags = 0  # Сработавшие правила риск-скора (RiskFactor)
+        self._risk_config_stamp = None  # Версия конфигурации, при которой посчитан риск-скор
         
         # Поля безопасности
         self.security_report = None
@@ -133,42 +658,63 @@ class Token:
         self.liquidity_lock_period = None
         self.honeypot_probability = 0.0
         
-    def calculate_risk_score(self, config: Dict) -> int:
-        """Расчет риск-скора на основе метрик токена с весовыми коэффициентами"""
+        # Результаты этапов анализа (None - этап не выполнялся): атрибуты есть всегда, без hasattr
+        self.score_breakdown = []
+        self.liquidity_lock_info = None
+        self.liquidity_lock_score = None
+        self.verification_result = None
+    
+    # Разбор числовых полей одного токена (потоковая загрузка и одиночные токены),
+    # сгенерирован по _NUMERIC_FIELD_SPEC
+    _parse_metrics = _compile_parse_metrics(_NUMERIC_FIELD_SPEC)
+    
+    @property
+    def risk_factors(self) -> List[str]:
+        """Факторы риска: факторы этапов анализа и тексты сработавших правил риск-скора.
+        Чтение не меняет токен (отчеты читают его параллельно из разных потоков)"""
+        flags = self.risk_flags
+        if not flags:
+            return list(self._risk_factors)
+        return self._risk_factors + [message(self) for factor, message in _FACTOR_MESSAGES.items() if flags & factor]
+    
+    def calculate_risk_score(self, thresholds: Union[RiskThresholds, Dict]) -> int:
+        """Расчет риск-скора на основе метрик токена с весовыми коэффициентами.
+        Принимает RiskThresholds (TokenAnalyzer.thresholds) или словарь конфигурации"""
+        if not isinstance(thresholds, RiskThresholds):
+            thresholds = RiskThresholds.from_config(thresholds)
         score = 0
+        flags = 0  # Сработавшие правила (RiskFactor), тексты факторов строятся лениво
         score_breakdown = []  # Детальная разбивка для прозрачности
-        risk_thresholds = config.get('risk_thresholds', {})
+        # Соотношение объема к ликвидности считается один раз и используется обоими правилами
+        vol_liq_ratio = self.volume_24h / self.liquidity_usd if self.liquidity_usd > 0 else 0.0
         
         # Проверка изменения цены
-        if self.price_change_24h > config.get('price_change_thresholds', {}).get('suspicious', {}).get('min', 1000):
+        if self.price_change_24h > thresholds.suspicious_price_change:
             score += 30
-            self.risk_factors.append(f"Аномальный рост цены: {self.price_change_24h:.2f}%")
+            flags |= RiskFactor.ANOMALOUS_PRICE
         
         # 🚨 КРИТИЧНО: Проверка возраста токена - молодые токены автоматически высокий риск
         if self.age_hours < 24:
             score += 50  # Критичный штраф для токенов младше 24ч
-            self.risk_factors.append(f"🚨 КРИТИЧНО: Новый токен (<24ч): {self.age_hours:.2f} часов")
+            flags |= RiskFactor.NEW_TOKEN
         elif self.age_hours < 168:  # Меньше недели
             score += 20
-            self.risk_factors.append(f"Молодой токен (<7 дней): {self.age_hours:.2f} часов")
+            flags |= RiskFactor.YOUNG_TOKEN
         
         # Проверка ликвидности
-        if self.liquidity_usd < config.get('liquidity_thresholds', {}).get('high_risk', 1000):
+        if self.liquidity_usd < thresholds.low_liquidity:
             score += 15
-            self.risk_factors.append(f"Низкая ликвидность: ${self.liquidity_usd:.2f}")
+            flags |= RiskFactor.LOW_LIQUIDITY
         
         # Соотношение объема к ликвидности
-        vol_liq_ratio = self.volume_24h / self.liquidity_usd if self.liquidity_usd > 0 else 0
-        if vol_liq_ratio > config.get('volume_liquidity_ratios', {}).get('suspicious', {}).get('min', 5):
+        if vol_liq_ratio > thresholds.suspicious_vol_liq:
             score += 25
-            self.risk_factors.append(f"Подозрительное соотношение объема к ликвидности: {vol_liq_ratio:.2f}")
+            flags |= RiskFactor.SUSPICIOUS_VOL_LIQ
         
         # Проверка наличия сайта и соцсетей
-        has_website = bool(self.info.get("websites", []))
-        has_socials = bool(self.info.get("socials", []))
-        if not has_website and not has_socials:
+        if not (self.has_website or self.has_socials):
             score += 20
-            self.risk_factors.append("Нет информации о сайте и социальных сетях")
+            flags |= RiskFactor.NO_WEB_PRESENCE
         
         # Анализ транзакций
         total_txns = self.buys_24h + self.sells_24h
@@ -176,19 +722,19 @@ class Token:
             sell_ratio = self.sells_24h / total_txns
             if sell_ratio > 0.8:  # Если более 80% транзакций - продажи
                 score += 25
-                self.risk_factors.append(f"Высокий процент продаж: {sell_ratio*100:.1f}%")
+                flags |= RiskFactor.HIGH_SELL_RATIO
         
         # 🚨 КРИТИЧНО: Блокировка ликвидности - без нее автоматом +2 уровня риска
-        if hasattr(self, 'liquidity_lock_score') and self.liquidity_lock_score is not None:
+        if self.liquidity_lock_score is not None:
             if self.liquidity_lock_score == 0:
                 score += 60  # Критичный штраф за отсутствие блокировки
-                self.risk_factors.append("🚨 КРИТИЧНО: Ликвидность НЕ заблокирована - высокий риск rug pull!")
+                flags |= RiskFactor.LIQ_NOT_LOCKED
             elif self.liquidity_lock_score < 30:
                 score += 40  # Усиленный штраф за плохую блокировку
-                self.risk_factors.append(f"⚠️ Низкий уровень блокировки ликвидности: {self.liquidity_lock_score}/100")
+                flags |= RiskFactor.LIQ_LOCK_WEAK
             elif self.liquidity_lock_score < 60:
                 score += 20  # Умеренный штраф
-                self.risk_factors.append(f"⚠️ Средний уровень блокировки ликвидности: {self.liquidity_lock_score}/100")
+                flags |= RiskFactor.LIQ_LOCK_MEDIUM
         else:
             # СМЯГЧЕНО: Для крупных/зрелых токенов меньший штраф
             has_high_liquidity = self.liquidity_usd >= 100000
@@ -196,168 +742,159 @@ class Token:
             
             if has_high_liquidity and has_mature_age:
                 score += 10  # Минимальный штраф для крупных токенов
-                self.risk_factors.append("Статус блокировки ликвидности не проверен (но токен крупный/зрелый)")
+                flags |= RiskFactor.LOCK_UNCHECKED_MATURE
             else:
                 score += 20  # Обычный штраф
-                self.risk_factors.append("Статус блокировки ликвидности не проверен")
+                flags |= RiskFactor.LOCK_UNCHECKED
         
         # 🎯 КРИТИЧЕСКИЕ ФИЛЬТРЫ БЕЗОПАСНОСТИ
         
         # 1. Проверка блокировки ликвидности
         liquidity_lock_percentage = 0
-        if hasattr(self, 'liquidity_lock_info') and self.liquidity_lock_info and self.liquidity_lock_info.is_locked:
+        if self.liquidity_lock_info and self.liquidity_lock_info.is_locked:
             liquidity_lock_percentage = self.liquidity_lock_info.locked_percentage
         
         # 2. 📊 КРИТИЧЕСКИЙ ФАКТОР: Соотношение объем/ликвидность (вес: высокий)
-        volume_ratio = self.volume_24h / self.liquidity_usd if self.liquidity_usd > 0 else 0
-        if volume_ratio > 20:
+        if vol_liq_ratio > 20:
             penalty = 25  # Красный флаг - возможна манипуляция
             score += penalty
             score_breakdown.append(f"V/L>20: +{penalty}")
-            self.risk_factors.append("Подозрительно высокое соотношение объем/ликвидность - возможна манипуляция")
-        elif volume_ratio > 5:
+            flags |= RiskFactor.VOL_LIQ_OVER_20
+        elif vol_liq_ratio > 5:
             penalty = 10  # Желтый флаг - повышенная волатильность
             score += penalty
             score_breakdown.append(f"V/L>5: +{penalty}")
-            self.risk_factors.append("Высокое соотношение объем/ликвидность - повышенная волатильность")
+            flags |= RiskFactor.VOL_LIQ_OVER_5
         
         # 3. ⚠️ ВАЖНЫЙ ФАКТОР: Экстремальный рост (вес: высокий)
         if self.price_change_24h > 500:
             penalty = 30
             score += penalty
             score_breakdown.append(f"Рост>500%: +{penalty}")
-            self.risk_factors.append("Экстремальный рост >500% - подозрение на памп-схему")
+            flags |= RiskFactor.PUMP_500
         
         # 🚨 УЖЕСТОЧЕННЫЕ ПОРОГИ РИСКА с учетом критичных штрафов
         if score >= 120:  # Критичные проблемы (молодость + отсутствие блокировки = 110+ баллов)
-            self.risk_level = "Скам"
+            level = RiskLevel.SCAM
         elif score >= 80:   # Серьезные проблемы
-            self.risk_level = "Высокий"
+            level = RiskLevel.HIGH
         elif score >= 50:   # Умеренные проблемы
-            self.risk_level = "Средний"
+            level = RiskLevel.MED
         elif score >= 25:   # Небольшие проблемы
-            self.risk_level = "Умеренный"
+            level = RiskLevel.MOD
         else:
             # 🚨 УЖЕСТОЧЕННАЯ ЛОГИКА для "Низкий риск" - только безопасные токены
             # Базовые требования для низкого риска (реалистичные для инвестиций)
             if self.liquidity_usd < 100000:  # Возвращаем требование $100K
-                self.risk_level = "Умеренный"
-                self.risk_factors.append("Недостаточная ликвидность для низкого риска (<$100K)")
+                level = RiskLevel.MOD
+                flags |= RiskFactor.LOW_LIQ_FOR_LOW_RISK
             # 🚨 КРИТИЧНО: Без блокировки ликвидности НЕ может быть "Низкий риск"!
             elif liquidity_lock_percentage == 0:
                 is_verified = False
-                if hasattr(self, 'verification_result') and self.verification_result:
+                if self.verification_result:
                     is_verified = self.verification_result.is_verified
                 
                 if not is_verified:
-                    self.risk_level = "Средний"  # Неверифицированный без блокировки = средний риск
-                    self.risk_factors.append("Неверифицированный контракт без блокировки ликвидности")
+                    level = RiskLevel.MED  # Неверифицированный без блокировки = средний риск
+                    flags |= RiskFactor.UNVERIFIED_UNLOCKED
                 else:
                     # Даже верифицированный без блокировки = максимум умеренный риск
-                    self.risk_level = "Умеренный"
-                    self.risk_factors.append("Ликвидность не заблокирована - риск rug pull даже для верифицированного контракта")
+                    level = RiskLevel.MOD
+                    flags |= RiskFactor.VERIFIED_UNLOCKED
             # Частичная блокировка (30%+) с хорошей ликвидностью = низкий риск
             elif liquidity_lock_percentage >= 30 and self.liquidity_usd >= 100000:
-                self.risk_level = "Низкий"
+                level = RiskLevel.LOW
             # Полная блокировка (75%+) = низкий риск независимо от верификации
             elif liquidity_lock_percentage >= 75:
-                self.risk_level = "Низкий"
+                level = RiskLevel.LOW
             else:
-                self.risk_level = "Умеренный"
+                level = RiskLevel.MOD
         
         # ДОПОЛНИТЕЛЬНЫЕ ПРОВЕРКИ для среднего риска
-        if self.risk_level == "Средний":
-            # Минимальная ликвидность $50K для среднего риска
-            if self.liquidity_usd < 50000:
-                self.risk_level = "Высокий"
-                self.risk_factors.append("Недостаточная ликвидность для среднего риска (<$50K)")
+        # Минимальная ликвидность $50K для среднего риска
+        if level == RiskLevel.MED and self.liquidity_usd < 50000:
+            level = max(level, RiskLevel.HIGH)
+            flags |= RiskFactor.LOW_LIQ_FOR_MEDIUM
         
         # ДОПОЛНИТЕЛЬНЫЕ ПРОВЕРКИ для высокого риска
-        if self.risk_level == "Высокий":
-            # Минимальная ликвидность $25K для высокого риска
-            if self.liquidity_usd < 25000:
-                self.risk_level = "Скам"
-                self.risk_factors.append("Критически низкая ликвидность (<$25K)")
+        # Минимальная ликвидность $25K для высокого риска
+        if level == RiskLevel.HIGH and self.liquidity_usd < 25000:
+            level = max(level, RiskLevel.SCAM)
+            flags |= RiskFactor.LOW_LIQ_FOR_HIGH
+        
+        # Строковое название уровня - для отчетов и фильтров
+        self.risk_level = _RISK_LEVEL_NAMES[level]
+        
+        # Флаги заменяются: тексты факторов строятся по последнему расчету, без дублей при пересчете
+        self.risk_flags = flags
         
         # Сохраняем детальную разбивку для отчетов
         self.score_breakdown = score_breakdown
         self.risk_score = score
         
         # Логируем детальную разбивку для прозрачности
-        if score_breakdown:
-            # Используем print для отладки, так как logger не доступен в методе Token
-            print(f"[RISK_SCORE] {self.symbol}: Итого {score} баллов. Разбивка: {', '.join(score_breakdown)}")
+        if score_breakdown and _RISK_LOGGER.isEnabledFor(logging.DEBUG):
+            _RISK_LOGGER.debug("[RISK_SCORE] %s: Итого %d баллов. Разбивка: %s",
+                               self.symbol, score, ', '.join(score_breakdown))
         
         return score
     
+    # Шаблоны ссылок по сетям (ключ - сеть в нижнем регистре), подставляется адрес токена
+    _EXPLORER_TEMPLATES = {
+        'solana': 'https://solscan.io/token/{addr}',
+        'ethereum': 'https://etherscan.io/token/{addr}',
+        'bsc': 'https://bscscan.com/token/{addr}',
+        'arbitrum': 'https://arbiscan.io/token/{addr}',
+        'polygon': 'https://polygonscan.com/token/{addr}'
+    }
+    _DEX_TEMPLATES = {
+        'solana': 'https://jup.ag/swap/SOL-{addr}',
+        'ethereum': 'https://app.uniswap.org/#/swap?outputCurrency={addr}',
+        'bsc': 'https://pancakeswap.finance/swap?outputCurrency={addr}',
+        'arbitrum': 'https://app.uniswap.org/#/swap?outputCurrency={addr}',
+        'polygon': 'https://quickswap.exchange/#/swap?outputCurrency={addr}',
+        'zksync': 'https://syncswap.xyz/swap?outputCurrency={addr}',
+        'pulsechain': 'https://app.pulsex.com/swap?outputCurrency={addr}'
+    }
+    # Для неизвестных сетей - страница токена на DexScreener
+    _DEFAULT_TEMPLATE = 'https://dexscreener.com/{network}/{addr}'
+    
     def get_explorer_url(self) -> str:
         """Возвращает URL на блокчейн-эксплорер для просмотра токена"""
-        explorers = {
-            'solana': f'https://solscan.io/token/{self.address}',
-            'ethereum': f'https://etherscan.io/token/{self.address}',
-            'bsc': f'https://bscscan.com/token/{self.address}',
-            'arbitrum': f'https://arbiscan.io/token/{self.address}',
-            'polygon': f'https://polygonscan.com/token/{self.address}'
-        }
-        return explorers.get(self.network.lower(), f'https://dexscreener.com/{self.network}/{self.address}')
+        template = self._EXPLORER_TEMPLATES.get(self._network_lc)
+        if template is None:
+            return self._DEFAULT_TEMPLATE.format(network=self.network, addr=self.address)
+        return template.format(addr=self.address)
     
     def get_dex_url(self) -> str:
         """Возвращает URL на DEX для торговли токеном"""
-        dex_urls = {
-            'solana': f'https://jup.ag/swap/SOL-{self.address}',
-            'ethereum': f'https://app.uniswap.org/#/swap?outputCurrency={self.address}',
-            'bsc': f'https://pancakeswap.finance/swap?outputCurrency={self.address}',
-            'arbitrum': f'https://app.uniswap.org/#/swap?outputCurrency={self.address}',
-            'polygon': f'https://quickswap.exchange/#/swap?outputCurrency={self.address}',
-            'zksync': f'https://syncswap.xyz/swap?outputCurrency={self.address}',
-            'pulsechain': f'https://app.pulsex.com/swap?outputCurrency={self.address}'
-        }
-        return dex_urls.get(self.network.lower(), f'https://dexscreener.com/{self.network}/{self.address}')
+        template = self._DEX_TEMPLATES.get(self._network_lc)
+        if template is None:
+            return self._DEFAULT_TEMPLATE.format(network=self.network, addr=self.address)
+        return template.format(addr=self.address)
     
     def get_dexscreener_url(self) -> str:
         """Возвращает URL на DexScreener для анализа графика"""
-        return f'https://dexscreener.com/{self.network.lower()}/{self.address}'
+        return self._DEFAULT_TEMPLATE.format(network=self._network_lc, addr=self.address)
     
     def format_age(self) -> str:
         """Форматирует возраст токена в читаемый вид"""
-        hours = self.age_hours
-        
-        years = int(hours / (24 * 365))
-        hours = hours % (24 * 365)
-        
-        months = int(hours / (24 * 30))
-        hours = hours % (24 * 30)
-        
-        weeks = int(hours / (24 * 7))
-        hours = hours % (24 * 7)
-        
-        days = int(hours / 24)
-        hours = int(hours % 24)
-        
-        parts = []
-        if years > 0:
-            parts.append(f"{years}г")
-        if months > 0:
-            parts.append(f"{months}м")
-        if weeks > 0:
-            parts.append(f"{weeks}н")
-        if days > 0:
-            parts.append(f"{days}д")
-        if hours > 0 and len(parts) == 0:
-            parts.append(f"{hours}ч")
-            
-        return " ".join(parts)
+        if self._age_str is not None:
+            return self._age_str
+        # Разложение на годы/месяцы/недели/дни зависит только от целой части часов
+        return _fmt_age(math.floor(self.age_hours))
     
     def format_money(self, amount: float) -> str:
         """Форматирует денежные значения в читаемый вид"""
-        if amount >= 1_000_000_000:  # миллиарды
-            return f"${amount / 1_000_000_000:.2f}B"
-        elif amount >= 1_000_000:  # миллионы
-            return f"${amount / 1_000_000:.2f}M"
-        elif amount >= 1_000:  # тысячи
-            return f"${amount / 1_000:.2f}K"
-        else:
-            return f"${amount:.2f}"
+        return _fmt_money(amount)
+    
+    # Колонки CSV в порядке ключей to_dict (поля безопасности есть не у всех токенов)
+    CSV_FIELDS = ('address', 'name', 'symbol', 'network', 'pair_address', 'dex_id', 'url',
+                  'price_usd', 'price_native', 'liquidity_usd', 'volume_24h', 'volume_6h', 'volume_1h',
+                  'price_change_24h', 'price_change_6h', 'price_change_1h', 'buys_24h', 'sells_24h',
+                  'fdv', 'market_cap', 'age_hours', 'risk_score', 'risk_level', 'risk_factors', 'info')
+    CSV_SECURITY_FIELDS = ('security_score', 'security_issues', 'contract_verified',
+                           'ownership_renounced', 'liquidity_locked', 'honeypot_probability')
     
     def to_dict(self) -> Dict:
         """Преобразует токен в словарь для экспорта"""
@@ -390,7 +927,7 @@ class Token:
         }
         
         # Добавляем поля безопасности
-        if hasattr(self, 'security_score'):
+        if self.security_score is not None:
             base_dict.update({
                 'security_score': self.security_score,
                 'security_issues': self.security_issues,
@@ -401,6 +938,20 @@ class Token:
             })
         
         return base_dict
+    
+    # Геттеры строки CSV: кортеж атрибутов собирается в C, без промежуточного dict to_dict()
+    _CSV_ROW = attrgetter(*CSV_FIELDS)
+    _CSV_SECURITY_ROW = attrgetter(*CSV_SECURITY_FIELDS)
+    _CSV_NO_SECURITY = ('',) * len(CSV_SECURITY_FIELDS)
+    
+    def to_csv_row(self, with_security: bool = False) -> tuple:
+        """Строка CSV в порядке CSV_FIELDS (и CSV_SECURITY_FIELDS при with_security) для csv.writer"""
+        row = self._CSV_ROW(self)
+        if not with_security:
+            return row
+        if self.security_score is None:
+            return row + self._CSV_NO_SECURITY
+        return row + self._CSV_SECURITY_ROW(self)
 
 class TokenAnalyzer:
     """Класс для анализа списка токенов"""
@@ -411,7 +962,15 @@ class TokenAnalyzer:
         self.high_risk_tokens: List[Token] = []
         self.medium_risk_tokens: List[Token] = []
         self.low_risk_tokens: List[Token] = []
+        self.recommended_tokens: List[Token] = []  # Заполняется в export_recommended_to_json
+        # SoA-копия числовых полей токенов (колонка на поле), строки совпадают с self.tokens
+        self.metrics_df: Optional[pd.DataFrame] = None
+        # Единая таблица токенов: числовые поля + категориальные network/dex_id/risk_level и колонка token;
+        # выборки по уровню риска и фильтры - булевы маски по ней
+        self.df: Optional[pd.DataFrame] = None
         self.config = self._load_config(config_path)
+        self.thresholds = RiskThresholds.from_config(self.config)
+        self._config_version = 0
         self.logger = self._setup_logger()
         self.contract_verifier = None  # Будет инициализирован при необходимости
         
@@ -424,12 +983,60 @@ class TokenAnalyzer:
             except Exception as e:
                 self.logger.warning(f"⚠️ Не удалось инициализировать анализатор безопасности: {e}")
                 self.security_analyzer = None
+        
+        # Лимит частоты запросов анализа безопасности (0 - без ограничения): создается один раз,
+        # чтобы повторные вызовы analyze_security делили общий бюджет запросов
+        security_rate = self.config.get('security_rate_per_second', 10)
+        self._sec_limiter = AsyncLimiter(security_rate, 1.0) if security_rate else None
+        
+        # Дисковый кэш результатов блокировки ликвидности и анализа безопасности по (сеть, адрес):
+        # эти данные меняются редко, повторный запуск не ходит за ними в сеть
+        self._lookup_cache = None
+        cache_config = self.config.get('lookup_cache', {})
+        if diskcache is not None and cache_config.get('enabled', True):
+            try:
+                self._lookup_cache = diskcache.Cache(cache_config.get('path', os.path.join('.cache', 'lookups')),
+                                                     size_limit=200_000_000)
+            except Exception as e:
+                self.logger.debug(f"Дисковый кэш проверок недоступен: {e}")
+    
+    def _lookup_cache_get(self, key: str):
+        """Читает результат проверки из дискового кэша (None при промахе или отключенном кэше)"""
+        if self._lookup_cache is None:
+            return None
+        try:
+            return self._lookup_cache.get(key)
+        except Exception:
+            return None
+    
+    def _lookup_cache_set(self, key: str, value, ttl: float) -> None:
+        """Сохраняет результат проверки в дисковый кэш на ttl секунд"""
+        if self._lookup_cache is None or ttl <= 0:
+            return
+        try:
+            self._lookup_cache.set(key, value, expire=ttl)
+        except Exception as e:
+            self.logger.debug(f"Не удалось записать кэш {key}: {e}")
+    
+    def update_config(self, updates: Dict) -> None:
+        """Обновляет конфигурацию анализатора; ранее посчитанные риск-скоры становятся неактуальными"""
+        self.config.update(updates)
+        self._bump_config_version()
+    
+    def _bump_config_version(self) -> None:
+        """Пересобирает пороги после изменения self.config и сбрасывает метки риск-скора токенов"""
+        self.thresholds = RiskThresholds.from_config(self.config)
+        self._config_version += 1
+    
+    def _risk_config_stamp(self) -> tuple:
+        """Метка конфигурации, с которой считается риск-скор (сохраняется в токене после расчета)"""
+        return (self._config_version, self.thresholds)
     
     def _load_config(self, config_path: str) -> Dict:
         """Загружает конфигурацию из файла"""
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(config_path, 'rb') as f:
+                return _json_loads(f.read())
         except Exception as e:
             print(f"{Fore.RED}Ошибка при загрузке конфигурации: {str(e)}{Style.RESET_ALL}")
             return {}
@@ -464,16 +1071,28 @@ class TokenAnalyzer:
     def load_from_json(self, file_path: str) -> int:
         """Загружает токены из JSON-файла"""
         self.logger.info(f"Загрузка токенов из файла: {file_path}")
+        # Читаем файл целиком и разбираем из памяти: быстрее, чем json.load по частям
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+        except Exception as e:
+            error_msg = f"Ошибка при загрузке файла: {str(e)}"
+            self.logger.error(error_msg)
+            raise Exception(error_msg)
+        return self.load_from_bytes(raw)
+    
+    def load_from_bytes(self, raw: Union[bytes, memoryview]) -> int:
+        """Загружает токены из JSON, уже прочитанного в память (bytes или memoryview над mmap)"""
+        try:
+            data = _json_loads(raw)
                 
             if 'rockets' in data:
                 tokens_data = data['rockets']
-                self.tokens = []
-                for token_data in tqdm(tokens_data, desc="Загрузка токенов"):
-                    token = Token(token_data)
-                    self.tokens.append(token)
+                # Числа приводятся одним векторным проходом, Token лишь получает готовые значения
+                metrics = _batch_metrics(tokens_data, time.time() * 1000)
+                self.tokens = [Token(token_data, token_metrics) for token_data, token_metrics
+                               in zip(tokens_data, metrics.itertuples(index=False, name=None))]
+                self.metrics_df = metrics
                 
                 self.logger.info(f"Загружено {len(self.tokens)} токенов")
                 return len(self.tokens)
@@ -486,6 +1105,58 @@ class TokenAnalyzer:
             self.logger.error(error_msg)
             raise Exception(error_msg)
     
+    def add_token(self, token_data: Dict, now_ms: Optional[float] = None) -> Token:
+        """Добавляет один токен из сырых данных (для потоковой загрузки больших файлов).
+        now_ms - общий момент расчета возраста для всей загрузки (по умолчанию текущее время)"""
+        token = Token(token_data, now_ms=now_ms)
+        self.tokens.append(token)
+        self.metrics_df = None  # SoA-копия пересоберется по запросу
+        self.df = None
+        return token
+    
+    def get_metrics_df(self) -> pd.DataFrame:
+        """SoA-представление числовых полей токенов для пакетных расчетов"""
+        if self.metrics_df is None or len(self.metrics_df) != len(self.tokens):
+            tokens = self.tokens
+            self.metrics_df = pd.DataFrame({attr: [getattr(t, attr) for t in tokens] for attr in _METRIC_ATTRS})
+        return self.metrics_df
+    
+    def get_token_df(self) -> pd.DataFrame:
+        """Единая таблица токенов (строки совпадают с self.tokens). Строковые колонки с малым числом
+        значений хранятся как pd.Categorical: сравнения идут по целочисленным кодам"""
+        if self.df is None or len(self.df) != len(self.tokens):
+            tokens = self.tokens
+            self.df = self.get_metrics_df().assign(
+                token=pd.Series(tokens, dtype=object),
+                network=pd.Categorical([t.network for t in tokens]),
+                dex_id=pd.Categorical([t.dex_id for t in tokens]),
+                has_website=np.fromiter((t.has_website for t in tokens), dtype=bool, count=len(tokens)),
+                has_socials=np.fromiter((t.has_socials for t in tokens), dtype=bool, count=len(tokens)),
+                risk_level=pd.Categorical([t.risk_level for t in tokens], categories=_RISK_LEVEL_NAMES),
+            )
+            # Строки возраста для отчетов форматируются одним проходом по колонке
+            age_str = _fmt_age_column(self.df['age_hours'].to_numpy()).tolist()
+            self.df['age_str'] = age_str
+            for token, age in zip(tokens, age_str):
+                token._age_str = age
+        return self.df
+    
+    def _classify_tokens(self, scores: np.ndarray) -> None:
+        """Обновляет таблицу токенов после риск-скора и раскладывает токены по уровням риска масками"""
+        self.get_metrics_df()['risk_score'] = scores
+        self.df = None
+        df = self.get_token_df()
+        # Коды категорий - индексы в _RISK_LEVEL_NAMES; "Низкий" и "Умеренный" попадают в одну корзину.
+        # Один устойчивый argsort по номеру корзины раскладывает все токены за проход, сохраняя их порядок
+        buckets = _RISK_BUCKET_OF_LEVEL[df['risk_level'].cat.codes.to_numpy()]
+        order = np.argsort(buckets, kind='stable')
+        bounds = np.cumsum(np.bincount(buckets, minlength=4))[:-1]
+        low, medium, high, scam = np.split(df['token'].to_numpy()[order], bounds)
+        self.low_risk_tokens = low.tolist()
+        self.medium_risk_tokens = medium.tolist()
+        self.high_risk_tokens = high.tolist()
+        self.scam_tokens = scam.tolist()
+    
     async def verify_contracts(self, tokens: List[Token]) -> None:
         """Верификация контрактов через API с batch-оптимизацией"""
         if not tokens:
@@ -495,15 +1166,10 @@ class TokenAnalyzer:
         
         # Инициализируем верификатор если нужно
         if self.contract_verifier is None:
-            try:
-                import sys
-                import os
-                sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'raket-2'))
-                from src.analysis.contract_verifier import ContractVerifier
-                self.contract_verifier = ContractVerifier()
-            except ImportError:
+            if _ContractVerifier is None:
                 self.logger.warning("[VERIFICATION] Модуль верификации недоступен, пропускаем верификацию")
                 return
+            self.contract_verifier = _ContractVerifier()
         
         async with self.contract_verifier as verifier:
             # Подготавливаем данные для batch-запросов
@@ -512,88 +1178,77 @@ class TokenAnalyzer:
             # Выполняем batch верификацию с прогресс-баром
             verification_results = await verifier.verify_contracts_batch(contracts_data, show_progress=True)
             
-            # Применяем результаты к токенам
-            honeypot_count = 0
-            verified_count = 0
+            # Применяем результаты к токенам: один проход по результатам через индекс адрес -> токены
+            tokens_by_addr: Dict[str, List[Token]] = {}
+            for token in tokens:
+                tokens_by_addr.setdefault(token.address, []).append(token)
+            
+            matched = [(token, verification_result)
+                       for addr, verification_result in verification_results.items()
+                       for token in tokens_by_addr.get(addr, ())]
+            
+            # Счетчики для статистики
+            verified_count = sum(1 for _, vr in matched if vr.is_verified)
+            honeypot_count = sum(1 for _, vr in matched if vr.is_honeypot)
             suspicious_count = 0
             
-            for token in tokens:
-                if token.address in verification_results:
-                    verification_result = verification_results[token.address]
-                    token.verification_result = verification_result
-                    
-                    # Счетчики для статистики
-                    if verification_result.is_verified:
-                        verified_count += 1
-                    if verification_result.is_honeypot:
-                        honeypot_count += 1
-                    
-                    # Добавляем факторы риска на основе верификации
-                    if verification_result.is_honeypot:
-                        token.risk_factors.append("Honeypot токен")
-                        token.risk_score += 50
-                        self.logger.warning(f"🚨 HONEYPOT обнаружен: {token.symbol} ({token.address[:20]}...)")
-                    
-                    if not verification_result.is_verified:
-                        # СМЯГЧЕНО: Проверяем исключения для крупных/зрелых токенов
-                        has_high_liquidity = token.liquidity_usd >= 100000  # $100K+
-                        has_mature_age = token.age_hours >= 720  # 30+ дней
-                        has_social_presence = bool(token.info.get("websites", [])) or bool(token.info.get("socials", []))
-                        
-                        # Если токен соответствует критериям исключения - меньший штраф
-                        if has_high_liquidity and (has_mature_age or has_social_presence):
-                            token.risk_factors.append("Неверифицированный контракт (но крупный/зрелый)")
-                            token.risk_score += 5  # Минимальный штраф
-                        else:
-                            token.risk_factors.append("Неверифицированный контракт")
-                            token.risk_score += 15  # Обычный штраф
-                    
-                    if verification_result.can_take_back_ownership:
-                        token.risk_factors.append("Владелец может вернуть права")
-                        token.risk_score += 20
-                        suspicious_count += 1
-                    
-                    if verification_result.has_mint_function:
-                        token.risk_factors.append("Есть функция mint")
-                        token.risk_score += 10
-                        suspicious_count += 1
-                    
-                    if verification_result.has_blacklist:
-                        token.risk_factors.append("Есть функция blacklist")
-                        token.risk_score += 15
-                        suspicious_count += 1
-                    
-                    if verification_result.is_proxy:
-                        token.risk_factors.append("Proxy контракт")
-                        token.risk_score += 10
-                        suspicious_count += 1
+            for token, verification_result in matched:
+                token.verification_result = verification_result
+                
+                # Добавляем факторы риска на основе верификации
+                if verification_result.is_honeypot:
+                    token._risk_factors.append("Honeypot токен")
+                    token.risk_score += 50
+                    self.logger.warning(f"🚨 HONEYPOT обнаружен: {token.symbol} ({token.address[:20]}...)")
+                
+                if not verification_result.is_verified:
+                    # СМЯГЧЕНО: Проверяем исключения для крупных/зрелых токенов
+                    has_high_liquidity = token.liquidity_usd >= 100000  # $100K+
+                    has_mature_age = token.age_hours >= 720  # 30+ дней
+                    has_social_presence = token.has_website or token.has_socials
                     
-                    # Обновляем уровень риска
-                    if token.risk_score >= 80:
-                        token.risk_level = "Скам"
-                    elif token.risk_score >= 60:
-                        token.risk_level = "Высокий"
-                    elif token.risk_score >= 40:
-                        token.risk_level = "Средний"
+                    # Если токен соответствует критериям исключения - меньший штраф
+                    if has_high_liquidity and (has_mature_age or has_social_presence):
+                        token._risk_factors.append("Неверифицированный контракт (но крупный/зрелый)")
+                        token.risk_score += 5  # Минимальный штраф
                     else:
-                        token.risk_level = "Низкий"
-                else:
-                    # Создаем пустой результат для токенов без верификации
-                    try:
-                        import sys
-                        import os
-                        sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'raket-2'))
-                        from src.analysis.contract_verifier import ContractVerificationResult
-                        token.verification_result = ContractVerificationResult()
-                        token.verification_result.error_message = "Не удалось верифицировать"
-                    except ImportError:
-                        # Создаем простой объект если импорт не удался
-                        class SimpleVerificationResult:
-                            def __init__(self):
-                                self.is_verified = False
-                                self.is_honeypot = False
-                                self.error_message = "Не удалось верифицировать"
-                        token.verification_result = SimpleVerificationResult()
+                        token._risk_factors.append("Неверифицированный контракт")
+                        token.risk_score += 15  # Обычный штраф
+                
+                if verification_result.can_take_back_ownership:
+                    token._risk_factors.append("Владелец может вернуть права")
+                    token.risk_score += 20
+                    suspicious_count += 1
+                
+                if verification_result.has_mint_function:
+                    token._risk_factors.append("Есть функция mint")
+                    token.risk_score += 10
+                    suspicious_count += 1
+                
+                if verification_result.has_blacklist:
+                    token._risk_factors.append("Есть функция blacklist")
+                    token.risk_score += 15
+                    suspicious_count += 1
+                
+                if verification_result.is_proxy:
+                    token._risk_factors.append("Proxy контракт")
+                    token.risk_score += 10
+                    suspicious_count += 1
+            
+            # Обновляем уровень риска проверенных токенов одним векторным проходом
+            if matched:
+                scores = np.fromiter((token.risk_score for token, _ in matched), dtype=np.int64, count=len(matched))
+                levels = np.select([scores >= 80, scores >= 60, scores >= 40], ["Скам", "Высокий", "Средний"], default="Низкий")
+                for (token, _), level in zip(matched, levels.tolist()):
+                    token.risk_level = level
+            
+            # Пустой результат для токенов без верификации
+            unverified = [token for addr, group in tokens_by_addr.items() if addr not in verification_results for token in group]
+            if unverified:
+                make_result = _ContractVerificationResult or _SimpleVerificationResult
+                for token in unverified:
+                    token.verification_result = make_result()
+                    token.verification_result.error_message = "Не удалось верифицировать"
             
             # Выводим детальную статистику верификации
             self.logger.info(f"[VERIFICATION] Batch верификация завершена.")
@@ -619,46 +1274,71 @@ class TokenAnalyzer:
             
         self.logger.info(f"[LIQUIDITY_LOCK] Начало проверки блокировки ликвидности для {len(tokens)} токенов")
         
+        # Токены с одной и той же парой проверяются один раз, результат раздается всей группе
+        groups = defaultdict(list)
+        for token in tokens:
+            if token.pair_address and token.address and token.network:
+                groups[(token._network_lc, token.pair_address.lower())].append(token)
+            else:
+                # Если нет необходимых данных
+                token.liquidity_lock_info = None
+                token.liquidity_lock_score = 0
+                token.liquidity_locked = False
+                token.liquidity_lock_period = None
+                self.logger.debug(f"[LIQUIDITY_LOCK] {token.symbol}: пропущен (нет pair_address или address)")
+        grouped_count = sum(len(group) for group in groups.values())
+        self.logger.info(f"[LIQUIDITY_LOCK] Уникальных пар: {len(groups)} из {grouped_count} токенов")
+        
+        # Проверки идут параллельно, но не больше liquidity_lock_concurrency одновременных запросов
+        semaphore = asyncio.Semaphore(self.config.get('liquidity_lock_concurrency', 20))
+        # Найденная блокировка кэшируется дольше, чем ее отсутствие (блокировку могут добавить)
+        cache_config = self.config.get('lookup_cache', {})
+        locked_ttl = cache_config.get('locked_ttl', 6 * 3600)
+        unlocked_ttl = cache_config.get('unlocked_ttl', 30 * 60)
+        
         async with LiquidityLockChecker() as lock_checker:
-            checked_count = 0
-            locked_count = 0
-            
-            for token in tqdm(tokens, desc="🔒 Проверка блокировки ликвидности"):
+            async def check_group(key: tuple, group: List[Token]) -> Optional[bool]:
+                """Проверяет одну пару для всех ее токенов; None - ошибка, иначе признак блокировки"""
+                first = group[0]
                 try:
-                    if token.pair_address and token.address and token.network:
-                        # Проверяем блокировку ликвидности
-                        lock_info = await lock_checker.check_liquidity_lock(
-                            token.address, 
-                            token.pair_address, 
-                            token.network
-                        )
-                        
-                        # Сохраняем информацию о блокировке
-                        token.liquidity_lock_info = lock_info
-                        token.liquidity_lock_score = lock_checker.get_lock_score(lock_info)
-                        # ВАЖНО: Проставляем агрегированные поля, используемые далее в SecurityAnalyzer
-                        token.liquidity_locked = bool(lock_info.is_locked)
-                        token.liquidity_lock_period = lock_info.lock_duration_days if lock_info.lock_duration_days else None
-                        
-                        checked_count += 1
-                        if lock_info.is_locked:
-                            locked_count += 1
-                            
-                        self.logger.debug(f"[LIQUIDITY_LOCK] {token.symbol}: блокировка={lock_info.is_locked}, оценка={token.liquidity_lock_score}/100")
-                    else:
-                        # Если нет необходимых данных
+                    # Проверяем блокировку ликвидности (сначала в дисковом кэше)
+                    cache_key = f"lock:{key[0]}:{key[1]}"
+                    lock_info = self._lookup_cache_get(cache_key)
+                    if lock_info is None:
+                        async with semaphore:
+                            lock_info = await lock_checker.check_liquidity_lock(
+                                first.address, 
+                                first.pair_address, 
+                                first.network
+                            )
+                        self._lookup_cache_set(cache_key, lock_info,
+                                               locked_ttl if lock_info.is_locked else unlocked_ttl)
+                    lock_score = lock_checker.get_lock_score(lock_info)
+                except Exception as e:
+                    self.logger.error(f"[LIQUIDITY_LOCK] Ошибка при проверке {first.symbol}: {str(e)}")
+                    for token in group:
                         token.liquidity_lock_info = None
                         token.liquidity_lock_score = 0
                         token.liquidity_locked = False
                         token.liquidity_lock_period = None
-                        self.logger.debug(f"[LIQUIDITY_LOCK] {token.symbol}: пропущен (нет pair_address или address)")
-                        
-                except Exception as e:
-                    self.logger.error(f"[LIQUIDITY_LOCK] Ошибка при проверке {token.symbol}: {str(e)}")
-                    token.liquidity_lock_info = None
-                    token.liquidity_lock_score = 0
-                    token.liquidity_locked = False
-                    token.liquidity_lock_period = None
+                    return None
+                
+                for token in group:
+                    # Сохраняем информацию о блокировке
+                    token.liquidity_lock_info = lock_info
+                    token.liquidity_lock_score = lock_score
+                    # ВАЖНО: Проставляем агрегированные поля, используемые далее в SecurityAnalyzer
+                    token.liquidity_locked = bool(lock_info.is_locked)
+                    token.liquidity_lock_period = lock_info.lock_duration_days if lock_info.lock_duration_days else None
+                
+                self.logger.debug(f"[LIQUIDITY_LOCK] {first.symbol}: блокировка={lock_info.is_locked}, оценка={lock_score}/100")
+                return bool(lock_info.is_locked)
+            
+            results = await atqdm.gather(*(check_group(key, group) for key, group in groups.items()),
+                                         desc="🔒 Проверка блокировки ликвидности")
+        
+        checked_count = sum(len(group) for group, r in zip(groups.values(), results) if r is not None)
+        locked_count = sum(len(group) for group, r in zip(groups.values(), results) if r)
                     
         self.logger.info(f"[LIQUIDITY_LOCK] 📊 Статистика:")
         self.logger.info(f"[LIQUIDITY_LOCK]   🔍 Проверено токенов: {checked_count}")
@@ -675,38 +1355,44 @@ class TokenAnalyzer:
         
         self.logger.info(f"[SECURITY] Начало анализа безопасности {len(tokens_to_analyze)} токенов (исключая {len(tokens) - len(tokens_to_analyze)} скам-токенов)")
         
-        analyzed_count = 0
-        security_issues_count = 0
-        
-        for token in tqdm(tokens_to_analyze, desc="Анализ безопасности"):
+        # Токены одной и той же пары анализируются один раз, отчет раздается всей группе. Ключ включает
+        # пару: входы отчета (объем, транзакции, блокировка ликвидности) у каждой пары свои
+        groups = defaultdict(list)
+        for token in tokens_to_analyze:
+            groups[(token._network_lc, token.address.lower(), (token.pair_address or '').lower())].append(token)
+        self.logger.info(f"[SECURITY] Уникальных пар: {len(groups)} из {len(tokens_to_analyze)} токенов")
+        
+        # Запросы идут параллельно: не больше security_concurrency одновременно и не чаще
+        # security_rate_per_second в секунду (общий лимитер анализатора, см. __init__)
+        semaphore = asyncio.Semaphore(self.config.get('security_concurrency', 16))
+        limiter = self._sec_limiter
+        # Отчет зависит и от изменчивых полей (холдеры, распределение), поэтому TTL короче, чем у блокировок
+        security_ttl = self.config.get('lookup_cache', {}).get('security_ttl', 30 * 60)
+        
+        async def analyze_group(key: tuple, group: List[Token]) -> Optional[bool]:
+            """Анализирует одну пару для всех ее токенов; None - ошибка, иначе признак проблем безопасности"""
+            token = group[0]
             try:
-                # Подготовка данных для анализа
-                token_data = {
-                    'address': token.address,
-                    'name': token.name,
-                    'symbol': token.symbol,
-                    'chainId': token.network,
-                    'volume_24h': token.volume_24h,
-                    'price_change_24h': token.price_change_24h,
-                    'buys_24h': token.buys_24h,
-                    'sells_24h': token.sells_24h,
-                    'market_cap': token.market_cap,
-                    'liquidity_locked': getattr(token, 'liquidity_locked', False),
-                    'liquidity_lock_period': getattr(token, 'liquidity_lock_period', None),
-                    'total_holders': getattr(token, 'total_holders', 0),
-                    'top_10_percent': getattr(token, 'top_10_percent', 0.0)
-                }
-                
-                # Анализ безопасности
-                security_report = await self.security_analyzer.analyze_token_security(token_data)
+                # Подготовка данных для анализа (холдеры в Token не хранятся - значения по умолчанию)
+                token_data = SecurityInput(
+                    token.address, token.name, token.symbol, token.network,
+                    token.volume_24h, token.price_change_24h, token.buys_24h, token.sells_24h,
+                    token.market_cap, token.liquidity_locked, token.liquidity_lock_period,
+                )
                 
-                # Обновление полей токена
-                token.security_report = security_report
-                token.security_score = security_report.risk_assessment.overall_score
-                token.contract_verified = security_report.contract_analysis.verified
-                token.ownership_renounced = security_report.ownership.renounced
-                token.liquidity_locked = security_report.distribution.liquidity_locked
-                token.honeypot_probability = security_report.contract_analysis.honeypot_probability
+                # Анализ безопасности (сначала в дисковом кэше). Отчет считается и по результату проверки
+                # блокировки, поэтому он входит в ключ: найденная блокировка не ждет истечения TTL
+                cache_key = (f"security:{key[0]}:{key[1]}:{key[2]}:"
+                             f"{int(bool(token.liquidity_locked))}:{token.liquidity_lock_period}")
+                security_report = self._lookup_cache_get(cache_key)
+                if security_report is None:
+                    async with semaphore:
+                        if limiter is not None:
+                            async with limiter:
+                                security_report = await self.security_analyzer.analyze_token_security(token_data)
+                        else:
+                            security_report = await self.security_analyzer.analyze_token_security(token_data)
+                    self._lookup_cache_set(cache_key, security_report, security_ttl)
                 
                 # Сбор проблем безопасности
                 security_issues = []
@@ -719,37 +1405,105 @@ class TokenAnalyzer:
                 if security_report.trading.security_issues:
                     security_issues.extend(security_report.trading.security_issues)
                 
-                token.security_issues = security_issues
-                
-                if security_issues:
-                    security_issues_count += 1
-                
-                analyzed_count += 1
-                
-                # Небольшая задержка для избежания rate limiting
-                await asyncio.sleep(0.1)
+                # Обновление полей токенов группы
+                for token in group:
+                    token.security_report = security_report
+                    token.security_score = security_report.risk_assessment.overall_score
+                    token.contract_verified = security_report.contract_analysis.verified
+                    token.ownership_renounced = security_report.ownership.renounced
+                    token.liquidity_locked = security_report.distribution.liquidity_locked
+                    token.honeypot_probability = security_report.contract_analysis.honeypot_probability
+                    token.security_issues = list(security_issues)
+                return bool(security_issues)
                 
             except Exception as e:
                 self.logger.error(f"[SECURITY] Ошибка при анализе безопасности {token.symbol}: {str(e)}")
-                token.security_score = 1.0  # Максимальный риск при ошибке
-                token.security_issues = [f"Ошибка анализа: {str(e)}"]
+                for token in group:
+                    token.security_score = 1.0  # Максимальный риск при ошибке
+                    token.security_issues = [f"Ошибка анализа: {str(e)}"]
+                return None
+        
+        try:
+            results = await atqdm.gather(*(analyze_group(key, group) for key, group in groups.items()),
+                                         desc="Анализ безопасности")
+        finally:
+            # Общая сессия внешних проверок живет на время одного прохода (и одного event loop)
+            await self.security_analyzer.close()
+        
+        analyzed_count = sum(len(group) for group, r in zip(groups.values(), results) if r is not None)
+        security_issues_count = sum(len(group) for group, r in zip(groups.values(), results) if r)
         
         self.logger.info(f"[SECURITY] 📊 Статистика безопасности:")
         self.logger.info(f"[SECURITY]   🔍 Проанализировано токенов: {analyzed_count}")
         self.logger.info(f"[SECURITY]   ⚠️ С проблемами безопасности: {security_issues_count}")
         self.logger.info(f"[SECURITY]   ⚠️ Пропущено (ошибки): {len(tokens) - analyzed_count}")
     
+    def calculate_risk_scores_batch(self, tokens: List[Token]) -> np.ndarray:
+        """Векторный расчет риск-скора для списка токенов (та же логика, что Token.calculate_risk_score)"""
+        n = len(tokens)
+        if n == 0:
+            return np.zeros(0, dtype=np.int32)
+        
+        thresholds = self.thresholds
+        stamp = self._risk_config_stamp()
+        
+        # Числовые колонки берем из SoA-представления, если считаем все токены анализатора
+        if tokens is self.tokens:
+            metrics = self.get_metrics_df()
+            column = lambda attr: metrics[attr].to_numpy(dtype=np.float64)
+        else:
+            column = lambda attr: np.fromiter((getattr(t, attr) for t in tokens), dtype=np.float64, count=n)
+        
+        # Поля этапов анализа равны None, если этап не выполнялся
+        has_info = np.fromiter((t.has_website or t.has_socials for t in tokens),
+                               dtype=bool, count=n)
+        lock_scores = [t.liquidity_lock_score for t in tokens]
+        has_lock_score = np.fromiter((lock is not None for lock in lock_scores), dtype=bool, count=n)
+        lock_score = np.fromiter((lock if lock is not None else 0 for lock in lock_scores), dtype=np.float64, count=n)
+        lock_pct = np.fromiter((li.locked_percentage if (li := t.liquidity_lock_info) and li.is_locked else 0
+                                for t in tokens), dtype=np.float64, count=n)
+        verified = np.fromiter((bool((vr := t.verification_result) and vr.is_verified) for t in tokens),
+                               dtype=bool, count=n)
+        
+        arrays = (column('price_change_24h'), column('age_hours'), column('liquidity_usd'), column('volume_24h'),
+                  column('buys_24h'), column('sells_24h'), has_info, has_lock_score, lock_score, lock_pct, verified)
+        limits = (thresholds.suspicious_price_change, thresholds.low_liquidity, thresholds.suspicious_vol_liq)
+        workers = self.config.get('scoring_workers', min(4, os.cpu_count() or 1))
+        if _risk_score_kernel is _risk_score_numpy and n > _SCORE_CHUNK and workers > 1:
+            scores, levels, flags = _risk_score_chunked(arrays, limits, workers)
+        else:
+            scores, levels, flags = _risk_score_kernel(*arrays, *limits)
+        
+        # Разбивка - только для сработавших правил; тексты факторов риска строятся лениво по флагам
+        breakdowns = [[] for _ in range(n)]
+        for factor, breakdown in _FACTOR_BREAKDOWN.items():
+            for i in np.flatnonzero(flags & factor).tolist():
+                breakdowns[i].append(breakdown)
+        
+        log_breakdown = _RISK_LOGGER.isEnabledFor(logging.DEBUG)
+        for token, token_score, level, token_flags, breakdown in zip(tokens, scores.tolist(), levels.tolist(),
+                                                                      flags.tolist(), breakdowns):
+            token.risk_score = token_score
+            token.risk_flags = token_flags
+            token._risk_config_stamp = stamp
+            token.risk_level = _RISK_LEVEL_NAMES[level]
+            token.score_breakdown = breakdown
+            if breakdown and log_breakdown:
+                _RISK_LOGGER.debug("[RISK_SCORE] %s: Итого %d баллов. Разбивка: %s",
+                                   token.symbol, token_score, ', '.join(breakdown))
+        
+        return scores
+    
     async def analyze_all_tokens(self):
         """Анализирует все токены и распределяет их по категориям риска"""
         self.logger.info("Начало анализа всех токенов")
         
-        # Сначала верифицируем контракты
-        self.logger.info("[ANALYSIS] Этап 1: Верификация контрактов")
-        await self.verify_contracts(self.tokens)
-        
-        # Проверяем блокировку ликвидности
-        self.logger.info("[ANALYSIS] Этап 2: Проверка блокировки ликвидности")
-        await self.check_liquidity_locks(self.tokens)
+        # Верификация контрактов и проверка блокировки ликвидности не зависят друг от друга
+        # (пишут разные поля токена), поэтому идут одновременно: время этапа - максимум из двух.
+        # Анализу безопасности нужны оба результата (уровень риска после верификации и
+        # liquidity_locked), а верификация - один batch-запрос, поэтому он начинается после них
+        self.logger.info("[ANALYSIS] Этапы 1-2: Верификация контрактов и проверка блокировки ликвидности")
+        await asyncio.gather(self.verify_contracts(self.tokens), self.check_liquidity_locks(self.tokens))
         
         # Анализ безопасности
         if self.security_analyzer:
@@ -758,22 +1512,8 @@ class TokenAnalyzer:
         
         # Затем анализируем риски
         self.logger.info("[ANALYSIS] Этап 4: Анализ рисков")
-        self.scam_tokens = []
-        self.high_risk_tokens = []
-        self.medium_risk_tokens = []
-        self.low_risk_tokens = []
-        
-        for token in tqdm(self.tokens, desc="Анализ токенов"):
-            risk_score = token.calculate_risk_score(self.config)
-            
-            if token.risk_level == "Скам":
-                self.scam_tokens.append(token)
-            elif token.risk_level == "Высокий":
-                self.high_risk_tokens.append(token)
-            elif token.risk_level == "Средний":
-                self.medium_risk_tokens.append(token)
-            else:
-                self.low_risk_tokens.append(token)
+        scores = self.calculate_risk_scores_batch(self.tokens)
+        self._classify_tokens(scores)
         
         self.logger.info(f"[ANALYSIS] Анализ завершен. Скам: {len(self.scam_tokens)}, Высокий риск: {len(self.high_risk_tokens)}, Средний риск: {len(self.medium_risk_tokens)}, Низкий риск: {len(self.low_risk_tokens)}")
     
@@ -781,22 +1521,16 @@ class TokenAnalyzer:
         """Синхронная версия анализа (без верификации)"""
         self.logger.info("Начало анализа всех токенов (без верификации)")
         
-        self.scam_tokens = []
-        self.high_risk_tokens = []
-        self.medium_risk_tokens = []
-        self.low_risk_tokens = []
-        
-        for token in tqdm(self.tokens, desc="Анализ токенов"):
-            risk_score = token.calculate_risk_score(self.config)
-            
-            if token.risk_level == "Скам":
-                self.scam_tokens.append(token)
-            elif token.risk_level == "Высокий":
-                self.high_risk_tokens.append(token)
-            elif token.risk_level == "Средний":
-                self.medium_risk_tokens.append(token)
-            else:
-                self.low_risk_tokens.append(token)
+        # Без этапов анализа входы риск-скора не меняются: токены, уже оцененные
+        # при текущей конфигурации, не пересчитываются
+        stamp = self._risk_config_stamp()
+        pending = [token for token in self.tokens if token._risk_config_stamp != stamp]
+        if len(pending) == len(self.tokens):
+            scores = self.calculate_risk_scores_batch(self.tokens)
+        else:
+            self.calculate_risk_scores_batch(pending)
+            scores = np.fromiter((token.risk_score for token in self.tokens), dtype=np.int32, count=len(self.tokens))
+        self._classify_tokens(scores)
         
         self.logger.info(f"Анализ завершен. Скам: {len(self.scam_tokens)}, Высокий риск: {len(self.high_risk_tokens)}, Средний риск: {len(self.medium_risk_tokens)}, Низкий риск: {len(self.low_risk_tokens)}")
     
@@ -807,42 +1541,48 @@ class TokenAnalyzer:
         
         self.logger.info("Применение фильтров к списку токенов")
         
-        self.filtered_tokens = []
-        filter_criteria = []
+        df = self.get_token_df()
+        mask = np.ones(len(df), dtype=bool)
         
-        for token in tqdm(self.tokens, desc="Фильтрация токенов"):
-            # Пропускаем скам-токены, если указано
-            if filters.get('exclude_scam', self.config.get('exclude_scam', True)) and token.risk_level == "Скам":
-                continue
-            
-            # Проверка по возрасту
-            if filters.get('min_age') is not None and token.age_hours < filters['min_age']:
-                continue
-            if filters.get('max_age') is not None and token.age_hours > filters['max_age']:
-                continue
-            
-            # Проверка по изменению цены
-            if filters.get('min_price_change') is not None and token.price_change_24h < filters['min_price_change']:
-                continue
-            if filters.get('max_price_change') is not None and token.price_change_24h > filters['max_price_change']:
-                continue
-            
-            # Проверка по ликвидности
-            if filters.get('min_liquidity') is not None and token.liquidity_usd < filters['min_liquidity']:
-                continue
-            if filters.get('max_liquidity') is not None and token.liquidity_usd > filters['max_liquidity']:
-                continue
-            
-            # Проверка по сети
-            if filters.get('networks') is not None and token.network.lower() not in [net.lower() for net in filters['networks']]:
-                continue
-            
-            # Если прошли все фильтры, добавляем токен
-            self.filtered_tokens.append(token)
+        # Пропускаем скам-токены, если указано
+        if filters.get('exclude_scam', self.config.get('exclude_scam', True)):
+            mask &= (df['risk_level'] != "Скам").to_numpy()
+        
+        # Диапазоны по возрасту, изменению цены и ликвидности (NaN, как и раньше, не отсекается)
+        for column, min_key, max_key in (('age_hours', 'min_age', 'max_age'),
+                                         ('price_change_24h', 'min_price_change', 'max_price_change'),
+                                         ('liquidity_usd', 'min_liquidity', 'max_liquidity')):
+            values = df[column].to_numpy()
+            if filters.get(min_key) is not None:
+                mask &= ~(values < filters[min_key])
+            if filters.get(max_key) is not None:
+                mask &= ~(values > filters[max_key])
+        
+        # Проверка по сети: нижний регистр считается один раз на категорию, строки сравниваются по кодам
+        if filters.get('networks') is not None:
+            allowed = frozenset(net.lower() for net in filters['networks'])
+            network = df['network'].cat
+            allowed_codes = [code for code, c in enumerate(network.categories) if str(c).lower() in allowed]
+            mask &= np.isin(network.codes.to_numpy(), allowed_codes)
+        
+        self.filtered_tokens = df.loc[mask, 'token'].tolist()
         
         self.logger.info(f"После фильтрации осталось {len(self.filtered_tokens)} токенов")
         return self.filtered_tokens
     
+    @staticmethod
+    def _csv_with_security(tokens_list: List[Token]) -> bool:
+        """Поля безопасности попадают в CSV, только если они есть хоть у одного токена"""
+        return any(t.security_score is not None for t in tokens_list)
+    
+    @staticmethod
+    def _csv_fieldnames(with_security: bool) -> List[str]:
+        """Колонки CSV в порядке Token.to_csv_row"""
+        fieldnames = list(Token.CSV_FIELDS)
+        if with_security:
+            fieldnames += Token.CSV_SECURITY_FIELDS
+        return fieldnames
+    
     def export_to_csv(self, file_path: str, tokens_list: Optional[List[Token]] = None) -> bool:
         """Экспортирует список токенов в CSV-файл"""
         if tokens_list is None:
@@ -850,8 +1590,12 @@ class TokenAnalyzer:
         
         self.logger.info(f"Экспорт {len(tokens_list)} токенов в CSV: {file_path}")
         try:
-            df = pd.DataFrame([token.to_dict() for token in tokens_list])
-            df.to_csv(file_path, index=False, encoding='utf-8')
+            # Строки пишутся потоком кортежами атрибутов, без промежуточного DataFrame и to_dict()
+            with_security = self._csv_with_security(tokens_list)
+            with open(file_path, 'w', encoding='utf-8', newline='', buffering=1 << 20) as f:
+                writer = csv.writer(f)
+                writer.writerow(self._csv_fieldnames(with_security))
+                writer.writerows(token.to_csv_row(with_security) for token in tokens_list)
             self.logger.info(f"Экспорт в CSV успешно завершен")
             return True
         except Exception as e:
@@ -859,6 +1603,223 @@ class TokenAnalyzer:
             self.logger.error(error_msg)
             raise Exception(error_msg)
     
+    def export_parquet(self, file_path: str, compression: str = 'zstd') -> bool:
+        """Экспортирует таблицу токенов в Parquet напрямую из колонок self.df, без to_dict() на токен"""
+        if pa is None:
+            raise Exception("Для экспорта в Parquet требуется пакет pyarrow")
+        
+        df = self.get_token_df()
+        self.logger.info(f"Экспорт {len(df)} токенов в Parquet: {file_path}")
+        try:
+            tokens = self.tokens
+            columns = df.drop(columns='token').assign(
+                address=[t.address for t in tokens],
+                symbol=[t.symbol for t in tokens],
+                name=[t.name for t in tokens],
+                pair_address=[t.pair_address for t in tokens],
+                risk_score=[t.risk_score for t in tokens],  # есть и у токенов, восстановленных из кэша
+            )
+            table = pa.Table.from_pandas(columns, preserve_index=False)
+            pq.write_table(table, file_path, compression=compression)
+            self.logger.info(f"Экспорт в Parquet успешно завершен")
+            return True
+        except Exception as e:
+            error_msg = f"Ошибка при экспорте в Parquet: {str(e)}"
+            self.logger.error(error_msg)
+            raise Exception(error_msg)
+    
+    def _format_text_report_token(self, index: int, token: Token, detailed: bool) -> str:
+        """Блок одного токена для generate_text_report: собирается в список строк и склеивается одним join"""
+        parts = []
+        w = parts.append
+        # Значения, которые нужны и в основном, и в детальном блоке, форматируются один раз
+        vr = token.verification_result
+        if vr:
+            buy_tax_formatted = format_tax_percentage(vr.buy_tax)
+            sell_tax_formatted = format_tax_percentage(vr.sell_tax)
+        volume_liquidity_ratio = token.volume_24h / token.liquidity_usd if token.liquidity_usd > 0 else 0
+        # Сырые поля info достаются один раз и используются в обоих блоках
+        info = token.info
+        holders = info.get("holders") or _EMPTY
+        websites = info.get("websites") or ()
+        socials = info.get("socials") or ()
+        w(f"{index}. {token.symbol} ({token.network})\n")
+        w("   " + "-" * 40 + "\n")
+        w(f"   Рост: 1ч: {token.price_change_1h:.2f}%, 6ч: {token.price_change_6h:.2f}%, 24ч: {token.price_change_24h:.2f}%\n")
+        w(f"   Риск: {token.risk_level}\n")
+        w(f"   Возраст: {token.format_age()}\n")
+        w(f"   Изменение цены (24ч): {token.price_change_24h:.2f}%\n")
+        w(f"   Ликвидность: {token.format_money(token.liquidity_usd)}\n")
+        w(f"   Объем торгов (24ч): {token.format_money(token.volume_24h)}\n")
+        # Соотношение объема к ликвидности (в основной блок)
+        w(f"   Соотношение объема к ликвидности: {volume_liquidity_ratio:.2f}\n")
+
+        # Информация о безопасности
+        if token.security_score is not None:
+            w(f"   🔒 Безопасность: {token.security_score:.3f}\n")
+            if token.contract_verified is not None:
+                w(f"   Контракт: {'✅ Верифицирован' if token.contract_verified else '❌ Не верифицирован'}\n")
+            if token.ownership_renounced is not None:
+                w(f"   Владелец: {'✅ Ренонсирован' if token.ownership_renounced else '❌ Не ренонсирован'}\n")
+            if token.liquidity_locked is not None:
+                w(f"   Ликвидность: {'✅ Заблокирована' if token.liquidity_locked else '❌ Не заблокирована'}\n")
+                # Детали блокировки ликвидности (платформа/срок), если доступны
+                if token.liquidity_lock_info:
+                    lock_info = token.liquidity_lock_info
+                    if getattr(lock_info, 'is_locked', False):
+                        unlock_str = ''
+                        try:
+                            if getattr(lock_info, 'unlock_date', None):
+                                # unlock_date может быть datetime
+                                unlock_str = f", до {lock_info.unlock_date.strftime('%Y-%m-%d')}"
+                        except Exception:
+                            pass
+                        w(
+                            f"   🔒 Блокировка ликвидности: {lock_info.locked_percentage:.1f}% на {lock_info.lock_duration_days} дней ({lock_info.platform}{unlock_str})\n"
+                        )
+            if token.honeypot_probability is not None:
+                w(f"   Honeypot: {token.honeypot_probability:.1%}\n")
+
+            # Налоги buy/sell из верификации контракта, если доступны
+            if vr:
+                if buy_tax_formatted != "0" or sell_tax_formatted != "0":
+                    w(f"   Налоги: {buy_tax_formatted}% покупка / {sell_tax_formatted}% продажа\n")
+
+            # Сигналы DEXScreener (если есть)
+            try:
+                external_checks = token.security_report.external_checks if token.security_report else {}
+            except Exception:
+                external_checks = {}
+            ds = (external_checks or {}).get('dexscreener') or {}
+            if ds:
+                w(f"   🔍 DEXScreener:\n")
+                if ds.get('pair_url'):
+                    w(f"      • Пара: {ds['pair_url']}\n")
+                metrics = ds.get('metrics', {}) or {}
+                warnings = ds.get('warnings', []) or []
+                if metrics:
+                    liq = metrics.get('liquidity_usd')
+                    vol = metrics.get('volume_24h')
+                    ch24 = metrics.get('price_change_h24')
+                    ageh = metrics.get('age_hours')
+                    ratio = metrics.get('vol_liq_ratio')
+                    if liq is not None:
+                        w(f"      • Ликвидность: ${float(liq):,.0f}\n")
+                    if vol is not None:
+                        w(f"      • Объем 24ч: ${float(vol):,.0f}\n")
+                    if ch24 is not None:
+                        w(f"      • Изм. цены 24ч: {float(ch24):+.2f}%\n")
+                    if ageh is not None:
+                        w(f"      • Возраст пула: {float(ageh):.1f} ч\n")
+                    if ratio is not None:
+                        w(f"      • Объем/Ликвидность: {float(ratio):.2f}\n")
+                if warnings:
+                    for warning in warnings[:5]:
+                        w(f"      • ⚠️ {warning}\n")
+
+        # Краткая сводка по держателям (в основной блок)
+        if holders:
+            total_holders = holders.get('total')
+            top = holders.get('top', []) or []
+            # Если есть предрассчитанный показатель
+            top10_percent = getattr(token, 'top_10_percent', None)
+            if top10_percent is None:
+                # Пытаемся посчитать из top[]
+                accum = 0.0
+                for h in top[:10]:
+                    try:
+                        accum += float(h.get('percentage', 0) or 0)
+                    except (TypeError, ValueError):
+                        continue
+                top10_percent = accum
+            if total_holders is not None:
+                w(f"   Держатели: всего {total_holders} | Топ-10: {float(top10_percent):.1f}%\n")
+            else:
+                w(f"   Топ-10 держателей: {float(top10_percent):.1f}%\n")
+
+        if detailed:
+            w(f"   Соотношение объема к ликвидности: {volume_liquidity_ratio:.2f}\n")
+
+            # Информация о контракте
+            if vr:
+                w(f"   Контракт: {'Верифицирован' if vr.is_verified else 'Не верифицирован'}\n")
+                w(f"   Источник верификации: {vr.verification_source}\n")
+                if vr.is_honeypot:
+                    w(f"   ⚠️ HONEYPOT: ДА\n")
+                if buy_tax_formatted != "0" or sell_tax_formatted != "0":
+                    w(f"   Налоги: {buy_tax_formatted}% покупка / {sell_tax_formatted}% продажа\n")
+            else:
+                contract_info = info.get("contract") or _EMPTY
+                w(f"   Контракт: {'Верифицирован' if contract_info.get('verified') else 'Не верифицирован'}\n")
+
+            # Информация о держателях
+            if holders:
+                w(f"   Количество держателей: {holders.get('total', 'Н/Д')}\n")
+                top_holders = holders.get("top", [])
+                if top_holders:
+                    w("   Топ-5 держателей:\n")
+                    for j, holder in enumerate(top_holders[:5], 1):
+                        w(f"    {j}. {holder.get('address', 'Н/Д')}: {holder.get('percentage', 0):.2f}%\n")
+
+            # Сайты и социальные сети
+            if websites:
+                w(f"   Сайты:\n")
+                for website in websites:
+                    if isinstance(website, dict):
+                        url = website.get('url', '')
+                        w(f"    - {url}\n")
+                    else:
+                        w(f"    - {website}\n")
+            else:
+                w("   Сайты: Нет\n")
+
+            if socials:
+                w(f"   Социальные сети:\n")
+                for social in socials:
+                    if isinstance(social, dict):
+                        url = social.get('url', '')
+                        w(f"    - {url}\n")
+                    else:
+                        w(f"    - {social}\n")
+            else:
+                w("   Социальные сети: Нет\n")
+
+            if token.risk_factors:
+                w("   Факторы риска:\n")
+                for factor in token.risk_factors:
+                    w(f"    - {factor}\n")
+
+            w("   Ссылки:\n")
+            w(f"    - DEX: {token.get_dex_url()}\n")
+            w(f"    - Explorer: {token.get_explorer_url()}\n")
+            w(f"    - DexScreener: {token.get_dexscreener_url()}\n")
+            w("\n")
+
+        w("\n")
+        return "".join(parts)
+    
+    # Порядок разделов текстового отчета: от самого рискованного уровня
+    _REPORT_LEVEL_ORDER = ("Скам", "Высокий", "Средний", "Умеренный", "Низкий")
+    
+    def _risk_level_groups(self, tokens_list: List[Token]) -> Dict[str, List[Token]]:
+        """Токены по уровням риска в порядке _REPORT_LEVEL_ORDER, внутри уровня - по убыванию риск-скора.
+        Одна устойчивая сортировка numpy по (уровень, -скор) вместо фильтра и sort на каждый уровень"""
+        n = len(tokens_list)
+        if n == 0:
+            return {}
+        rank_of = {level: i for i, level in enumerate(self._REPORT_LEVEL_ORDER)}
+        other = len(rank_of)
+        ranks = np.fromiter((rank_of.get(t.risk_level, other) for t in tokens_list), dtype=np.intp, count=n)
+        scores = np.fromiter((t.risk_score for t in tokens_list), dtype=np.float64, count=n)
+        order = np.lexsort((-scores, ranks))
+        bounds = np.cumsum(np.bincount(ranks, minlength=other + 1))[:-1]
+        parts = np.split(np.array(tokens_list, dtype=object)[order], bounds)
+        groups = {level: part.tolist() for level, part in zip(self._REPORT_LEVEL_ORDER, parts) if len(part)}
+        # Нестандартные уровни (вне _REPORT_LEVEL_ORDER) идут в конце
+        for token in parts[-1].tolist():
+            groups.setdefault(token.risk_level, []).append(token)
+        return groups
+    
     def generate_text_report(self, file_path: str, tokens_list: Optional[List[Token]] = None, detailed: bool = True, report_title: str = "АНАЛИЗ ТОКЕНОВ") -> bool:
         """Генерирует текстовый отчет по токенам"""
         if tokens_list is None:
@@ -868,7 +1829,7 @@ class TokenAnalyzer:
         self.logger.info(f"Генерация {report_type.lower()} текстового отчета: {file_path}")
         
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
+            with open(file_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
                 # Заголовок отчета
                 f.write("=" * 80 + "\n")
                 f.write(" " * 30 + "ОТЧЕТ ПО АНАЛИЗУ ТОКЕНОВ" + " " * 30 + "\n")
@@ -885,20 +1846,22 @@ class TokenAnalyzer:
                 f.write("СТАТИСТИКА\n")
                 f.write("-" * 80 + "\n")
                 
-                # Таблица распределения по уровням риска
-                risk_levels = {"Скам": 0, "Высокий": 0, "Средний": 0, "Умеренный": 0, "Низкий": 0}
-                networks = {}
+                # Группы по уровню риска (уже отсортированы по риск-скору) - для статистики и разделов
+                by_level = self._risk_level_groups(tokens_list)
+                networks = Counter(t.network for t in tokens_list)
                 
-                for token in tokens_list:
-                    risk_levels[token.risk_level] = risk_levels.get(token.risk_level, 0) + 1
-                    networks[token.network] = networks.get(token.network, 0) + 1
+                # Таблица распределения по уровням риска (доля в процентах - умножением на 100 / total)
+                inv_total = 100.0 / len(tokens_list) if tokens_list else 0.0
+                risk_levels = {level: len(by_level.get(level, ())) for level in self._REPORT_LEVEL_ORDER}
+                for level, level_group in by_level.items():
+                    risk_levels.setdefault(level, len(level_group))
                 
                 f.write("Распределение по уровням риска:\n")
                 f.write("┌────────────────┬──────────┬──────────┐\n")
                 f.write("│ Уровень риска  │Количество│ Процент  │\n")
                 f.write("├────────────────┼──────────┼──────────┤\n")
                 for level, count in risk_levels.items():
-                    percentage = (count / len(tokens_list)) * 100 if tokens_list else 0
+                    percentage = count * inv_total
                     f.write(f"│ {level:14} │ {count:8} │ {percentage:7.1f}% │\n")
                 f.write("└────────────────┴──────────┴──────────┘\n\n")
                 
@@ -907,13 +1870,13 @@ class TokenAnalyzer:
                 f.write("│ Сеть           │Количество│ Процент  │\n")
                 f.write("├────────────────┼──────────┼──────────┤\n")
                 for network, count in sorted(networks.items()):
-                    percentage = (count / len(tokens_list)) * 100 if tokens_list else 0
+                    percentage = count * inv_total
                     f.write(f"│ {network:14} │ {count:8} │ {percentage:7.1f}% │\n")
                 f.write("└────────────────┴──────────┴──────────┘\n\n")
                 
                 # Отчет по категориям риска
-                for risk_level in ["Скам", "Высокий", "Средний", "Умеренный", "Низкий"]:
-                    level_tokens = [t for t in tokens_list if t.risk_level == risk_level]
+                for risk_level in self._REPORT_LEVEL_ORDER:
+                    level_tokens = by_level.get(risk_level)
                     if not level_tokens:
                         continue
                     
@@ -921,175 +1884,8 @@ class TokenAnalyzer:
                     f.write("-" * 80 + "\n")
                     f.write(f"Количество: {len(level_tokens)}\n\n")
                     
-                    # Сортировка токенов по убыванию риск-скора
-                    level_tokens.sort(key=lambda x: x.risk_score, reverse=True)
-                    
                     for i, token in enumerate(level_tokens, 1):
-                        f.write(f"{i}. {token.symbol} ({token.network})\n")
-                        f.write("   " + "-" * 40 + "\n")
-                        f.write(f"   Рост: 1ч: {token.price_change_1h:.2f}%, 6ч: {token.price_change_6h:.2f}%, 24ч: {token.price_change_24h:.2f}%\n")
-                        f.write(f"   Риск: {token.risk_level}\n")
-                        f.write(f"   Возраст: {token.format_age()}\n")
-                        f.write(f"   Изменение цены (24ч): {token.price_change_24h:.2f}%\n")
-                        f.write(f"   Ликвидность: {token.format_money(token.liquidity_usd)}\n")
-                        f.write(f"   Объем торгов (24ч): {token.format_money(token.volume_24h)}\n")
-                        # Соотношение объема к ликвидности (в основной блок)
-                        volume_liquidity_ratio_short = token.volume_24h / token.liquidity_usd if token.liquidity_usd > 0 else 0
-                        f.write(f"   Соотношение объема к ликвидности: {volume_liquidity_ratio_short:.2f}\n")
-                        
-                        # Информация о безопасности
-                        if hasattr(token, 'security_score'):
-                            f.write(f"   🔒 Безопасность: {token.security_score:.3f}\n")
-                            if hasattr(token, 'contract_verified'):
-                                f.write(f"   Контракт: {'✅ Верифицирован' if token.contract_verified else '❌ Не верифицирован'}\n")
-                            if hasattr(token, 'ownership_renounced'):
-                                f.write(f"   Владелец: {'✅ Ренонсирован' if token.ownership_renounced else '❌ Не ренонсирован'}\n")
-                            if hasattr(token, 'liquidity_locked'):
-                                f.write(f"   Ликвидность: {'✅ Заблокирована' if token.liquidity_locked else '❌ Не заблокирована'}\n")
-                                # Детали блокировки ликвидности (платформа/срок), если доступны
-                                if hasattr(token, 'liquidity_lock_info') and token.liquidity_lock_info:
-                                    lock_info = token.liquidity_lock_info
-                                    if getattr(lock_info, 'is_locked', False):
-                                        unlock_str = ''
-                                        try:
-                                            if getattr(lock_info, 'unlock_date', None):
-                                                # unlock_date может быть datetime
-                                                unlock_str = f", до {lock_info.unlock_date.strftime('%Y-%m-%d')}"
-                                        except Exception:
-                                            pass
-                                        f.write(
-                                            f"   🔒 Блокировка ликвидности: {lock_info.locked_percentage:.1f}% на {lock_info.lock_duration_days} дней ({lock_info.platform}{unlock_str})\n"
-                                        )
-                            if hasattr(token, 'honeypot_probability'):
-                                f.write(f"   Honeypot: {token.honeypot_probability:.1%}\n")
-
-                            # Налоги buy/sell из верификации контракта, если доступны
-                            if hasattr(token, 'verification_result') and token.verification_result:
-                                buy_tax_formatted = format_tax_percentage(token.verification_result.buy_tax)
-                                sell_tax_formatted = format_tax_percentage(token.verification_result.sell_tax)
-                                if buy_tax_formatted != "0" or sell_tax_formatted != "0":
-                                    f.write(f"   Налоги: {buy_tax_formatted}% покупка / {sell_tax_formatted}% продажа\n")
-                            
-                            # Сигналы DEXScreener (если есть)
-                            try:
-                                external_checks = getattr(token, 'security_report', {}).external_checks if hasattr(token, 'security_report') and token.security_report else {}
-                            except Exception:
-                                external_checks = {}
-                            ds = (external_checks or {}).get('dexscreener') or {}
-                            if ds:
-                                f.write(f"   🔍 DEXScreener:\n")
-                                if ds.get('pair_url'):
-                                    f.write(f"      • Пара: {ds['pair_url']}\n")
-                                metrics = ds.get('metrics', {}) or {}
-                                warnings = ds.get('warnings', []) or []
-                                if metrics:
-                                    liq = metrics.get('liquidity_usd')
-                                    vol = metrics.get('volume_24h')
-                                    ch24 = metrics.get('price_change_h24')
-                                    ageh = metrics.get('age_hours')
-                                    ratio = metrics.get('vol_liq_ratio')
-                                    if liq is not None:
-                                        f.write(f"      • Ликвидность: ${float(liq):,.0f}\n")
-                                    if vol is not None:
-                                        f.write(f"      • Объем 24ч: ${float(vol):,.0f}\n")
-                                    if ch24 is not None:
-                                        f.write(f"      • Изм. цены 24ч: {float(ch24):+.2f}%\n")
-                                    if ageh is not None:
-                                        f.write(f"      • Возраст пула: {float(ageh):.1f} ч\n")
-                                    if ratio is not None:
-                                        f.write(f"      • Объем/Ликвидность: {float(ratio):.2f}\n")
-                                if warnings:
-                                    for w in warnings[:5]:
-                                        f.write(f"      • ⚠️ {w}\n")
-                        
-                        # Краткая сводка по держателям (в основной блок)
-                        holders = token.info.get("holders", {}) if hasattr(token, 'info') else {}
-                        if holders:
-                            total_holders = holders.get('total')
-                            top = holders.get('top', []) or []
-                            # Если есть предрассчитанный показатель
-                            top10_percent = getattr(token, 'top_10_percent', None)
-                            if top10_percent is None:
-                                # Пытаемся посчитать из top[]
-                                accum = 0.0
-                                for h in top[:10]:
-                                    try:
-                                        accum += float(h.get('percentage', 0) or 0)
-                                    except (TypeError, ValueError):
-                                        continue
-                                top10_percent = accum
-                            if total_holders is not None:
-                                f.write(f"   Держатели: всего {total_holders} | Топ-10: {float(top10_percent):.1f}%\n")
-                            else:
-                                f.write(f"   Топ-10 держателей: {float(top10_percent):.1f}%\n")
-
-                        if detailed:
-                            volume_liquidity_ratio = token.volume_24h / token.liquidity_usd if token.liquidity_usd > 0 else 0
-                            f.write(f"   Соотношение объема к ликвидности: {volume_liquidity_ratio:.2f}\n")
-                            
-                            # Информация о контракте
-                            if hasattr(token, 'verification_result') and token.verification_result:
-                                vr = token.verification_result
-                                f.write(f"   Контракт: {'Верифицирован' if vr.is_verified else 'Не верифицирован'}\n")
-                                f.write(f"   Источник верификации: {vr.verification_source}\n")
-                                if vr.is_honeypot:
-                                    f.write(f"   ⚠️ HONEYPOT: ДА\n")
-                                buy_tax_formatted = format_tax_percentage(vr.buy_tax)
-                                sell_tax_formatted = format_tax_percentage(vr.sell_tax)
-                                if buy_tax_formatted != "0" or sell_tax_formatted != "0":
-                                    f.write(f"   Налоги: {buy_tax_formatted}% покупка / {sell_tax_formatted}% продажа\n")
-                            else:
-                                contract_info = token.info.get("contract", {})
-                                f.write(f"   Контракт: {'Верифицирован' if contract_info.get('verified') else 'Не верифицирован'}\n")
-                            
-                            # Информация о держателях
-                            holders = token.info.get("holders", {})
-                            if holders:
-                                f.write(f"   Количество держателей: {holders.get('total', 'Н/Д')}\n")
-                                top_holders = holders.get("top", [])
-                                if top_holders:
-                                    f.write("   Топ-5 держателей:\n")
-                                    for j, holder in enumerate(top_holders[:5], 1):
-                                        f.write(f"    {j}. {holder.get('address', 'Н/Д')}: {holder.get('percentage', 0):.2f}%\n")
-                            
-                            # Сайты и социальные сети
-                            websites = token.info.get("websites", [])
-                            socials = token.info.get("socials", [])
-                            
-                            if websites:
-                                f.write(f"   Сайты:\n")
-                                for website in websites:
-                                    if isinstance(website, dict):
-                                        url = website.get('url', '')
-                                        f.write(f"    - {url}\n")
-                                    else:
-                                        f.write(f"    - {website}\n")
-                            else:
-                                f.write("   Сайты: Нет\n")
-                                
-                            if socials:
-                                f.write(f"   Социальные сети:\n")
-                                for social in socials:
-                                    if isinstance(social, dict):
-                                        url = social.get('url', '')
-                                        f.write(f"    - {url}\n")
-                                    else:
-                                        f.write(f"    - {social}\n")
-                            else:
-                                f.write("   Социальные сети: Нет\n")
-                            
-                            if token.risk_factors:
-                                f.write("   Факторы риска:\n")
-                                for factor in token.risk_factors:
-                                    f.write(f"    - {factor}\n")
-                            
-                            f.write("   Ссылки:\n")
-                            f.write(f"    - DEX: {token.get_dex_url()}\n")
-                            f.write(f"    - Explorer: {token.get_explorer_url()}\n")
-                            f.write(f"    - DexScreener: {token.get_dexscreener_url()}\n")
-                            f.write("\n")
-                        
-                        f.write("\n")
+                        f.write(self._format_text_report_token(i, token, detailed))
                 
                 # Заголовок отчета
                 f.write(f"{report_title}\n")
@@ -1101,195 +1897,183 @@ class TokenAnalyzer:
                 if recommended:
                     recommended.sort(key=lambda x: x.price_change_24h, reverse=True)
                     for i, token in enumerate(recommended, 1):
-                        f.write(f"{i}. {token.symbol} ({token.network})\n")
-                        f.write("   " + "-" * 40 + "\n")
-                        f.write(f"   Рост: 1ч: {token.price_change_1h:.2f}%, 6ч: {token.price_change_6h:.2f}%, 24ч: {token.price_change_24h:.2f}%\n")
-                        f.write(f"   Риск: {token.risk_level}\n")
+                        # Блок токена собирается в список строк и пишется одним write
+                        parts = []
+                        w = parts.append
+                        w(f"{i}. {token.symbol} ({token.network})\n")
+                        w("   " + "-" * 40 + "\n")
+                        w(f"   Рост: 1ч: {token.price_change_1h:.2f}%, 6ч: {token.price_change_6h:.2f}%, 24ч: {token.price_change_24h:.2f}%\n")
+                        w(f"   Риск: {token.risk_level}\n")
                         
                         # Добавляем краткую рекомендацию на основе динамики
-                        trend_1h = token.price_change_1h
-                        trend_6h = token.price_change_6h
-                        trend_24h = token.price_change_24h
+                        emoji, recommendation = _TREND_RECOMMENDATIONS[_trend_recommendation_index(
+                            token.price_change_1h, token.price_change_6h, token.price_change_24h)]
+                        w(f"   {emoji} {recommendation}\n")
                         
-                        recommendation = ""
-                        if trend_1h > 0 and trend_1h > trend_6h:
-                            recommendation = "🚀 АКТИВНЫЙ РОСТ - рекомендуется для краткосрочной торговли"
-                        elif trend_1h < 0 and trend_6h < 0:
-                            recommendation = "📉 КОРРЕКЦИЯ - возможна точка входа"
-                        elif trend_1h > 0 and trend_6h > 0 and trend_24h > 0:
-                            recommendation = "📈 УСТОЙЧИВЫЙ РОСТ - хорошая среднесрочная перспектива"
-                        elif trend_1h < 0 and trend_6h > 0:
-                            recommendation = "⚡ ОТКАТ - возможен отскок"
-                        elif abs(trend_1h) < 2 and abs(trend_6h) < 5:
-                            recommendation = "⏸️ КОНСОЛИДАЦИЯ - накопление позиций"
-                        elif trend_24h > 100 and trend_1h < 0:
-                            recommendation = "⚠️ ПЕРЕКУПЛЕН - высокий риск коррекции"
-                        else:
-                            recommendation = "📊 СМЕШАННАЯ ДИНАМИКА - требуется наблюдение"
-                            
-                        f.write(f"   {recommendation}\n")
-                        
-                        f.write(f"   Ликвидность: {token.format_money(token.liquidity_usd)}, Объем: {token.format_money(token.volume_24h)}\n")
+                        w(f"   Ликвидность: {token.format_money(token.liquidity_usd)}, Объем: {token.format_money(token.volume_24h)}\n")
                         
                         # КРИТИЧНО: Информация о блокировке ликвидности
-                        if hasattr(token, 'liquidity_lock_info') and token.liquidity_lock_info:
+                        if token.liquidity_lock_info:
                             lock_info = token.liquidity_lock_info
                             if lock_info.is_locked:
-                                f.write(f"   🔒 Ликвидность заблокирована: {lock_info.locked_percentage}% на {lock_info.lock_duration_days} дней ({lock_info.platform})\n")
+                                w(f"   🔒 Ликвидность заблокирована: {lock_info.locked_percentage}% на {lock_info.lock_duration_days} дней ({lock_info.platform})\n")
                                 
                                 # Оценка безопасности
-                                lock_score = getattr(token, 'liquidity_lock_score', 0)
+                                lock_score = token.liquidity_lock_score or 0
                                 if lock_score >= 80:
-                                    f.write(f"   🟢 Безопасность блокировки: ВЫСОКАЯ ({lock_score}/100)\n")
+                                    w(f"   🟢 Безопасность блокировки: ВЫСОКАЯ ({lock_score}/100)\n")
                                 elif lock_score >= 50:
-                                    f.write(f"   🟡 Безопасность блокировки: СРЕДНЯЯ ({lock_score}/100)\n")
+                                    w(f"   🟡 Безопасность блокировки: СРЕДНЯЯ ({lock_score}/100)\n")
                                 else:
-                                    f.write(f"   🔴 Безопасность блокировки: НИЗКАЯ ({lock_score}/100)\n")
+                                    w(f"   🔴 Безопасность блокировки: НИЗКАЯ ({lock_score}/100)\n")
                             else:
-                                f.write(f"   ❌ КРИТИЧНО: Ликвидность НЕ заблокирована! Высокий риск rug pull!\n")
+                                w(f"   ❌ КРИТИЧНО: Ликвидность НЕ заблокирована! Высокий риск rug pull!\n")
                         else:
-                            f.write(f"   ⚠️ Статус блокировки ликвидности не проверен\n")
+                            w(f"   ⚠️ Статус блокировки ликвидности не проверен\n")
                         
                         # Добавляем обоснование рекомендации
-                        f.write("\n   ПОЧЕМУ МЫ РЕКОМЕНДУЕМ:\n")
+                        w("\n   ПОЧЕМУ МЫ РЕКОМЕНДУЕМ:\n")
                         
                         # Анализ ликвидности
                         if token.liquidity_usd > 1000000:
-                            f.write("   ✅ Высокая ликвидность (>$1M) снижает риск манипуляций\n")
+                            w("   ✅ Высокая ликвидность (>$1M) снижает риск манипуляций\n")
                         elif token.liquidity_usd > 250000:
-                            f.write("   ✅ Хорошая ликвидность (>$250K) обеспечивает стабильность\n")
+                            w("   ✅ Хорошая ликвидность (>$250K) обеспечивает стабильность\n")
                         else:
-                            f.write("   ⚠️ Средняя ликвидность - рекомендуется осторожность\n")
+                            w("   ⚠️ Средняя ликвидность - рекомендуется осторожность\n")
                         
                         # Анализ объема торгов
                         vol_liq_ratio = token.volume_24h / token.liquidity_usd if token.liquidity_usd > 0 else 0
                         if 0.5 <= vol_liq_ratio <= 5:
-                            f.write("   ✅ Здоровое соотношение объема к ликвидности\n")
+                            w("   ✅ Здоровое соотношение объема к ликвидности\n")
                         elif vol_liq_ratio > 5:
-                            f.write("   ⚠️ Высокая торговая активность - возможна повышенная волатильность\n")
+                            w("   ⚠️ Высокая торговая активность - возможна повышенная волатильность\n")
                         else:
-                            f.write("   ℹ️ Низкая торговая активность - возможно накопление\n")
+                            w("   ℹ️ Низкая торговая активность - возможно накопление\n")
                         
                         # Анализ возраста
                         if token.age_hours > 720:  # 30 дней
-                            f.write("   ✅ Проверенный временем токен (>30 дней)\n")
+                            w("   ✅ Проверенный временем токен (>30 дней)\n")
                         elif token.age_hours > 168:  # 7 дней
-                            f.write("   ✅ Токен прошел начальную стабилизацию (>7 дней)\n")
+                            w("   ✅ Токен прошел начальную стабилизацию (>7 дней)\n")
                         else:
-                            f.write("   ⚠️ Относительно новый токен - требуется осторожность\n")
+                            w("   ⚠️ Относительно новый токен - требуется осторожность\n")
                         
                         # Анализ транзакций
                         total_txns = token.buys_24h + token.sells_24h
                         if total_txns > 0:
                             buy_ratio = token.buys_24h / total_txns
                             if buy_ratio > 0.6:
-                                f.write(f"   ✅ Преобладают покупки ({buy_ratio*100:.1f}% транзакций)\n")
+                                w(f"   ✅ Преобладают покупки ({buy_ratio*100:.1f}% транзакций)\n")
                             elif buy_ratio > 0.4:
-                                f.write(f"   ✅ Сбалансированные покупки/продажи\n")
+                                w(f"   ✅ Сбалансированные покупки/продажи\n")
                             else:
-                                f.write(f"   ⚠️ Преобладают продажи - возможна коррекция\n")
+                                w(f"   ⚠️ Преобладают продажи - возможна коррекция\n")
                         
                         # Анализ роста
                         if token.price_change_24h > 100:
-                            f.write("   🚀 Сильный рост - высокий потенциал, но повышенные риски\n")
+                            w("   🚀 Сильный рост - высокий потенциал, но повышенные риски\n")
                         elif token.price_change_24h > 50:
-                            f.write("   📈 Уверенный рост с хорошей динамикой\n")
+                            w("   📈 Уверенный рост с хорошей динамикой\n")
                         else:
-                            f.write("   📊 Стабильный рост\n")
+                            w("   📊 Стабильный рост\n")
                         
                         # Проверка наличия информации
-                        has_website = bool(token.info.get("websites", []))
-                        has_socials = bool(token.info.get("socials", []))
+                        has_website = token.has_website
+                        has_socials = token.has_socials
                         if has_website and has_socials:
-                            f.write("   ✅ Есть сайт и социальные сети\n")
+                            w("   ✅ Есть сайт и социальные сети\n")
                             # Добавляем ссылки на сайты и социальные сети
-                            websites = token.info.get("websites", [])
-                            socials = token.info.get("socials", [])
+                            info = token.info
+                            websites = info.get("websites") or ()
+                            socials = info.get("socials") or ()
                             
                             if websites:
-                                f.write("   Сайты:\n")
+                                w("   Сайты:\n")
                                 for website in websites:
                                     if isinstance(website, dict):
                                         url = website.get('url', '')
-                                        f.write(f"    - {url}\n")
+                                        w(f"    - {url}\n")
                                     else:
-                                        f.write(f"    - {website}\n")
+                                        w(f"    - {website}\n")
                             
                             if socials:
-                                f.write("   Социальные сети:\n")
+                                w("   Социальные сети:\n")
                                 for social in socials:
                                     if isinstance(social, dict):
                                         url = social.get('url', '')
-                                        f.write(f"    - {url}\n")
+                                        w(f"    - {url}\n")
                                     else:
-                                        f.write(f"    - {social}\n")
+                                        w(f"    - {social}\n")
                         elif has_website or has_socials:
-                            f.write("   ⚠️ Частично представлен в сети\n")
+                            w("   ⚠️ Частично представлен в сети\n")
                             # Добавляем доступные ссылки
-                            websites = token.info.get("websites", [])
-                            socials = token.info.get("socials", [])
+                            info = token.info
+                            websites = info.get("websites") or ()
+                            socials = info.get("socials") or ()
                             
                             if websites:
-                                f.write("   Сайты:\n")
+                                w("   Сайты:\n")
                                 for website in websites:
                                     if isinstance(website, dict):
                                         url = website.get('url', '')
-                                        f.write(f"    - {url}\n")
+                                        w(f"    - {url}\n")
                                     else:
-                                        f.write(f"    - {website}\n")
+                                        w(f"    - {website}\n")
                             
                             if socials:
-                                f.write("   Социальные сети:\n")
+                                w("   Социальные сети:\n")
                                 for social in socials:
                                     if isinstance(social, dict):
                                         url = social.get('url', '')
-                                        f.write(f"    - {url}\n")
+                                        w(f"    - {url}\n")
                                     else:
-                                        f.write(f"    - {social}\n")
+                                        w(f"    - {social}\n")
                         
                         # Добавляем информацию о верификации контракта
-                        if hasattr(token, 'verification_result') and token.verification_result:
-                            f.write("\n   🔍 ВЕРИФИКАЦИЯ КОНТРАКТА:\n")
-                            f.write(f"    - Статус: {'✅ Верифицирован' if token.verification_result.is_verified else '❌ Не верифицирован'}\n")
-                            f.write(f"    - Honeypot: {'🚨 ДА' if token.verification_result.is_honeypot else '✅ НЕТ'}\n")
+                        if token.verification_result:
+                            w("\n   🔍 ВЕРИФИКАЦИЯ КОНТРАКТА:\n")
+                            w(f"    - Статус: {'✅ Верифицирован' if token.verification_result.is_verified else '❌ Не верифицирован'}\n")
+                            w(f"    - Honeypot: {'🚨 ДА' if token.verification_result.is_honeypot else '✅ НЕТ'}\n")
                             buy_tax_formatted = format_tax_percentage(token.verification_result.buy_tax)
                             sell_tax_formatted = format_tax_percentage(token.verification_result.sell_tax)
                             # Показываем налоги только если они не равны 0%
                             if buy_tax_formatted != "0" or sell_tax_formatted != "0":
-                                f.write(f"    - Налоги: {buy_tax_formatted}% покупка / {sell_tax_formatted}% продажа\n")
+                                w(f"    - Налоги: {buy_tax_formatted}% покупка / {sell_tax_formatted}% продажа\n")
                             if token.verification_result.owner_address:
-                                f.write(f"    - Владелец: {token.verification_result.owner_address[:10]}...\n")
+                                w(f"    - Владелец: {token.verification_result.owner_address[:10]}...\n")
                             if token.verification_result.can_take_back_ownership:
-                                f.write(f"    - ⚠️ Владелец может вернуть права\n")
+                                w(f"    - ⚠️ Владелец может вернуть права\n")
                             if token.verification_result.has_mint_function:
-                                f.write(f"    - ⚠️ Есть функция mint\n")
+                                w(f"    - ⚠️ Есть функция mint\n")
                             if token.verification_result.has_blacklist:
-                                f.write(f"    - ⚠️ Есть blacklist функция\n")
+                                w(f"    - ⚠️ Есть blacklist функция\n")
                             
                             # Дополнительные данные из raw_data
                             if hasattr(token.verification_result, 'raw_data') and token.verification_result.raw_data:
                                 raw = token.verification_result.raw_data
                                 if raw.get('is_blacklisted') == '1':
-                                    f.write(f"    - 🚫 В черном списке GoPlus\n")
+                                    w(f"    - 🚫 В черном списке GoPlus\n")
                                 if raw.get('slippage_modifiable') == '1':
-                                    f.write(f"    - ⚠️ Модифицируемый slippage\n")
+                                    w(f"    - ⚠️ Модифицируемый slippage\n")
                                 if raw.get('is_anti_whale') == '1':
-                                    f.write(f"    - ⚠️ Anti-whale механизм\n")
+                                    w(f"    - ⚠️ Anti-whale механизм\n")
                                 if raw.get('cannot_sell_all') == '1':
-                                    f.write(f"    - 🚨 Нельзя продать все токены\n")
+                                    w(f"    - 🚨 Нельзя продать все токены\n")
                                 if raw.get('cannot_buy') == '1':
-                                    f.write(f"    - 🚨 Нельзя покупать\n")
+                                    w(f"    - 🚨 Нельзя покупать\n")
                                 if raw.get('trading_cooldown') and raw.get('trading_cooldown') != '0':
-                                    f.write(f"    - ⏰ Кулдаун торговли: {raw.get('trading_cooldown')}с\n")
+                                    w(f"    - ⏰ Кулдаун торговли: {raw.get('trading_cooldown')}с\n")
                             
                             if token.verification_result.verification_source:
-                                f.write(f"    - Источник: {token.verification_result.verification_source}\n")
+                                w(f"    - Источник: {token.verification_result.verification_source}\n")
                         
-                        f.write("\n   Ссылки:\n")
-                        f.write(f"    - DEX: {token.get_dex_url()}\n")
-                        f.write(f"    - Explorer: {token.get_explorer_url()}\n")
-                        f.write(f"    - DexScreener: {token.get_dexscreener_url()}\n")
-                        f.write("\n")
+                        w("\n   Ссылки:\n")
+                        w(f"    - DEX: {token.get_dex_url()}\n")
+                        w(f"    - Explorer: {token.get_explorer_url()}\n")
+                        w(f"    - DexScreener: {token.get_dexscreener_url()}\n")
+                        w("\n")
+                        f.write("".join(parts))
                 else:
                     f.write("Нет токенов, соответствующих критериям для рекомендации\n")
                 
@@ -1345,21 +2129,19 @@ class TokenAnalyzer:
                 continue
             
             # 4. Нет соцсетей И нет сайта
-            websites = token.info.get("websites", [])
-            socials = token.info.get("socials", [])
-            if not websites and not socials:
+            if not (token.has_website or token.has_socials):
                 continue
             
             # 5. КРИТИЧНО: Проверка блокировки ликвидности
             liquidity_lock_percentage = 0
             liquidity_lock_score = 0
-            if hasattr(token, 'liquidity_lock_info') and token.liquidity_lock_info and token.liquidity_lock_info.is_locked:
+            if token.liquidity_lock_info and token.liquidity_lock_info.is_locked:
                 liquidity_lock_percentage = token.liquidity_lock_info.locked_percentage
-            if hasattr(token, 'liquidity_lock_score'):
+            if token.liquidity_lock_score is not None:
                 liquidity_lock_score = token.liquidity_lock_score
             
             is_verified = False
-            if hasattr(token, 'verification_result') and token.verification_result:
+            if token.verification_result:
                 is_verified = token.verification_result.is_verified
             
             # 🚨 КРИТИЧНО: Блокировка ликвидности обязательна для рекомендаций
@@ -1447,168 +2229,174 @@ class TokenAnalyzer:
                 -x.price_change_24h
             ))
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                # ТОЛЬКО заголовок рекомендаций - убираем всё дублирование сверху
-                f.write("\nРЕКОМЕНДУЕМЫЕ ТОКЕНЫ\n")
-                f.write("-" * 80 + "\n")
+            # Весь отчет собирается в список строк и пишется в файл одним write
+            parts = []
+            w = parts.append
+            
+            # ТОЛЬКО заголовок рекомендаций - убираем всё дублирование сверху
+            w("\nРЕКОМЕНДУЕМЫЕ ТОКЕНЫ\n")
+            w("-" * 80 + "\n")
+            
+            for i, token in enumerate(sorted_tokens, 1):
+                w(f"{i}. {token.symbol} ({token.network})\n")
+                w("   " + "-" * 40 + "\n")
+                w(f"   Рост: 1ч: {token.price_change_1h:.2f}%, 6ч: {token.price_change_6h:.2f}%, 24ч: {token.price_change_24h:.2f}%\n")
+                w(f"   Риск: {token.risk_level}\n")
                 
-                for i, token in enumerate(sorted_tokens, 1):
-                    f.write(f"{i}. {token.symbol} ({token.network})\n")
-                    f.write("   " + "-" * 40 + "\n")
-                    f.write(f"   Рост: 1ч: {token.price_change_1h:.2f}%, 6ч: {token.price_change_6h:.2f}%, 24ч: {token.price_change_24h:.2f}%\n")
-                    f.write(f"   Риск: {token.risk_level}\n")
-                    
-                    # 🎯 ДОБАВЛЯЕМ ЭМОДЗИ ОБРАТНО
-                    if token.price_change_1h < 0:
-                        if token.price_change_24h > 50:
-                            f.write("   ⚡ ОТКАТ - возможен отскок\n")
-                        else:
-                            f.write("   📉 КОРРЕКЦИЯ - возможна точка входа\n")
-                    
-                    f.write(f"   Возраст: {self._format_age(token.age_hours)}\n")
-                    f.write(f"   Изменение цены (24ч): {token.price_change_24h:.2f}%\n")
-                    f.write(f"   Ликвидность: ${token.liquidity_usd:,.2f}K, Объем: ${token.volume_24h:,.2f}K\n")
-                    f.write(f"   Соотношение объема к ликвидности: {token.volume_24h/token.liquidity_usd if token.liquidity_usd > 0 else 0:.2f}\n")
-                    
-                    # Блокировка ликвидности - С ЭМОДЗИ
-                    if hasattr(token, 'liquidity_lock_info') and token.liquidity_lock_info:
-                        lock_info = token.liquidity_lock_info
-                        if lock_info.is_locked:
-                            f.write(f"   🔒 Ликвидность заблокирована: {lock_info.locked_percentage:.1f}% на {lock_info.lock_duration_days} дней ({lock_info.platform})\n")
-                        else:
-                            f.write(f"   ❌ КРИТИЧНО: Ликвидность НЕ заблокирована! Высокий риск rug pull!\n")
-                    
-                    # Собираем положительные и отрицательные факторы
-                    positive_factors = []
-                    negative_factors = []
-                    
-                    # Анализ ликвидности
-                    if token.liquidity_usd >= 100000:
-                        positive_factors.append("✅ Высокая ликвидность - низкие риски")
-                    elif token.liquidity_usd >= 50000:
-                        negative_factors.append("⚠️ Средняя ликвидность - рекомендуется осторожность")
+                # 🎯 ДОБАВЛЯЕМ ЭМОДЗИ ОБРАТНО
+                if token.price_change_1h < 0:
+                    if token.price_change_24h > 50:
+                        w("   ⚡ ОТКАТ - возможен отскок\n")
                     else:
-                        negative_factors.append("🔴 Низкая ликвидность - высокие риски")
-                    
-                    # Анализ объема с улучшенной градацией
-                    volume_ratio = token.volume_24h / token.liquidity_usd if token.liquidity_usd > 0 else 0
-                    if volume_ratio > 20:
-                        negative_factors.append("🔴 КРИТИЧНО: Аномальное соотношение V/L - возможна манипуляция")
-                    elif volume_ratio > 5:
-                        negative_factors.append("🟡 Высокое соотношение V/L - повышенная волатильность")
-                    elif volume_ratio >= 0.1:
-                        positive_factors.append("🟢 Здоровое соотношение объема к ликвидности")
+                        w("   📉 КОРРЕКЦИЯ - возможна точка входа\n")
+                
+                w(f"   Возраст: {self._format_age(token.age_hours)}\n")
+                w(f"   Изменение цены (24ч): {token.price_change_24h:.2f}%\n")
+                w(f"   Ликвидность: ${token.liquidity_usd:,.2f}K, Объем: ${token.volume_24h:,.2f}K\n")
+                w(f"   Соотношение объема к ликвидности: {token.volume_24h/token.liquidity_usd if token.liquidity_usd > 0 else 0:.2f}\n")
+                
+                # Блокировка ликвидности - С ЭМОДЗИ
+                if token.liquidity_lock_info:
+                    lock_info = token.liquidity_lock_info
+                    if lock_info.is_locked:
+                        w(f"   🔒 Ликвидность заблокирована: {lock_info.locked_percentage:.1f}% на {lock_info.lock_duration_days} дней ({lock_info.platform})\n")
                     else:
-                        negative_factors.append("⚠️ Низкая торговая активность")
-                    
-                    # Анализ возраста
-                    if token.age_hours >= 720:  # 30+ дней
-                        positive_factors.append("✅ Проверенный временем токен (>30 дней)")
+                        w(f"   ❌ КРИТИЧНО: Ликвидность НЕ заблокирована! Высокий риск rug pull!\n")
+                
+                # Собираем положительные и отрицательные факторы
+                positive_factors = []
+                negative_factors = []
+                
+                # Анализ ликвидности
+                if token.liquidity_usd >= 100000:
+                    positive_factors.append("✅ Высокая ликвидность - низкие риски")
+                elif token.liquidity_usd >= 50000:
+                    negative_factors.append("⚠️ Средняя ликвидность - рекомендуется осторожность")
+                else:
+                    negative_factors.append("🔴 Низкая ликвидность - высокие риски")
+                
+                # Анализ объема с улучшенной градацией
+                volume_ratio = token.volume_24h / token.liquidity_usd if token.liquidity_usd > 0 else 0
+                if volume_ratio > 20:
+                    negative_factors.append("🔴 КРИТИЧНО: Аномальное соотношение V/L - возможна манипуляция")
+                elif volume_ratio > 5:
+                    negative_factors.append("🟡 Высокое соотношение V/L - повышенная волатильность")
+                elif volume_ratio >= 0.1:
+                    positive_factors.append("🟢 Здоровое соотношение объема к ликвидности")
+                else:
+                    negative_factors.append("⚠️ Низкая торговая активность")
+                
+                # Анализ возраста
+                if token.age_hours >= 720:  # 30+ дней
+                    positive_factors.append("✅ Проверенный временем токен (>30 дней)")
+                else:
+                    negative_factors.append("⚠️ Молодой токен - повышенные риски")
+                
+                # Анализ роста
+                if token.price_change_24h > 100:
+                    positive_factors.append("🚀 Сильный рост - высокий потенциал")
+                    negative_factors.append("⚠️ Высокая волатильность - повышенные риски")
+                elif token.price_change_24h > 50:
+                    positive_factors.append("📈 Умеренный рост - хороший потенциал")
+                else:
+                    positive_factors.append("📊 Стабильный рост - низкие риски")
+                
+                # Верификация контракта
+                if token.verification_result:
+                    if token.verification_result.is_verified:
+                        positive_factors.append("✅ Контракт верифицирован")
                     else:
-                        negative_factors.append("⚠️ Молодой токен - повышенные риски")
+                        negative_factors.append("❌ Контракт не верифицирован")
                     
-                    # Анализ роста
-                    if token.price_change_24h > 100:
-                        positive_factors.append("🚀 Сильный рост - высокий потенциал")
-                        negative_factors.append("⚠️ Высокая волатильность - повышенные риски")
-                    elif token.price_change_24h > 50:
-                        positive_factors.append("📈 Умеренный рост - хороший потенциал")
+                    if token.verification_result.is_honeypot:
+                        negative_factors.append("🍯 HONEYPOT - крайне опасно!")
                     else:
-                        positive_factors.append("📊 Стабильный рост - низкие риски")
-                    
-                    # Верификация контракта
-                    if hasattr(token, 'verification_result') and token.verification_result:
-                        if token.verification_result.is_verified:
-                            positive_factors.append("✅ Контракт верифицирован")
+                        positive_factors.append("✅ Не является honeypot")
+                
+                # Блокировка ликвидности
+                if token.liquidity_lock_info:
+                    if token.liquidity_lock_info.is_locked:
+                        lock_score = token.liquidity_lock_score or 0
+                        if lock_score >= 80:
+                            positive_factors.append("🔒 Высокий уровень блокировки ликвидности")
+                        elif lock_score >= 50:
+                            positive_factors.append("🔒 Средний уровень блокировки ликвидности")
                         else:
-                            negative_factors.append("❌ Контракт не верифицирован")
-                        
-                        if token.verification_result.is_honeypot:
-                            negative_factors.append("🍯 HONEYPOT - крайне опасно!")
+                            negative_factors.append("🔓 Низкий уровень блокировки ликвидности")
+                    else:
+                        negative_factors.append("❌ Ликвидность НЕ заблокирована - риск rug pull!")
+                
+                # Социальные сети и сайты
+                websites = token.info.get("websites", [])
+                socials = token.info.get("socials", [])
+                if websites and socials:
+                    positive_factors.append("✅ Полное онлайн-присутствие (сайт + соцсети)")
+                elif websites or socials:
+                    positive_factors.append("✅ Есть онлайн-присутствие")
+                else:
+                    negative_factors.append("⚠️ Нет официального онлайн-присутствия")
+                
+                # Выводим факторы
+                if positive_factors:
+                    w("\n   💚 ПОЧЕМУ РЕКОМЕНДУЕМ:\n")
+                    for factor in positive_factors:
+                        w(f"   {factor}\n")
+                
+                if negative_factors:
+                    w("\n   ❤️‍🔥 РИСКИ И ПРЕДУПРЕЖДЕНИЯ:\n")
+                    for factor in negative_factors:
+                        w(f"   {factor}\n")
+                
+                # Сайты
+                if websites:
+                    w("   Сайты:\n")
+                    for website in websites:
+                        if isinstance(website, dict):
+                            url = website.get('url', '')
                         else:
-                            positive_factors.append("✅ Не является honeypot")
-                    
-                    # Блокировка ликвидности
-                    if hasattr(token, 'liquidity_lock_info') and token.liquidity_lock_info:
-                        if token.liquidity_lock_info.is_locked:
-                            lock_score = getattr(token, 'liquidity_lock_score', 0)
-                            if lock_score >= 80:
-                                positive_factors.append("🔒 Высокий уровень блокировки ликвидности")
-                            elif lock_score >= 50:
-                                positive_factors.append("🔒 Средний уровень блокировки ликвидности")
-                            else:
-                                negative_factors.append("🔓 Низкий уровень блокировки ликвидности")
+                            url = str(website)
+                        if url:
+                            w(f"    - {url}\n")
+                
+                # Социальные сети
+                if socials:
+                    w("   Социальные сети:\n")
+                    for social in socials:
+                        if isinstance(social, dict):
+                            url = social.get('url', '')
                         else:
-                            negative_factors.append("❌ Ликвидность НЕ заблокирована - риск rug pull!")
-                    
-                    # Социальные сети и сайты
-                    websites = token.info.get("websites", [])
-                    socials = token.info.get("socials", [])
-                    if websites and socials:
-                        positive_factors.append("✅ Полное онлайн-присутствие (сайт + соцсети)")
-                    elif websites or socials:
-                        positive_factors.append("✅ Есть онлайн-присутствие")
-                    else:
-                        negative_factors.append("⚠️ Нет официального онлайн-присутствия")
-                    
-                    # Выводим факторы
-                    if positive_factors:
-                        f.write("\n   💚 ПОЧЕМУ РЕКОМЕНДУЕМ:\n")
-                        for factor in positive_factors:
-                            f.write(f"   {factor}\n")
-                    
-                    if negative_factors:
-                        f.write("\n   ❤️‍🔥 РИСКИ И ПРЕДУПРЕЖДЕНИЯ:\n")
-                        for factor in negative_factors:
-                            f.write(f"   {factor}\n")
-                    
-                    # Сайты
-                    if websites:
-                        f.write("   Сайты:\n")
-                        for website in websites:
-                            if isinstance(website, dict):
-                                url = website.get('url', '')
-                            else:
-                                url = str(website)
-                            if url:
-                                f.write(f"    - {url}\n")
-                    
-                    # Социальные сети
-                    if socials:
-                        f.write("   Социальные сети:\n")
-                        for social in socials:
-                            if isinstance(social, dict):
-                                url = social.get('url', '')
-                            else:
-                                url = str(social)
-                            if url:
-                                f.write(f"    - {url}\n")
-                    
-                    # 🔍 ВЕРИФИКАЦИЯ КОНТРАКТА с эмодзи
-                    if hasattr(token, 'verification_result') and token.verification_result:
-                        f.write("\n   🔍 ВЕРИФИКАЦИЯ КОНТРАКТА:\n")
-                        verification_status = "✅ Верифицирован" if token.verification_result.is_verified else "❌ Не верифицирован"
-                        honeypot_status = "🍯 HONEYPOT" if token.verification_result.is_honeypot else "✅ НЕТ"
-                        f.write(f"    - Статус: {verification_status}\n")
-                        f.write(f"    - Honeypot: {honeypot_status}\n")
-                        if token.verification_result.verification_source:
-                            f.write(f"    - Источник: {token.verification_result.verification_source}\n")
-                    
-                    # 📊 ДЕТАЛЬНАЯ РАЗБИВКА РИСК-СКОРА (для прозрачности)
-                    if hasattr(token, 'score_breakdown') and token.score_breakdown:
-                        f.write(f"\n   📊 РИСК-СКОР: {token.risk_score} баллов\n")
-                        f.write("   Разбивка по факторам:\n")
-                        for factor in token.score_breakdown:
-                            f.write(f"    • {factor}\n")
-                    
-                    # Ссылки - В КОНЦЕ, отдельным блоком
-                    f.write("\n   Ссылки:\n")
-                    f.write(f"    - DEX: {token.get_dex_url()}\n")
-                    f.write(f"    - Explorer: {token.get_explorer_url()}\n")
-                    f.write(f"    - DexScreener: {token.get_dexscreener_url()}\n")
-                    
-                    f.write("\n")
+                            url = str(social)
+                        if url:
+                            w(f"    - {url}\n")
+                
+                # 🔍 ВЕРИФИКАЦИЯ КОНТРАКТА с эмодзи
+                if token.verification_result:
+                    w("\n   🔍 ВЕРИФИКАЦИЯ КОНТРАКТА:\n")
+                    verification_status = "✅ Верифицирован" if token.verification_result.is_verified else "❌ Не верифицирован"
+                    honeypot_status = "🍯 HONEYPOT" if token.verification_result.is_honeypot else "✅ НЕТ"
+                    w(f"    - Статус: {verification_status}\n")
+                    w(f"    - Honeypot: {honeypot_status}\n")
+                    if token.verification_result.verification_source:
+                        w(f"    - Источник: {token.verification_result.verification_source}\n")
                 
+                # 📊 ДЕТАЛЬНАЯ РАЗБИВКА РИСК-СКОРА (для прозрачности)
+                if token.score_breakdown:
+                    w(f"\n   📊 РИСК-СКОР: {token.risk_score} баллов\n")
+                    w("   Разбивка по факторам:\n")
+                    for factor in token.score_breakdown:
+                        w(f"    • {factor}\n")
+                
+                # Ссылки - В КОНЦЕ, отдельным блоком
+                w("\n   Ссылки:\n")
+                w(f"    - DEX: {token.get_dex_url()}\n")
+                w(f"    - Explorer: {token.get_explorer_url()}\n")
+                w(f"    - DexScreener: {token.get_dexscreener_url()}\n")
+                
+                w("\n")
+            
+            with open(file_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                f.write("".join(parts))
+            
             self.logger.info(f"Профессиональный отчет рекомендаций успешно создан")
             return True
             
@@ -1666,6 +2454,7 @@ class TokenAnalyzer:
                           t.liquidity_usd > 50000]
             
             recommended.sort(key=lambda x: x.price_change_24h, reverse=True)
+            self.recommended_tokens = recommended
             
             export_data = {
                 "timestamp": datetime.now().isoformat(),
@@ -1687,21 +2476,7 @@ class TokenAnalyzer:
                 trend_24h = token.price_change_24h
                 
                 # Определение тренда
-                trend_analysis = ""
-                if trend_1h > 0 and trend_1h > trend_6h:
-                    trend_analysis = "АКТИВНЫЙ РОСТ - рекомендуется для краткосрочной торговли"
-                elif trend_1h < 0 and trend_6h < 0:
-                    trend_analysis = "КОРРЕКЦИЯ - возможна точка входа"
-                elif trend_1h > 0 and trend_6h > 0 and trend_24h > 0:
-                    trend_analysis = "УСТОЙЧИВЫЙ РОСТ - хорошая среднесрочная перспектива"
-                elif trend_1h < 0 and trend_6h > 0:
-                    trend_analysis = "ОТКАТ - возможен отскок"
-                elif abs(trend_1h) < 2 and abs(trend_6h) < 5:
-                    trend_analysis = "КОНСОЛИДАЦИЯ - накопление позиций"
-                elif trend_24h > 100 and trend_1h < 0:
-                    trend_analysis = "ПЕРЕКУПЛЕН - высокий риск коррекции"
-                else:
-                    trend_analysis = "СМЕШАННАЯ ДИНАМИКА - требуется наблюдение"
+                trend_analysis = _TREND_RECOMMENDATIONS[_trend_recommendation_index(trend_1h, trend_6h, trend_24h)][1]
                 
                 # Анализ ликвидности и объема
                 vol_liq_ratio = token.volume_24h / token.liquidity_usd if token.liquidity_usd > 0 else 0
@@ -1820,8 +2595,8 @@ class TokenAnalyzer:
                         "lock_transaction": getattr(token, 'liquidity_lock_info', None) and token.liquidity_lock_info.lock_transaction or "",
                         "is_renewable": getattr(token, 'liquidity_lock_info', None) and token.liquidity_lock_info.is_renewable or False,
                         "lock_owner": getattr(token, 'liquidity_lock_info', None) and token.liquidity_lock_info.lock_owner or "",
-                        "lock_score": getattr(token, 'liquidity_lock_score', 0),
-                        "safety_level": "HIGH" if getattr(token, 'liquidity_lock_score', 0) >= 80 else "MEDIUM" if getattr(token, 'liquidity_lock_score', 0) >= 50 else "LOW",
+                        "lock_score": token.liquidity_lock_score or 0,
+                        "safety_level": "HIGH" if (token.liquidity_lock_score or 0) >= 80 else "MEDIUM" if (token.liquidity_lock_score or 0) >= 50 else "LOW",
                         "warnings": getattr(token, 'liquidity_lock_info', None) and token.liquidity_lock_info.warnings or []
                     },
                     "security_analysis": {
@@ -1833,7 +2608,7 @@ class TokenAnalyzer:
                         "security_issues": getattr(token, 'security_issues', []),
                         "security_level": "LOW" if getattr(token, 'security_score', 1.0) <= 0.4 else "MEDIUM" if getattr(token, 'security_score', 1.0) <= 0.6 else "HIGH" if getattr(token, 'security_score', 1.0) <= 0.8 else "CRITICAL",
                         "security_recommendations": self.get_security_recommendations(token),
-                        "external_checks": getattr(token, 'security_report', {}).external_checks if hasattr(token, 'security_report') and token.security_report else {}
+                        "external_checks": token.security_report.external_checks if token.security_report else {}
                     }
                 }
                 
@@ -1854,7 +2629,7 @@ class TokenAnalyzer:
         """Генерирует рекомендации по безопасности для токена"""
         recommendations = []
         
-        if hasattr(token, 'security_score'):
+        if token.security_score is not None:
             # Рекомендации на основе security score
             if token.security_score >= 0.8:
                 recommendations.append("🚨 КРИТИЧЕСКИЙ РИСК - НЕ РЕКОМЕНДУЕТСЯ К ИНВЕСТИРОВАНИЮ")
@@ -1866,19 +2641,19 @@ class TokenAnalyzer:
                 recommendations.append("🟢 НИЗКИЙ РИСК - ОТНОСИТЕЛЬНО БЕЗОПАСЕН")
             
             # Специфические рекомендации
-            if hasattr(token, 'contract_verified') and not token.contract_verified:
+            if token.contract_verified is not None and not token.contract_verified:
                 recommendations.append("⚠️ Контракт не верифицирован - проверьте исходный код")
             
-            if hasattr(token, 'ownership_renounced') and not token.ownership_renounced:
+            if token.ownership_renounced is not None and not token.ownership_renounced:
                 recommendations.append("⚠️ Владелец не ренонсирован - риск централизации")
             
-            if hasattr(token, 'liquidity_locked') and not token.liquidity_locked:
+            if token.liquidity_locked is not None and not token.liquidity_locked:
                 recommendations.append("⚠️ Ликвидность не заблокирована - риск rug pull")
             
-            if hasattr(token, 'honeypot_probability') and token.honeypot_probability > 0.5:
+            if token.honeypot_probability > 0.5:
                 recommendations.append("🚨 Высокая вероятность honeypot - НЕ ПОКУПАТЬ")
             
-            if hasattr(token, 'security_issues') and token.security_issues:
+            if token.security_issues:
                 for issue in token.security_issues[:3]:  # Первые 3 проблемы
                     recommendations.append(f"⚠️ {issue}")
         
@@ -1996,7 +2771,7 @@ class TokenAnalyzer:
         }
         
         for token in tokens:
-            if hasattr(token, 'security_score') and token.security_score is not None:
+            if token.security_score is not None:
                 stats['analyzed'] += 1
                 
                 if token.security_score >= 0.8:
@@ -2049,13 +2824,13 @@ class TokenAnalyzer:
         info += f"   Security Score: {token.security_score:.3f} ({risk_level})\n"
         
         # Информация о безопасности
-        if hasattr(token, 'contract_verified'):
+        if token.contract_verified is not None:
             info += f"   Контракт верифицирован: {'✅' if token.contract_verified else '❌'}\n"
-        if hasattr(token, 'ownership_renounced'):
+        if token.ownership_renounced is not None:
             info += f"   Владелец ренонсирован: {'✅' if token.ownership_renounced else '❌'}\n"
-        if hasattr(token, 'liquidity_locked'):
+        if token.liquidity_locked is not None:
             info += f"   Ликвидность заблокирована: {'✅' if token.liquidity_locked else '❌'}\n"
-        if hasattr(token, 'honeypot_probability'):
+        if token.honeypot_probability is not None:
             info += f"   Вероятность honeypot: {token.honeypot_probability:.1%}\n"
         
         # Проблемы безопасности
@@ -2081,7 +2856,7 @@ class TokenAnalyzer:
         issues_count = {}
         
         for token in tokens:
-            if hasattr(token, 'security_issues') and token.security_issues:
+            if token.security_issues:
                 for issue in token.security_issues:
                     # Категоризация проблем
                     if 'не верифицирован' in issue.lower():
@@ -2101,6 +2876,263 @@ class TokenAnalyzer:
         
         return dict(sorted(issues_count.items(), key=lambda x: x[1], reverse=True))
     
+    # Порядок категорий в отчетах и их эмодзи
+    _RISK_EMOJIS = {"Скам": "🚨", "Высокий": "🔴", "Средний": "🟡", "Умеренный": "🟠", "Низкий": "🟢"}
+    
+    def _write_unified_header(self, f, tokens_list: List[Token]) -> None:
+        """Заголовок и статистика объединенного отчета"""
+        # Заголовок отчета
+        f.write("=" * 100 + "\n")
+        f.write(" " * 25 + "ОБЪЕДИНЕННЫЙ ОТЧЕТ: АНАЛИЗ ТОКЕНОВ И БЕЗОПАСНОСТЬ" + " " * 25 + "\n")
+        f.write("=" * 100 + "\n\n")
+
+        # Счетчики уровней риска и сетей (Counter считает в C), доля в процентах - умножением
+        total = len(tokens_list)
+        inv_total = 100.0 / total if total else 0.0
+        level_counts = Counter(t.risk_level for t in tokens_list)
+        networks = Counter(t.network for t in tokens_list)
+
+        # Основная информация
+        f.write("📊 ОСНОВНАЯ ИНФОРМАЦИЯ\n")
+        f.write("=" * 100 + "\n")
+        f.write(f"📅 Дата и время: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"🔍 Всего токенов: {total}\n")
+        f.write(f"🔒 Токенов для анализа безопасности: {total - level_counts['Скам']}\n\n")
+
+        # Общая статистика
+        f.write("📈 ОБЩАЯ СТАТИСТИКА\n")
+        f.write("=" * 100 + "\n")
+
+        # Распределение по рискам
+        risk_levels = {level: level_counts[level] for level in self._REPORT_LEVEL_ORDER}
+        for level, count in level_counts.items():
+            risk_levels.setdefault(level, count)
+        security_stats = {"Безопасные": 0, "С проблемами": 0, "Критический риск": 0}
+
+        for token in tokens_list:
+            # Статистика безопасности
+            if token.security_score is not None:
+                if token.security_score >= 0.8:
+                    security_stats["Критический риск"] += 1
+                elif token.security_score >= 0.6:
+                    security_stats["С проблемами"] += 1
+                else:
+                    security_stats["Безопасные"] += 1
+
+        f.write("🎯 Распределение по уровням риска:\n")
+        f.write("┌────────────────┬──────────┬──────────┬─────────────┐\n")
+        f.write("│ Уровень риска  │Количество│ Процент  │ Эмодзи      │\n")
+        f.write("├────────────────┼──────────┼──────────┼─────────────┤\n")
+        for level, count in risk_levels.items():
+            percentage = count * inv_total
+            emoji = self._RISK_EMOJIS.get(level, "❓")
+            f.write(f"│ {level:14} │ {count:8} │ {percentage:7.1f}% │ {emoji:10} │\n")
+        f.write("└────────────────┴──────────┴──────────┴─────────────┘\n\n")
+
+        f.write("🌐 Распределение по сетям:\n")
+        f.write("┌────────────────┬──────────┬──────────┐\n")
+        f.write("│ Сеть           │Количество│ Процент  │\n")
+        f.write("├────────────────┼──────────┼──────────┤\n")
+        for network, count in sorted(networks.items()):
+            percentage = count * inv_total
+            f.write(f"│ {network:14} │ {count:8} │ {percentage:7.1f}% │\n")
+        f.write("└────────────────┴──────────┴──────────┘\n\n")
+
+        # Статистика безопасности
+        if any(t.security_score is not None for t in tokens_list):
+            f.write("🔒 СТАТИСТИКА БЕЗОПАСНОСТИ\n")
+            f.write("=" * 100 + "\n")
+            f.write("┌──────────────────┬──────────┬──────────┐\n")
+            f.write("│ Категория        │Количество│ Процент  │\n")
+            f.write("├──────────────────┼──────────┼──────────┤\n")
+            security_tokens = [t for t in tokens_list if t.security_score is not None]
+            for category, count in security_stats.items():
+                percentage = (count / len(security_tokens)) * 100 if security_tokens else 0
+                f.write(f"│ {category:18} │ {count:8} │ {percentage:7.1f}% │\n")
+            f.write("└──────────────────┴──────────┴──────────┘\n\n")
+
+        # Детальный анализ по категориям риска
+        f.write("🔍 ДЕТАЛЬНЫЙ АНАЛИЗ ПО КАТЕГОРИЯМ\n")
+        f.write("=" * 100 + "\n\n")
+    
+    def _iter_formatted_tokens(self, tokens_list: List[Token], with_rows: bool = True,
+                               with_security: bool = False):
+        """Один проход по токенам в порядке объединенного отчета: (строка CSV, блок отчета)"""
+        groups = self._risk_level_groups(tokens_list)
+        for risk_level in self._RISK_EMOJIS:
+            level_tokens = groups.get(risk_level)
+            if not level_tokens:
+                continue
+            
+            emoji = self._RISK_EMOJIS.get(risk_level, "❓")
+            # Заголовок категории уходит в отчет вместе с первым токеном
+            parts = [f"{emoji} ТОКЕНЫ С УРОВНЕМ РИСКА: {risk_level.upper()}\n",
+                     "─" * 100 + "\n",
+                     f"📊 Количество: {len(level_tokens)}\n\n"]
+            
+            for i, token in enumerate(level_tokens, 1):
+                w = parts.append
+                w(f"{i}. {token.symbol} ({token.network})\n")
+                w("   " + "─" * 80 + "\n")
+                # Дополнительные идентификаторы
+                w(f"   Адрес: {token.address}\n")
+                w(f"   Сеть: {token.network}\n")
+
+                # Основная информация
+                w(f"   💰 Цена: ${token.price_usd:.6f} | {token.price_native:.8f} {token.network.upper()}\n")
+                w(f"   📈 Рост: 1ч: {token.price_change_1h:+.1f}% | 6ч: {token.price_change_6h:+.1f}% | 24ч: {token.price_change_24h:+.1f}%\n")
+                w(f"   💎 Ликвидность: ${token.liquidity_usd:,.0f} | Объем 24ч: ${token.volume_24h:,.0f}\n")
+                w(f"   Объем 6ч: ${token.volume_6h:,.0f}\n")
+                w(f"   Объем 1ч: ${token.volume_1h:,.0f}\n")
+                w(f"   Покупки 24ч: {token.buys_24h}\n")
+                w(f"   Продажи 24ч: {token.sells_24h}\n")
+                w(f"   📊 FDV: ${token.fdv:,.0f} | Market Cap: ${token.market_cap:,.0f}\n")
+                w(f"   ⏰ Возраст: {token.format_age()} | Risk Score: {token.risk_score}\n")
+
+                # Информация о безопасности
+                if token.security_score is not None:
+                    w(f"   🔒 Безопасность: {token.security_score:.3f}\n")
+
+                    # Статусы безопасности
+                    security_status = []
+                    if token.contract_verified is not None:
+                        security_status.append(f"Контракт: {'✅' if token.contract_verified else '❌'}")
+                    if token.ownership_renounced is not None:
+                        security_status.append(f"Владелец: {'✅' if token.ownership_renounced else '❌'}")
+                    if token.liquidity_locked is not None:
+                        security_status.append(f"Ликвидность: {'✅' if token.liquidity_locked else '❌'}")
+                    if token.honeypot_probability is not None:
+                        security_status.append(f"Honeypot: {token.honeypot_probability:.1%}")
+
+                    if security_status:
+                        w("   🛡️  Статусы безопасности:\n")
+                        for item in security_status:
+                            w(f"     - {item}\n")
+                        # Детали блокировки ликвидности (если есть успешная блокировка)
+                        if token.liquidity_lock_info:
+                            lock_info = token.liquidity_lock_info
+                            if getattr(lock_info, 'is_locked', False):
+                                unlock_str = ''
+                                try:
+                                    if getattr(lock_info, 'unlock_date', None):
+                                        unlock_str = f", до {lock_info.unlock_date.strftime('%Y-%m-%d')}"
+                                except Exception:
+                                    pass
+                                w(
+                                    f"   🔒 Блокировка ликвидности: {lock_info.locked_percentage:.1f}% на {lock_info.lock_duration_days} дней ({lock_info.platform}{unlock_str})\n"
+                                )
+                                # Предупреждения/заметки по блокировке (если есть)
+                                try:
+                                    warnings_list = getattr(lock_info, 'warnings', []) or []
+                                    if warnings_list:
+                                        w("   🔎 Примечания по блокировке:\n")
+                                        for note in warnings_list[:3]:
+                                            w(f"      • {note}\n")
+                                except Exception:
+                                    pass
+
+                    # Блок 1inch удален
+
+                # Проблемы безопасности
+                if token.security_issues:
+                    w(f"   🚨 Проблемы безопасности:\n")
+                    for issue in token.security_issues[:3]:  # Показываем первые 3
+                        w(f"      • {issue}\n")
+
+                # Факторы риска
+                if token.risk_factors:
+                    w(f"   ⚠️  Факторы риска:\n")
+                    for factor in token.risk_factors[:3]:  # Показываем первые 3
+                        w(f"      • {factor}\n")
+
+                # Рекомендации по безопасности (кратко)
+                try:
+                    recommendations = self.get_security_recommendations(token)
+                except Exception:
+                    recommendations = []
+                if recommendations:
+                    w(f"   ✅ Рекомендации:\n")
+                    for rec in recommendations[:3]:
+                        w(f"      • {rec}\n")
+
+                # Сайты и социальные сети
+                websites = token.info.get("websites", [])
+                socials = token.info.get("socials", [])
+
+                if websites or socials:
+                    w(f"   🌐 Информация:\n")
+                    if websites:
+                        for website in websites[:2]:  # Показываем первые 2
+                            if isinstance(website, dict):
+                                url = website.get('url', '')
+                                w(f"      • Сайт: {url}\n")
+                            else:
+                                w(f"      • Сайт: {website}\n")
+
+                    if socials:
+                        for social in socials[:2]:  # Показываем первые 2
+                            if isinstance(social, dict):
+                                url = social.get('url', '')
+                                w(f"      • Соцсеть: {url}\n")
+                            else:
+                                w(f"      • Соцсеть: {social}\n")
+
+                # Универсальные проверки (бесплатные источники)
+                try:
+                    external_checks = token.security_report.external_checks if token.security_report else {}
+                except Exception:
+                    external_checks = {}
+                utc = (external_checks or {}).get('universal_checks') or {}
+                if utc:
+                    srcs = utc.get('sources', [])
+                    trust = utc.get('trust_level')
+                    w("   🌐 Универсальные проверки:\n")
+                    if srcs:
+                        w(f"      • Источники: {', '.join(srcs)}\n")
+                    if trust:
+                        w(f"      • Уровень доверия: {trust}\n")
+                    cg = utc.get('coingecko') or {}
+                    if cg.get('found'):
+                        w(f"      • CoinGecko: {cg.get('name','')} ({cg.get('symbol','')})\n")
+                    uni = utc.get('uniswap') or {}
+                    if uni.get('found'):
+                        tvl = ((uni.get('info') or {}).get('totalValueLockedUSD'))
+                        if tvl is not None:
+                            w(f"      • Uniswap v3: TVL ${float(tvl):,.0f}\n")
+                    jup = utc.get('jupiter') or {}
+                    if jup.get('found'):
+                        w("      • Jupiter (Solana): найден/strict\n")
+
+                # Ссылки
+                w(f"   🔗 Ссылки:\n")
+                w(f"      • DexScreener: {token.get_dexscreener_url()}\n")
+                w(f"      • Explorer: {token.get_explorer_url()}\n")
+                w(f"      • DEX: {token.get_dex_url()}\n")
+
+                w("\n")
+                yield (token.to_csv_row(with_security) if with_rows else None), "".join(parts)
+                parts = []
+    
+    def _write_unified_footer(self, f) -> None:
+        """Общие рекомендации в конце объединенного отчета"""
+        # Рекомендации
+        f.write("💡 РЕКОМЕНДАЦИИ\n")
+        f.write("=" * 100 + "\n")
+        f.write("🔍 Всегда проверяйте:\n")
+        f.write("   • Верификацию контракта\n")
+        f.write("   • Ренонс владельца или использование multisig/timelock\n")
+        f.write("   • Блокировку ликвидности на длительный срок\n")
+        f.write("   • Наличие honeypot признаков\n")
+        f.write("   • Распределение токенов между держателями\n")
+        # Ранее здесь выводился статус токена в 1inch — удалено
+
+        f.write("⚠️  Избегайте токенов с:\n")
+        f.write("   • Аномальным ростом цены (>200%) за короткий период\n")
+        f.write("   • Высоким соотношением объема к ликвидности (>50)\n")
+        f.write("   • Отсутствием сайта и социальных сетей\n")
+        f.write("   • Возрастом < 24 часов\n")
+        f.write("   • Низкой ликвидностью (<$25,000)\n")
+    
     def generate_unified_report(self, file_path: str, tokens_list: Optional[List[Token]] = None) -> bool:
         """Генерирует объединенный отчет с безопасностью и без дублирования"""
         if tokens_list is None:
@@ -2109,257 +3141,40 @@ class TokenAnalyzer:
         self.logger.info(f"Генерация объединенного отчета: {file_path}")
         
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                # Заголовок отчета
-                f.write("=" * 100 + "\n")
-                f.write(" " * 25 + "ОБЪЕДИНЕННЫЙ ОТЧЕТ: АНАЛИЗ ТОКЕНОВ И БЕЗОПАСНОСТЬ" + " " * 25 + "\n")
-                f.write("=" * 100 + "\n\n")
-                
-                # Основная информация
-                f.write("📊 ОСНОВНАЯ ИНФОРМАЦИЯ\n")
-                f.write("=" * 100 + "\n")
-                f.write(f"📅 Дата и время: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"🔍 Всего токенов: {len(tokens_list)}\n")
-                f.write(f"🔒 Токенов для анализа безопасности: {len([t for t in tokens_list if t.risk_level != 'Скам'])}\n\n")
-                
-                # Общая статистика
-                f.write("📈 ОБЩАЯ СТАТИСТИКА\n")
-                f.write("=" * 100 + "\n")
-                
-                # Распределение по рискам
-                risk_levels = {"Скам": 0, "Высокий": 0, "Средний": 0, "Умеренный": 0, "Низкий": 0}
-                networks = {}
-                security_stats = {"Безопасные": 0, "С проблемами": 0, "Критический риск": 0}
-                
-                for token in tokens_list:
-                    risk_levels[token.risk_level] = risk_levels.get(token.risk_level, 0) + 1
-                    networks[token.network] = networks.get(token.network, 0) + 1
-                    
-                    # Статистика безопасности
-                    if hasattr(token, 'security_score'):
-                        if token.security_score >= 0.8:
-                            security_stats["Критический риск"] += 1
-                        elif token.security_score >= 0.6:
-                            security_stats["С проблемами"] += 1
-                        else:
-                            security_stats["Безопасные"] += 1
-                
-                f.write("🎯 Распределение по уровням риска:\n")
-                f.write("┌────────────────┬──────────┬──────────┬─────────────┐\n")
-                f.write("│ Уровень риска  │Количество│ Процент  │ Эмодзи      │\n")
-                f.write("├────────────────┼──────────┼──────────┼─────────────┤\n")
-                risk_emojis = {"Скам": "🚨", "Высокий": "🔴", "Средний": "🟡", "Умеренный": "🟠", "Низкий": "🟢"}
-                for level, count in risk_levels.items():
-                    percentage = (count / len(tokens_list)) * 100 if tokens_list else 0
-                    emoji = risk_emojis.get(level, "❓")
-                    f.write(f"│ {level:14} │ {count:8} │ {percentage:7.1f}% │ {emoji:10} │\n")
-                f.write("└────────────────┴──────────┴──────────┴─────────────┘\n\n")
-                
-                f.write("🌐 Распределение по сетям:\n")
-                f.write("┌────────────────┬──────────┬──────────┐\n")
-                f.write("│ Сеть           │Количество│ Процент  │\n")
-                f.write("├────────────────┼──────────┼──────────┤\n")
-                for network, count in sorted(networks.items()):
-                    percentage = (count / len(tokens_list)) * 100 if tokens_list else 0
-                    f.write(f"│ {network:14} │ {count:8} │ {percentage:7.1f}% │\n")
-                f.write("└────────────────┴──────────┴──────────┘\n\n")
-                
-                # Статистика безопасности
-                if any(hasattr(t, 'security_score') for t in tokens_list):
-                    f.write("🔒 СТАТИСТИКА БЕЗОПАСНОСТИ\n")
-                    f.write("=" * 100 + "\n")
-                    f.write("┌──────────────────┬──────────┬──────────┐\n")
-                    f.write("│ Категория        │Количество│ Процент  │\n")
-                    f.write("├──────────────────┼──────────┼──────────┤\n")
-                    security_tokens = [t for t in tokens_list if hasattr(t, 'security_score')]
-                    for category, count in security_stats.items():
-                        percentage = (count / len(security_tokens)) * 100 if security_tokens else 0
-                        f.write(f"│ {category:18} │ {count:8} │ {percentage:7.1f}% │\n")
-                    f.write("└──────────────────┴──────────┴──────────┘\n\n")
-                
-                # Детальный анализ по категориям риска
-                f.write("🔍 ДЕТАЛЬНЫЙ АНАЛИЗ ПО КАТЕГОРИЯМ\n")
-                f.write("=" * 100 + "\n\n")
-                
-                for risk_level in ["Скам", "Высокий", "Средний", "Умеренный", "Низкий"]:
-                    level_tokens = [t for t in tokens_list if t.risk_level == risk_level]
-                    if not level_tokens:
-                        continue
-                    
-                    emoji = risk_emojis.get(risk_level, "❓")
-                    f.write(f"{emoji} ТОКЕНЫ С УРОВНЕМ РИСКА: {risk_level.upper()}\n")
-                    f.write("─" * 100 + "\n")
-                    f.write(f"📊 Количество: {len(level_tokens)}\n\n")
-                    
-                    # Сортировка токенов по убыванию риск-скора
-                    level_tokens.sort(key=lambda x: x.risk_score, reverse=True)
-                    
-                    for i, token in enumerate(level_tokens, 1):
-                        f.write(f"{i}. {token.symbol} ({token.network})\n")
-                        f.write("   " + "─" * 80 + "\n")
-                        # Дополнительные идентификаторы
-                        if hasattr(token, 'address'):
-                            f.write(f"   Адрес: {token.address}\n")
-                        if hasattr(token, 'network'):
-                            f.write(f"   Сеть: {token.network}\n")
-                        
-                        # Основная информация
-                        f.write(f"   💰 Цена: ${token.price_usd:.6f} | {token.price_native:.8f} {token.network.upper()}\n")
-                        f.write(f"   📈 Рост: 1ч: {token.price_change_1h:+.1f}% | 6ч: {token.price_change_6h:+.1f}% | 24ч: {token.price_change_24h:+.1f}%\n")
-                        f.write(f"   💎 Ликвидность: ${token.liquidity_usd:,.0f} | Объем 24ч: ${token.volume_24h:,.0f}\n")
-                        if hasattr(token, 'volume_6h'):
-                            f.write(f"   Объем 6ч: ${token.volume_6h:,.0f}\n")
-                        if hasattr(token, 'volume_1h'):
-                            f.write(f"   Объем 1ч: ${token.volume_1h:,.0f}\n")
-                        if hasattr(token, 'buys_24h'):
-                            f.write(f"   Покупки 24ч: {token.buys_24h}\n")
-                        if hasattr(token, 'sells_24h'):
-                            f.write(f"   Продажи 24ч: {token.sells_24h}\n")
-                        f.write(f"   📊 FDV: ${token.fdv:,.0f} | Market Cap: ${token.market_cap:,.0f}\n")
-                        f.write(f"   ⏰ Возраст: {token.format_age()} | Risk Score: {token.risk_score}\n")
-                        
-                        # Информация о безопасности
-                        if hasattr(token, 'security_score'):
-                            f.write(f"   🔒 Безопасность: {token.security_score:.3f}\n")
-                            
-                            # Статусы безопасности
-                            security_status = []
-                            if hasattr(token, 'contract_verified'):
-                                security_status.append(f"Контракт: {'✅' if token.contract_verified else '❌'}")
-                            if hasattr(token, 'ownership_renounced'):
-                                security_status.append(f"Владелец: {'✅' if token.ownership_renounced else '❌'}")
-                            if hasattr(token, 'liquidity_locked'):
-                                security_status.append(f"Ликвидность: {'✅' if token.liquidity_locked else '❌'}")
-                            if hasattr(token, 'honeypot_probability'):
-                                security_status.append(f"Honeypot: {token.honeypot_probability:.1%}")
-                            
-                            if security_status:
-                                f.write("   🛡️  Статусы безопасности:\n")
-                                for item in security_status:
-                                    f.write(f"     - {item}\n")
-                                # Детали блокировки ликвидности (если есть успешная блокировка)
-                                if hasattr(token, 'liquidity_lock_info') and token.liquidity_lock_info:
-                                    lock_info = token.liquidity_lock_info
-                                    if getattr(lock_info, 'is_locked', False):
-                                        unlock_str = ''
-                                        try:
-                                            if getattr(lock_info, 'unlock_date', None):
-                                                unlock_str = f", до {lock_info.unlock_date.strftime('%Y-%m-%d')}"
-                                        except Exception:
-                                            pass
-                                        f.write(
-                                            f"   🔒 Блокировка ликвидности: {lock_info.locked_percentage:.1f}% на {lock_info.lock_duration_days} дней ({lock_info.platform}{unlock_str})\n"
-                                        )
-                                        # Предупреждения/заметки по блокировке (если есть)
-                                        try:
-                                            warnings_list = getattr(lock_info, 'warnings', []) or []
-                                            if warnings_list:
-                                                f.write("   🔎 Примечания по блокировке:\n")
-                                                for w in warnings_list[:3]:
-                                                    f.write(f"      • {w}\n")
-                                        except Exception:
-                                            pass
-                            
-                            # Блок 1inch удален
-                        
-                        # Проблемы безопасности
-                        if hasattr(token, 'security_issues') and token.security_issues:
-                            f.write(f"   🚨 Проблемы безопасности:\n")
-                            for issue in token.security_issues[:3]:  # Показываем первые 3
-                                f.write(f"      • {issue}\n")
-                        
-                        # Факторы риска
-                        if token.risk_factors:
-                            f.write(f"   ⚠️  Факторы риска:\n")
-                            for factor in token.risk_factors[:3]:  # Показываем первые 3
-                                f.write(f"      • {factor}\n")
-                        
-                        # Рекомендации по безопасности (кратко)
-                        try:
-                            recommendations = self.get_security_recommendations(token)
-                        except Exception:
-                            recommendations = []
-                        if recommendations:
-                            f.write(f"   ✅ Рекомендации:\n")
-                            for rec in recommendations[:3]:
-                                f.write(f"      • {rec}\n")
-                        
-                        # Сайты и социальные сети
-                        websites = token.info.get("websites", [])
-                        socials = token.info.get("socials", [])
-                        
-                        if websites or socials:
-                            f.write(f"   🌐 Информация:\n")
-                            if websites:
-                                for website in websites[:2]:  # Показываем первые 2
-                                    if isinstance(website, dict):
-                                        url = website.get('url', '')
-                                        f.write(f"      • Сайт: {url}\n")
-                                    else:
-                                        f.write(f"      • Сайт: {website}\n")
-                            
-                            if socials:
-                                for social in socials[:2]:  # Показываем первые 2
-                                    if isinstance(social, dict):
-                                        url = social.get('url', '')
-                                        f.write(f"      • Соцсеть: {url}\n")
-                                    else:
-                                        f.write(f"      • Соцсеть: {social}\n")
-                        
-                        # Универсальные проверки (бесплатные источники)
-                        try:
-                            external_checks = getattr(token, 'security_report', {}).external_checks if hasattr(token, 'security_report') and token.security_report else {}
-                        except Exception:
-                            external_checks = {}
-                        utc = (external_checks or {}).get('universal_checks') or {}
-                        if utc:
-                            srcs = utc.get('sources', [])
-                            trust = utc.get('trust_level')
-                            f.write("   🌐 Универсальные проверки:\n")
-                            if srcs:
-                                f.write(f"      • Источники: {', '.join(srcs)}\n")
-                            if trust:
-                                f.write(f"      • Уровень доверия: {trust}\n")
-                            cg = utc.get('coingecko') or {}
-                            if cg.get('found'):
-                                f.write(f"      • CoinGecko: {cg.get('name','')} ({cg.get('symbol','')})\n")
-                            uni = utc.get('uniswap') or {}
-                            if uni.get('found'):
-                                tvl = ((uni.get('info') or {}).get('totalValueLockedUSD'))
-                                if tvl is not None:
-                                    f.write(f"      • Uniswap v3: TVL ${float(tvl):,.0f}\n")
-                            jup = utc.get('jupiter') or {}
-                            if jup.get('found'):
-                                f.write("      • Jupiter (Solana): найден/strict\n")
-
-                        # Ссылки
-                        f.write(f"   🔗 Ссылки:\n")
-                        f.write(f"      • DexScreener: {token.get_dexscreener_url()}\n")
-                        f.write(f"      • Explorer: {token.get_explorer_url()}\n")
-                        f.write(f"      • DEX: {token.get_dex_url()}\n")
-                        
-                        f.write("\n")
-                
-                # Рекомендации
-                f.write("💡 РЕКОМЕНДАЦИИ\n")
-                f.write("=" * 100 + "\n")
-                f.write("🔍 Всегда проверяйте:\n")
-                f.write("   • Верификацию контракта\n")
-                f.write("   • Ренонс владельца или использование multisig/timelock\n")
-                f.write("   • Блокировку ликвидности на длительный срок\n")
-                f.write("   • Наличие honeypot признаков\n")
-                f.write("   • Распределение токенов между держателями\n")
-                # Ранее здесь выводился статус токена в 1inch — удалено
-                
-                f.write("⚠️  Избегайте токенов с:\n")
-                f.write("   • Аномальным ростом цены (>200%) за короткий период\n")
-                f.write("   • Высоким соотношением объема к ликвидности (>50)\n")
-                f.write("   • Отсутствием сайта и социальных сетей\n")
-                f.write("   • Возрастом < 24 часов\n")
-                f.write("   • Низкой ликвидностью (<$25,000)\n")
-                
+            with open(file_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                self._write_unified_header(f, tokens_list)
+                for _, report_text in self._iter_formatted_tokens(tokens_list, with_rows=False):
+                    f.write(report_text)
+                self._write_unified_footer(f)
                 return True
                 
         except Exception as e:
             self.logger.error(f"Ошибка генерации объединенного отчета: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    def generate_unified_report_and_csv(self, report_path: str, csv_path: str,
+                                        tokens_list: Optional[List[Token]] = None) -> bool:
+        """Объединенный отчет и CSV-экспорт за один проход по токенам"""
+        if tokens_list is None:
+            tokens_list = self.filtered_tokens if self.filtered_tokens else self.tokens
+        
+        self.logger.info(f"Генерация объединенного отчета {report_path} и CSV {csv_path}")
+        try:
+            with_security = self._csv_with_security(tokens_list)
+            
+            with open(report_path, 'w', encoding='utf-8', buffering=1 << 20) as report_f, \
+                    open(csv_path, 'w', encoding='utf-8', newline='', buffering=1 << 20) as csv_f:
+                csv_writer = csv.writer(csv_f)
+                csv_writer.writerow(self._csv_fieldnames(with_security))
+                self._write_unified_header(report_f, tokens_list)
+                for csv_row, report_text in self._iter_formatted_tokens(tokens_list, with_security=with_security):
+                    csv_writer.writerow(csv_row)
+                    report_f.write(report_text)
+                self._write_unified_footer(report_f)
+            
+            self.logger.info(f"Экспорт в CSV успешно завершен")
+            return True
+        except Exception as e:
+            error_msg = f"Ошибка при генерации отчета и CSV: {str(e)}"
+            self.logger.error(error_msg)
+            raise Exception(error_msg)
@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from main import load_cached_analysis, save_cached_analysis
+
+
+def _make_raket(tokens):
+    return SimpleNamespace(tokens=tokens, scam_tokens=[], high_risk_tokens=[],
+                           medium_risk_tokens=[], low_risk_tokens=list(tokens))
+
+
+def test_fresh_cache_is_loaded(tmp_path):
+    cache_path = tmp_path / 'analysis.pkl'
+    save_cached_analysis(_make_raket(['a', 'b']), cache_path)
+
+    raket = _make_raket([])
+    assert load_cached_analysis(raket, cache_path, ttl=60)
+    assert raket.tokens == ['a', 'b']
+
+
+def test_stale_cache_is_ignored_and_removed(tmp_path):
+    cache_path = tmp_path / 'analysis.pkl'
+    save_cached_analysis(_make_raket(['a']), cache_path)
+    old = time.time() - 120
+    os.utime(cache_path, (old, old))
+
+    raket = _make_raket([])
+    assert not load_cached_analysis(raket, cache_path, ttl=60)
+    assert raket.tokens == []
+    assert not cache_path.exists()
+
+
+def test_zero_ttl_disables_cache(tmp_path):
+    cache_path = tmp_path / 'analysis.pkl'
+    save_cached_analysis(_make_raket(['a']), cache_path)
+    assert not load_cached_analysis(_make_raket([]), cache_path, ttl=0)
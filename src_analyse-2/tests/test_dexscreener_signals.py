@@ -0,0 +1,93 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api.dexscreener import DexScreenerAPI
+
+NOW_TS = 1_700_000_000.0
+
+
+def _random_pair(rng):
+    """Пара DexScreener со случайными (в т.ч. пустыми) полями"""
+    pair = {
+        'chainId': rng.choice(['ethereum', 'solana', 'bsc']),
+        'pairAddress': f"0x{rng.getrandbits(64):016x}",
+        'dexId': rng.choice(['uniswap', 'raydium', 'unknowndex', '', None]),
+        'liquidity': {'usd': rng.choice([0, None, rng.uniform(0, 500_000)])},
+        'volume': {'h24': rng.choice([0, rng.uniform(0, 2_000_000)])},
+        'priceChange': {'h1': rng.uniform(-50, 50), 'h6': rng.uniform(-80, 200), 'h24': rng.uniform(-90, 900)},
+        'txns': {'h24': {'buys': rng.randint(0, 500), 'sells': rng.randint(0, 500)}},
+        'info': {'websites': [{'url': 'https://x'}] if rng.random() < 0.5 else [],
+                 'socials': [{'url': 'https://t'}] if rng.random() < 0.5 else []},
+    }
+    if rng.random() < 0.9:
+        pair['pairCreatedAt'] = int((NOW_TS - rng.uniform(0, 90 * 24 * 3600)) * 1000)
+    return pair
+
+
+def _reference_scores(pair):
+    """Исходная скалярная формула скоров derive_signals_from_pair"""
+    liq = float((pair.get('liquidity') or {}).get('usd') or 0)
+    vol = float((pair.get('volume') or {}).get('h24') or 0)
+    created = pair.get('pairCreatedAt') or 0
+    age = round((NOW_TS - created / 1000) / 3600, 2) if created else None
+    dex_id = (pair.get('dexId') or '').lower()
+    ratio = vol / liq if liq > 0 else 0.0
+    info = pair.get('info') or {}
+    return age, {
+        'dex_trust': 1.0 if dex_id in {'uniswap', 'raydium'} else 0.6 if dex_id else 0.5,
+        'liquidity_score': min(1.0, liq / 100000.0),
+        'volume_score': min(1.0, vol / 50000.0),
+        'stability_score': max(0.0, min(1.0, 1.0 - abs(ratio - 1.0) / 3.0)),
+        'age_score': 0.0 if age is None else max(0.0, min(1.0, age / (30 * 24))),
+        'metadata_score': min(1.0, bool(info.get('websites')) + bool(info.get('socials'))),
+    }
+
+
+def test_batch_matches_scalar_signals():
+    rng = random.Random(42)
+    api = DexScreenerAPI()
+    pairs = [_random_pair(rng) for _ in range(500)]
+
+    batch = api.derive_signals_batch(pairs, NOW_TS)
+    for i, pair in enumerate(pairs):
+        signals = api.derive_signals_from_pair(pair, NOW_TS)
+        age, expected_scores = _reference_scores(pair)
+
+        if age is None:
+            assert signals['metrics']['age_hours'] is None
+        else:
+            assert signals['metrics']['age_hours'] == pytest.approx(age)
+        for key, expected in expected_scores.items():
+            assert signals['scores'][key] == pytest.approx(expected)
+            assert batch[key][i] == pytest.approx(expected)
+        for key in ('liquidity_usd', 'volume_24h', 'price_change_h24', 'vol_liq_ratio'):
+            assert batch[key][i] == pytest.approx(signals['metrics'][key])
+
+
+def test_age_hours_rounded_to_two_decimals():
+    api = DexScreenerAPI()
+    pair = {'pairCreatedAt': int((NOW_TS - 12345.678) * 1000)}
+    batch = api.derive_signals_batch([pair], NOW_TS)
+    assert batch['age_hours'][0] == pytest.approx(round(12345.678 / 3600, 2))
+    assert api.derive_signals_from_pair(pair, NOW_TS)['metrics']['age_hours'] == pytest.approx(round(12345.678 / 3600, 2))
+
+
+def test_pairs_driver_reads_clock_once(monkeypatch):
+    rng = random.Random(7)
+    api = DexScreenerAPI()
+    pairs = [_random_pair(rng) for _ in range(50)] + [None]
+
+    calls = []
+    monkeypatch.setattr('api.dexscreener.time.time', lambda: calls.append(1) or NOW_TS)
+    results = api.derive_signals_from_pairs(pairs)
+
+    assert len(calls) == 1
+    assert results[-1]['found'] is False
+    for pair, signals in zip(pairs, results):
+        if pair:
+            assert signals == api.derive_signals_from_pair(pair, NOW_TS)
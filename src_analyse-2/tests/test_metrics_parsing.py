@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from token_analyzer import Token, _METRIC_ATTRS, _batch_metrics
+
+NOW_MS = 1_700_000_000_000.0
+
+RAW_TOKENS = [
+    {'priceUsd': '1', 'liquidity': {'usd': 250000}, 'txns': {'h24': {'buys': 10, 'sells': '4'}},
+     'pairCreatedAt': NOW_MS - 7200 * 1000},
+    {'priceUsd': '0.5', 'liquidity': {'usd': None}, 'volume': {'h24': 'n/a'}},
+    {'marketCap': 1000000, 'priceChange': {'h24': -12.5}},
+]
+
+
+@pytest.mark.parametrize('index', range(len(RAW_TOKENS)))
+def test_batch_and_stream_loaders_agree(index):
+    batch = _batch_metrics(RAW_TOKENS, NOW_MS).iloc[index]
+    token = Token(RAW_TOKENS[index], now_ms=NOW_MS)
+    for attr in _METRIC_ATTRS:
+        value = getattr(token, attr)
+        assert value == pytest.approx(batch[attr])
+        assert type(value) is type(batch[attr].item())
+
+
+def test_float_columns_stay_float():
+    metrics = _batch_metrics(RAW_TOKENS, NOW_MS)
+    assert metrics['price_usd'].dtype == 'float64'
+    assert metrics['liquidity_usd'].dtype == 'float64'
+    assert metrics['buys_24h'].dtype == 'int64'
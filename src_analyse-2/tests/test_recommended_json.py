@@ -0,0 +1,35 @@
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from token_analyzer import TokenAnalyzer
+
+
+def test_recommended_json_without_lock_stage(tmp_path, monkeypatch):
+    """Синхронный анализ не проверяет блокировку ликвидности: экспорт не должен падать на None"""
+    monkeypatch.chdir(tmp_path)
+    config_path = tmp_path / 'config.json'
+    config_path.write_text(json.dumps({'lookup_cache': {'enabled': False}}), encoding='utf-8')
+    analyzer = TokenAnalyzer(str(config_path))
+    token = analyzer.add_token({
+        'chainId': 'ethereum',
+        'pairAddress': '0xpair',
+        'baseToken': {'address': '0xtoken', 'name': 'Test', 'symbol': 'TST'},
+        'liquidity': {'usd': 200000},
+        'volume': {'h24': 100000},
+        'priceChange': {'h24': 25.0},
+        'pairCreatedAt': int((time.time() - 60 * 24 * 3600) * 1000),
+        'info': {'websites': [{'url': 'https://x'}], 'socials': [{'url': 'https://t'}]},
+    })
+    analyzer.analyze_all_tokens_sync()
+    token.risk_level = "Низкий"
+
+    out = tmp_path / 'recommended.json'
+    assert analyzer.export_recommended_to_json(str(out))
+    data = json.loads(out.read_text(encoding='utf-8'))
+    exported = data['recommended_tokens'][0]
+    assert exported['liquidity_lock']['lock_score'] == 0
+    assert exported['liquidity_lock']['safety_level'] == "LOW"
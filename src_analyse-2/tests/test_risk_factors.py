@@ -0,0 +1,24 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from token_analyzer import Token
+
+
+def test_risk_factors_read_is_stable_across_rescoring():
+    token = Token({
+        'chainId': 'ethereum',
+        'baseToken': {'address': '0xtoken', 'name': 'Test', 'symbol': 'TST'},
+        'liquidity': {'usd': 1000},
+        'volume': {'h24': 500},
+    })
+    token._risk_factors.append("Неверифицированный контракт")
+    token.calculate_risk_score({})
+
+    first = token.risk_factors
+    assert first == token.risk_factors
+    assert first[0] == "Неверифицированный контракт"
+
+    token.calculate_risk_score({})
+    assert token.risk_factors == first
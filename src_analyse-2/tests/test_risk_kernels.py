@@ -0,0 +1,81 @@
+import json
+import os
+import random
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from token_analyzer import Token, TokenAnalyzer, _RISK_LEVEL_NAMES, _risk_score_loop
+
+
+def _make_analyzer(tmp_path, monkeypatch):
+    """Анализатор без дискового кэша, логи и конфиг - во временной директории"""
+    monkeypatch.chdir(tmp_path)
+    config_path = tmp_path / 'config.json'
+    config_path.write_text(json.dumps({'lookup_cache': {'enabled': False}}), encoding='utf-8')
+    return TokenAnalyzer(str(config_path))
+
+
+def _random_token(rng, i):
+    """Токен со случайными метриками и результатами этапов анализа около порогов правил"""
+    token = Token({
+        'chainId': 'ethereum',
+        'pairAddress': f'0xpair{i}',
+        'baseToken': {'address': f'0xtoken{i}', 'name': f'Token {i}', 'symbol': f'T{i}'},
+        'liquidity': {'usd': rng.choice([0, 500, 20000, 40000, 99999, 100000, rng.uniform(0, 300000)])},
+        'volume': {'h24': rng.uniform(0, 3_000_000)},
+        'priceChange': {'h24': rng.choice([0, 499, 501, 1001, rng.uniform(-90, 1500)])},
+        'txns': {'h24': {'buys': rng.randint(0, 100), 'sells': rng.randint(0, 500)}},
+        'info': {'websites': [{'url': 'https://x'}] if rng.random() < 0.5 else [],
+                 'socials': [{'url': 'https://t'}] if rng.random() < 0.5 else []},
+    })
+    token.age_hours = rng.choice([0.0, 23.9, 24.0, 167.9, 168.0, 720.0, rng.uniform(0, 2000)])
+    token.liquidity_lock_score = rng.choice([None, None, 0, 29, 30, 59, 60, rng.randint(0, 100)])
+    if rng.random() < 0.6:
+        token.liquidity_lock_info = SimpleNamespace(is_locked=rng.random() < 0.7,
+                                                    locked_percentage=rng.choice([0, 29, 30, 74, 75, 100]))
+    if rng.random() < 0.6:
+        token.verification_result = SimpleNamespace(is_verified=rng.random() < 0.5)
+    return token
+
+
+def _kernel_inputs(tokens):
+    """Входные массивы ядер риск-скора в порядке аргументов _risk_score_loop"""
+    column = lambda attr: np.array([getattr(t, attr) for t in tokens], dtype=np.float64)
+    lock_scores = [t.liquidity_lock_score for t in tokens]
+    return (
+        column('price_change_24h'), column('age_hours'), column('liquidity_usd'), column('volume_24h'),
+        column('buys_24h'), column('sells_24h'),
+        np.array([t.has_website or t.has_socials for t in tokens], dtype=bool),
+        np.array([lock is not None for lock in lock_scores], dtype=bool),
+        np.array([lock or 0 for lock in lock_scores], dtype=np.float64),
+        np.array([li.locked_percentage if (li := t.liquidity_lock_info) and li.is_locked else 0 for t in tokens],
+                 dtype=np.float64),
+        np.array([bool((vr := t.verification_result) and vr.is_verified) for t in tokens], dtype=bool),
+    )
+
+
+def test_risk_kernels_match_scalar_score(tmp_path, monkeypatch):
+    analyzer = _make_analyzer(tmp_path, monkeypatch)
+    rng = random.Random(2024)
+    tokens = [_random_token(rng, i) for i in range(2000)]
+    thresholds = analyzer.thresholds
+    limits = (thresholds.suspicious_price_change, thresholds.low_liquidity, thresholds.suspicious_vol_liq)
+
+    # Скалярный цикл без numba (в чистом Python)
+    loop_scores, loop_levels, loop_flags = _risk_score_loop(*_kernel_inputs(tokens), *limits)
+
+    batch_scores = analyzer.calculate_risk_scores_batch(tokens).tolist()
+    batch = [(t.risk_score, t.risk_level, t.risk_flags, t.risk_factors) for t in tokens]
+
+    for i, token in enumerate(tokens):
+        scalar_score = token.calculate_risk_score(thresholds)
+        scalar = (token.risk_score, token.risk_level, token.risk_flags, token.risk_factors)
+
+        assert scalar_score == batch_scores[i] == int(loop_scores[i])
+        assert scalar == batch[i]
+        assert _RISK_LEVEL_NAMES[int(loop_levels[i])] == token.risk_level
+        assert int(loop_flags[i]) == token.risk_flags
@@ -0,0 +1,57 @@
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from token_analyzer import Token, TokenAnalyzer
+
+
+def _make_analyzer(tmp_path, monkeypatch):
+    """Анализатор без дискового кэша, логи и конфиг - во временной директории"""
+    monkeypatch.chdir(tmp_path)
+    config_path = tmp_path / 'config.json'
+    config_path.write_text(json.dumps({'lookup_cache': {'enabled': False}}), encoding='utf-8')
+    return TokenAnalyzer(str(config_path))
+
+
+def _make_locked_token():
+    """Токен с результатом анализа безопасности и блокировкой ликвидности с примечаниями"""
+    token = Token({
+        'chainId': 'ethereum',
+        'pairAddress': '0xpair',
+        'baseToken': {'address': '0xtoken', 'name': 'Test', 'symbol': 'TST'},
+        'priceUsd': '1.0',
+        'liquidity': {'usd': 100000},
+        'volume': {'h24': 50000},
+        'priceChange': {'h24': 12.5},
+    })
+    token.security_score = 0.2
+    token.liquidity_locked = True
+    token.liquidity_lock_info = SimpleNamespace(
+        is_locked=True, locked_percentage=80.0, lock_duration_days=30,
+        platform='unicrypt', unlock_date=None, warnings=['short lock'],
+    )
+    return token
+
+
+def test_unified_report_with_lock_warnings(tmp_path, monkeypatch):
+    analyzer = _make_analyzer(tmp_path, monkeypatch)
+    token = _make_locked_token()
+    report_path = tmp_path / 'report.txt'
+
+    assert analyzer.generate_unified_report(str(report_path), [token])
+    report = report_path.read_text(encoding='utf-8')
+    assert '• short lock' in report
+
+
+def test_unified_report_and_csv_with_lock_warnings(tmp_path, monkeypatch):
+    analyzer = _make_analyzer(tmp_path, monkeypatch)
+    token = _make_locked_token()
+    report_path = tmp_path / 'report.txt'
+    csv_path = tmp_path / 'tokens.csv'
+
+    assert analyzer.generate_unified_report_and_csv(str(report_path), str(csv_path), [token])
+    assert '• short lock' in report_path.read_text(encoding='utf-8')
+    assert 'TST' in csv_path.read_text(encoding='utf-8')
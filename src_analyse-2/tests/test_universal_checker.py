@@ -0,0 +1,25 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api.universal_token_checker import UniversalTokenChecker
+
+
+def test_check_tokens_duplicates_get_own_results(monkeypatch):
+    checker = UniversalTokenChecker()
+    calls = []
+
+    async def fake_check_token(address, chain):
+        calls.append((address, chain))
+        return {'address': address, 'found': True, 'sources': ['jupiter']}
+
+    monkeypatch.setattr(checker, 'check_token', fake_check_token)
+    items = [('0xa', 'ethereum'), ('So1', 'solana'), ('0xa', 'ethereum')]
+    results = asyncio.run(checker.check_tokens(items))
+
+    assert calls == [('0xa', 'ethereum'), ('So1', 'solana')]
+    assert results[0] == results[2]
+    results[0]['sources'].append('coingecko')
+    assert results[2]['sources'] == ['jupiter']